@@ -12,7 +12,11 @@ def main():
         else:
             game = Game(gui='terminal', player_types=players)
         print("Starting Jaipur Game...")
-        game.play()
+        if hasattr(game.gui, 'run'):
+            # Play on a worker thread so the window keeps rendering during AI turns
+            game.gui.run(game.play)
+        else:
+            game.play()
     except KeyboardInterrupt:
         print("\nGame interrupted by user. Exiting...")
         sys.exit(0)
@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+# Plays headless games between registered agents on every core and records
+# them, e.g.:
+#   python selfplay.py ai mcts:200 --games 10000 --out data/selfplay --replays data/selfplay.jpr
+import argparse
+from src.core.players import registered_players
+from src.core.players.gymnasium.selfplay import run_selfplay
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate Jaipur self-play games in parallel")
+    parser.add_argument('players', nargs=2, metavar='PLAYER',
+                        help=f"agent kinds ({', '.join(registered_players())}), optionally kind:arg "
+                             "(mcts:N playouts per move, trained:MODEL_PATH)")
+    parser.add_argument('--games', type=int, default=1000)
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: one per core)")
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--out', default=None, help="dataset directory for the recorded plies")
+    parser.add_argument('--replays', default=None, help="file to append the game replays to")
+    parser.add_argument('--shard-size', type=int, default=1 << 16)
+    parser.add_argument('--report-every', type=float, default=5.0, help="seconds between progress reports")
+    args = parser.parse_args()
+
+    for kind in args.players:
+        if kind.partition(':')[0] not in registered_players():
+            parser.error(f"unknown player kind {kind!r}")
+
+    stats = run_selfplay(args.games, args.players, args.workers, args.seed, args.out, args.replays,
+                         args.shard_size, args.report_every)
+    print(f"{stats['games']} games ({stats['errors']} abandoned), {stats['plies']} plies in {stats['seconds']:.1f}s: "
+          f"{stats['games_per_s']:,.1f} games/s, {stats['plies_per_s']:,.0f} plies/s")
+    for i, kind in enumerate(args.players, 1):
+        print(f"  Player {i} ({kind}): {stats['wins'][i - 1]} wins")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+# Watches several AI games at once, tiled in the terminal, e.g.:
+#   python spectate.py ai mcts:200 --games 6 --fps 10
+import argparse
+from tabulate import tabulate
+from src.core.players import registered_players
+from src.gui.spectate import Spectator
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Spectate concurrent headless Jaipur games")
+    parser.add_argument('players', nargs=2, metavar='PLAYER',
+                        help=f"agent kinds ({', '.join(registered_players())}), optionally kind:arg")
+    parser.add_argument('--games', type=int, default=4, help="games played and shown at once")
+    parser.add_argument('--fps', type=float, default=10.0, help="maximum screen refreshes per second")
+    parser.add_argument('--delay', type=float, default=0.0, help="seconds to pause after every move")
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    for kind in args.players:
+        if kind.partition(':')[0] not in registered_players():
+            parser.error(f"unknown player kind {kind!r}")
+
+    spectator = Spectator(args.players, args.games, args.fps, args.delay, args.seed)
+    try:
+        scores = spectator.run()
+    except KeyboardInterrupt:
+        spectator.render(cursor=spectator.bottom())
+        print("Interrupted.")
+        return
+    print(tabulate([[i, *s.values()] for i, s in enumerate(scores, 1)], headers=["Game", *scores[0]]))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
 from .market import Market
 from .deck import Deck, Card
-from .utils import sell_tokens_for
-from .game import Game
\ No newline at end of file
+from .state import GameState
+from .tokens import TokenBank
+from .game import Game
@@ -0,0 +1,45 @@
+from .cards import N_GOODS
+from .exchanges import N_EXCHANGES
+
+# Flat action encoding shared by the engine, the gymnasium envs and agents:
+# 0-6: Take single good (Diamond, Gold, Silver, Cloth, Spice, Leather, Camel)
+# 7: Take all camels
+# 8-13: Sell all goods of one type (Diamond, Gold, Silver, Cloth, Spice, Leather)
+# 14+i: Exchange number i of exchanges.EXCHANGES
+# Taking a single camel is never legal; the slot only keeps indices aligned with Card.
+TAKE_CAMELS = 7
+SELL_OFFSET = 8
+EXCHANGE = 14
+N_ACTIONS = EXCHANGE + N_EXCHANGES
+
+# The envs expose these as one Discrete(N_ACTIONS) space because that is what
+# MaskablePPO masks exactly. Splitting exchanges into take and give parts
+# (MultiDiscrete) would only mask each part on its own and let illegal pairs
+# through, e.g. a good both taken and given. The price is a 25,470-way
+# categorical. Measured on one CPU core with 32 JaipurVecEnv games (see
+# experiments/bench_action_head.py): the head holds 99% of the MlpPolicy
+# parameters, a masked policy forward takes about 60 ms per step against
+# under 1 ms for the env, mostly in the softmax and sampling rather than the
+# linear layer, training runs at about 55 steps/s, and the rollout buffer keeps
+# 4 bytes per action per step (199 MiB for 64 steps, 1.6 GiB for the 256 envs
+# of train_gymnasium.py). Removing that cost needs an autoregressive head
+# (action kind, then take, then give) in a custom policy.
+
+# Legal-action bitmasks (GameState.legal_mask) carry one bit per action below
+# EXCHANGE, and bit EXCHANGE flags that at least one exchange is legal.
+TAKE_GOODS_BITS = (1 << N_GOODS) - 1
+TAKE_CAMELS_BIT = 1 << TAKE_CAMELS
+EXCHANGE_BIT = 1 << EXCHANGE
+# Bit set in a legal-action mask while a card is present in the market
+MARKET_BITS = tuple(1 << c for c in range(N_GOODS)) + (TAKE_CAMELS_BIT,)
+SELL_BITS = tuple(1 << (SELL_OFFSET + g) for g in range(N_GOODS))
+
+# Replays (see replay.py) also need sales of fewer than all goods of a type,
+# which human players may choose; they are coded from PARTIAL_SELL upwards and
+# never appear in legal-action masks.
+MAX_SELL = 16
+PARTIAL_SELL = N_ACTIONS
+
+
+def partial_sell(good: int, n: int) -> int:
+    return PARTIAL_SELL + good * MAX_SELL + n
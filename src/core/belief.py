@@ -0,0 +1,179 @@
+# belief.py
+import random
+from math import comb
+from typing import List, Optional, Tuple
+from .cards import CAMEL, N_GOODS
+from .actions import TAKE_CAMELS, SELL_OFFSET, EXCHANGE, N_ACTIONS, PARTIAL_SELL, MAX_SELL
+from .exchanges import EXCHANGES
+from .state import GameState, DECK_COMPOSITION
+
+
+class BeliefTracker:
+    """What one seat knows about the opponent's goods and the deck.
+
+    The opponent's goods split into the cards seen entering their hand
+    (taken from the market) and ``hidden`` ones, which are what was left of
+    their opening hand. Those were dealt uniformly from ``pool``: every good
+    whose whereabouts the seat has never seen (the opening hand plus the
+    deck, minus the cards since drawn into the market). ``net[g]`` counts
+    goods taken minus goods given away or sold, so the opponent holds
+    ``hidden[g] + net[g]`` of good ``g`` and the deck ``pool[g] -
+    hidden[g]``.
+
+    Giving away or selling more of a good than was seen coming in puts a
+    lower bound on the hidden count (it cannot go negative), and selling
+    every card of a good pins it exactly. The posterior over ``hidden`` is
+    the hypergeometric prior restricted to those bounds, which is the exact
+    card-count posterior given the public history. Updates are O(1); the
+    marginals and the sampler work on a small table over the six goods and
+    at most seven hidden cards, rebuilt only after an action changed it.
+
+    Feed it every action of both players with ``update`` from the start of
+    the game. ``sync`` falls back to the belief of a seat that saw nothing
+    (the same as ``GameState.determinize``) when the state does not match
+    the tracked public counts, e.g. if the tracker missed an action.
+    """
+
+    def __init__(self) -> None:
+        self.seat = 0
+        self.pool: List[int] = [0] * N_GOODS
+        self.net: List[int] = [0] * N_GOODS
+        self.low: List[int] = [0] * N_GOODS
+        self.high: List[int] = [0] * N_GOODS
+        self.hidden = 0
+        # Public counts seen at the last update, to spot draws and sales
+        self.market: List[int] = []
+        self.sold: List[int] = []
+        self.opp_size = 0
+        self._ways: Optional[List[List[int]]] = None
+
+    def reset(self, state: GameState, seat: int) -> None:
+        """Start from what ``seat`` sees in ``state`` and nothing else"""
+        opp = 1 - seat
+        self.seat = seat
+        own = state.hands[seat]
+        self.pool = [DECK_COMPOSITION[g] - state.market[g] - own[g] - state.sold[g] for g in range(N_GOODS)]
+        self.net = [0] * N_GOODS
+        self.low = [0] * N_GOODS
+        self.high = self.pool[:]
+        self.hidden = state.hand_sizes[opp]
+        self.market = state.market[:]
+        self.sold = state.sold[:]
+        self.opp_size = state.hand_sizes[opp]
+        self._ways = None
+
+    def consistent(self, state: GameState, seat: int) -> bool:
+        return (seat == self.seat and state.market == self.market and state.sold == self.sold
+                and state.hand_sizes[1 - seat] == self.opp_size)
+
+    def sync(self, state: GameState, seat: int) -> None:
+        if not self.consistent(state, seat) or not self._table()[0][self.hidden]:
+            self.reset(state, seat)
+
+    def update(self, state: GameState, action: int, mover: int) -> None:
+        """Account for ``mover`` having played ``action``, ``state`` being the position after it"""
+        market, opp = self.market, mover != self.seat
+        if not market:  # never reset; the next sync will
+            return
+        if action < N_GOODS or action == TAKE_CAMELS:
+            # The cards that refilled the market came from the deck
+            taken = action if action < N_GOODS else CAMEL
+            market[taken] -= market[CAMEL] if taken == CAMEL else 1
+            for g in range(N_GOODS):
+                drawn = state.market[g] - market[g]
+                if drawn:
+                    self.pool[g] -= drawn
+                    self._ways = None
+                    if drawn < 0 or self.pool[g] < 0:
+                        # The tracker missed a move
+                        self.reset(state, self.seat)
+                        return
+            if opp and action < N_GOODS:
+                self.net[action] += 1
+        elif action < EXCHANGE or action >= N_ACTIONS:
+            if action < EXCHANGE:
+                good = action - SELL_OFFSET
+            else:
+                good = (action - PARTIAL_SELL) // MAX_SELL
+            if opp:
+                self.net[good] -= state.sold[good] - self.sold[good]
+                self._bound(good)
+                if action < EXCHANGE:
+                    self.high[good] = self.low[good]
+                    self._ways = None
+        elif opp:
+            take, give = EXCHANGES[action - EXCHANGE]
+            for g in range(N_GOODS):
+                if take[g]:
+                    self.net[g] += take[g]
+                elif give[g]:
+                    self.net[g] -= give[g]
+                    self._bound(g)
+        self.market = state.market[:]
+        self.sold = state.sold[:]
+        self.opp_size = state.hand_sizes[1 - self.seat]
+
+    def _bound(self, good: int) -> None:
+        if -self.net[good] > self.low[good]:
+            self.low[good] = -self.net[good]
+            self._ways = None
+
+    def _table(self) -> List[List[int]]:
+        """``ways[g][k]``: weighted number of ways goods ``g`` and up hide ``k`` cards"""
+        ways = self._ways
+        if ways is None:
+            n = self.hidden
+            ways = [[0] * (n + 1) for _ in range(N_GOODS + 1)]
+            ways[N_GOODS][0] = 1
+            for g in range(N_GOODS - 1, -1, -1):
+                pool, low, high = self.pool[g], self.low[g], min(self.high[g], self.pool[g])
+                for k in range(n + 1):
+                    ways[g][k] = sum(comb(pool, h) * ways[g + 1][k - h] for h in range(low, min(high, k) + 1))
+            self._ways = ways
+        return ways
+
+    def expected_hand(self) -> List[float]:
+        """Expected number of each good in the opponent's hand"""
+        ways, n = self._table(), self.hidden
+        total = ways[0][n]
+        # before[k]: weighted ways the goods already done hide k cards
+        before = [1] + [0] * n
+        expected = []
+        for g in range(N_GOODS):
+            pool, low, high = self.pool[g], self.low[g], min(self.high[g], self.pool[g])
+            mean, after = 0, [0] * (n + 1)
+            for h in range(low, min(high, n) + 1):
+                w = comb(pool, h)
+                for k in range(n + 1 - h):
+                    if before[k]:
+                        mean += h * w * before[k] * ways[g + 1][n - k - h]
+                        after[k + h] += w * before[k]
+            before = after
+            expected.append(mean / total + self.net[g] if total else float(self.net[g]))
+        return expected
+
+    def expected_deck(self) -> List[float]:
+        """Expected number of each good left in the deck"""
+        return [p - (h - n) for p, h, n in zip(self.pool, self.expected_hand(), self.net)]
+
+    def sample(self, rng: random.Random) -> Tuple[List[int], List[int]]:
+        """Draw the opponent's goods counts and the deck's goods (as card indices) from the posterior"""
+        ways, k = self._table(), self.hidden
+        hand, deck = [], []
+        for g in range(N_GOODS):
+            pool, low, high = self.pool[g], self.low[g], min(self.high[g], self.pool[g], k)
+            r = rng.random() * ways[g][k]
+            h = low
+            for h in range(low, high + 1):
+                r -= comb(pool, h) * ways[g + 1][k - h]
+                if r < 0:
+                    break
+            k -= h
+            hand.append(h + self.net[g])
+            deck += [g] * (pool - h)
+        return hand, deck
+
+    def determinize(self, state: GameState, rng: random.Random = random) -> GameState:
+        """Like ``state.determinize(seat)`` but drawn from the posterior (``sync`` it first)"""
+        hand, deck = self.sample(rng)
+        return state.redeal(1 - self.seat, hand, deck, rng)
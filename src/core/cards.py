@@ -0,0 +1,21 @@
+from enum import Enum, auto
+
+
+class Card(Enum):
+    DIAMOND = auto()
+    GOLD = auto()
+    SILVER = auto()
+    CLOTH = auto()
+    SPICE = auto()
+    LEATHER = auto()
+    CAMEL = auto()
+
+
+# Every count vector in the engine is indexed in ``Card`` declaration order,
+# so goods occupy indices 0-5 and the camel is always the last slot.
+CARDS = tuple(Card)
+CARD_INDEX = {card: i for i, card in enumerate(CARDS)}
+N_CARDS = len(CARDS)
+N_GOODS = N_CARDS - 1
+CAMEL = CARD_INDEX[Card.CAMEL]
+GOODS = CARDS[:N_GOODS]
@@ -1,40 +1,32 @@
 import random
-from typing import List
-from enum import Enum, auto
+from typing import List, Optional
+from .cards import Card, CARDS
+from .state import GameState, MARKET_CAMELS
 
 
-class Card(Enum):
-    DIAMOND = auto()
-    GOLD = auto()
-    SILVER = auto()
-    CLOTH = auto()
-    SPICE = auto()
-    LEATHER = auto()
-    CAMEL = auto()
+class Deck:
+    def __init__(self, state: Optional[GameState] = None, rng: random.Random = random) -> None:
+        self.state = state if state is not None else GameState()
+        self.state.shuffle_deck(rng)
 
+    @property
+    def cards(self) -> List[Card]:
+        """Remaining cards, next to be drawn first"""
+        return [CARDS[c] for c in self.state.deck[self.state.deck_pos:]]
 
-class Deck:
-    def __init__(self) -> None:
-        self.cards: List[str] = ([Card.CAMEL] * 11 +
-                                 [Card.DIAMOND] * 6 +
-                                 [Card.GOLD] * 6 +
-                                 [Card.SILVER] * 6 +
-                                 [Card.CLOTH] * 8 +
-                                 [Card.SPICE] * 8 +
-                                 [Card.LEATHER] * 10)
-        random.shuffle(self.cards)
+    def __len__(self) -> int:
+        return self.state.deck_size()
 
     def draw(self, n: int = 1) -> List[Card]:
         drawn = []
         for _ in range(n):
-            if self.cards:
-                drawn.append(self.cards.pop())
+            c = self.state.draw()
+            if c < 0:
+                break
+            drawn.append(CARDS[c])
         return drawn
 
     def init_market(self) -> List[Card]:
-        # Remove 3 camels from the market
-        for _ in range(3):
-            self.cards.remove(Card.CAMEL)
-
-        # Take two random cards + 3 camels
-        return self.draw(2) + [self.CAMEL] * 3
\ No newline at end of file
+        # The market always starts with 3 camels (already left out of the deck)
+        # plus two random cards
+        return [Card.CAMEL] * MARKET_CAMELS + self.draw(2)
@@ -0,0 +1,205 @@
+# endgame.py
+import random
+import struct
+from typing import Dict, List, Optional, Tuple, TYPE_CHECKING
+from .cards import CAMEL, N_CARDS, N_GOODS
+from .actions import TAKE_CAMELS, SELL_OFFSET, EXCHANGE
+from .exchanges import EXCHANGES
+from .state import GameState, DEPLETED_STACKS_TO_END
+from .tokens import TOKEN_SUMS, BONUS_PILE, BONUS_SIZES
+from .utils import BONUS_CAMEL
+
+if TYPE_CHECKING:
+    from .tablebase import Tablebase
+
+
+def bonus_means(state: GameState) -> Tuple[float, ...]:
+    """Expected value of the next token of each bonus pile (0 for empty piles)
+
+    The undrawn tokens are shuffled, so every one of them is worth their
+    mean in expectation.
+    """
+    return tuple(sum(pile[pos:]) / (len(pile) - pos) if pos < len(pile) else 0.0
+                 for pile, pos in zip(state.bonus, state.bonus_pos))
+
+
+class EndgameSolver:
+    """Expectimax for positions with at most ``max_deck`` cards left.
+
+    Players maximise their expected final point margin; the cards drawn to
+    refill the market are chance nodes over the remaining deck composition
+    (its order is hidden from both players), and bonus tokens count at the
+    mean of the undrawn ones, which is exact because no rule depends on the
+    points. The opponent's hand is taken as given: call it on
+    determinizations when it is unknown (see ``choose``).
+
+    Exchanges are the only moves that can repeat a position, so at most
+    ``max_exchanges`` may be played in a row; past that the mover has to
+    take or sell, which always has a legal option. Exchanges multiply the
+    tree by a few hundred per ply, so the default searches none and a fresh
+    solve with three cards left takes some tens of milliseconds. The values
+    are therefore approximate: exact for the rest of the game played under
+    that limit, not for the full game, where exchanges can also pay.
+
+    Values are memoized in ``memo``, which persists across calls and so
+    doubles as a table of solved positions. Its keys pack the state (whose
+    turn, exchange streak, market, hands, sold goods, bonus piles, deck
+    composition, then the bonus means as doubles) into about 60 bytes, see
+    ``key``, and at most ``max_entries`` are stored (roughly 150 bytes each
+    with the dict slot). A ``tablebase`` (see tablebase.py) is probed before
+    solving a position.
+    """
+
+    def __init__(self, max_deck: int = 3, max_exchanges: int = 0, max_entries: int = 1 << 22,
+                 tablebase: Optional['Tablebase'] = None) -> None:
+        self.max_deck = max_deck
+        self.max_exchanges = max_exchanges
+        self.max_entries = max_entries
+        self.tablebase = tablebase
+        self.memo: Dict[bytes, float] = {}
+        self.nodes = 0
+        self._s = GameState()
+        self._means: Tuple[float, ...] = ()
+        self._means_key = b''
+
+    def applicable(self, state: GameState) -> bool:
+        return not state.is_terminal() and state.deck_size() <= self.max_deck
+
+    @staticmethod
+    def key(state: GameState, streak: int = 0) -> bytes:
+        """Memo key of ``state``: one byte per count, the player to move first and the streak second"""
+        seat = state.turn & 1
+        return bytes((seat, streak, *state.market, *state.hands[seat], *state.hands[1 - seat], *state.sold,
+                      *state.bonus_pos, *state.deck_counts)) + struct.pack('<3d', *bonus_means(state))
+
+    def values(self, state: GameState) -> Dict[int, float]:
+        """Expected final margin of the player to move after each action the solver considers"""
+        s = self._s = state.clone()
+        self._means = bonus_means(state)
+        self._means_key = struct.pack('<3d', *self._means)
+        seat = state.turn & 1
+        base = state.points[seat] - state.points[1 - seat]
+        values = {a: self._action_value(seat, 0, a) for a in self._moves(seat, 0)}
+        if len(self.memo) < self.max_entries:
+            self.memo[self.key(state)] = max(values.values())
+        return {a: base + v for a, v in values.items()}
+
+    def value(self, state: GameState) -> float:
+        """Expected final margin of the player to move under best play"""
+        return max(self.values(state).values())
+
+    def best_action(self, state: GameState) -> int:
+        values = self.values(state)
+        return max(values, key=values.get)
+
+    def outcome(self, state: GameState, seat: int) -> float:
+        """``mcts.outcome``-style result for ``seat``: 1, 0.5 or 0 by the sign of the expected margin"""
+        margin = self.value(state) * (1 if state.turn & 1 == seat else -1)
+        return 0.5 if margin == 0 else 1.0 if margin > 0 else 0.0
+
+    def choose(self, state: GameState, seat: int, rng: random.Random, samples: int = 8) -> int:
+        """Best action for ``seat`` averaged over ``samples`` guesses of the opponent's goods"""
+        totals: Dict[int, float] = {}
+        for _ in range(samples):
+            det = state.determinize(seat, rng)
+            det.turn = seat
+            for a, v in self.values(det).items():
+                totals[a] = totals.get(a, 0.0) + v
+        return max(totals, key=totals.get)
+
+    def _moves(self, seat: int, streak: int) -> List[int]:
+        actions = self._s.legal_actions(seat)
+        if streak >= self.max_exchanges:
+            return [a for a in actions if a < EXCHANGE]
+        return actions
+
+    def _terminal(self, seat: int) -> float:
+        """Camel bonus margin for ``seat`` once the game has ended"""
+        herd, other = self._s.hands[seat][CAMEL], self._s.hands[1 - seat][CAMEL]
+        return BONUS_CAMEL if herd > other else -BONUS_CAMEL if herd < other else 0.0
+
+    def _negamax(self, seat: int, streak: int) -> float:
+        s = self._s
+        key = bytes((seat, streak, *s.market, *s.hands[seat], *s.hands[1 - seat], *s.sold, *s.bonus_pos,
+                     *s.deck_counts)) + self._means_key
+        value = self.memo.get(key)
+        if value is not None:
+            return value
+        if self.tablebase is not None and not streak:
+            value = self.tablebase.probe(key)
+            if value is not None:
+                self.memo[key] = value
+                return value
+        self.nodes += 1
+        value = max(self._action_value(seat, streak, a) for a in self._moves(seat, streak))
+        if len(self.memo) < self.max_entries:
+            self.memo[key] = value
+        return value
+
+    def _action_value(self, seat: int, streak: int, action: int) -> float:
+        """Points ``seat`` gains minus what the opponent gains from here on, after ``action``"""
+        s, opp = self._s, 1 - seat
+        if action < N_GOODS:
+            s.add_to_market(action, -1)
+            s.add_to_hand(seat, action)
+            value = -self._refill(1, opp)
+            s.add_to_hand(seat, action, -1)
+            s.add_to_market(action)
+        elif action == TAKE_CAMELS:
+            n = s.market[CAMEL]
+            s.add_to_market(CAMEL, -n)
+            s.add_to_hand(seat, CAMEL, n)
+            value = -self._refill(n, opp)
+            s.add_to_hand(seat, CAMEL, -n)
+            s.add_to_market(CAMEL, n)
+        elif action < EXCHANGE:
+            good = action - SELL_OFFSET
+            n, sold = s.hands[seat][good], s.sold[good]
+            value = TOKEN_SUMS[good][sold + n] - TOKEN_SUMS[good][sold]
+            k = BONUS_PILE[n]
+            bonus = k >= 0 and s.bonus_pos[k] < BONUS_SIZES[k]
+            if bonus:
+                value += self._means[k]
+                s.bonus_pos[k] += 1
+            s.add_to_hand(seat, good, -n)
+            s.sold[good] = sold + n
+            if s.depleted_stacks() >= DEPLETED_STACKS_TO_END:
+                value += self._terminal(seat)
+            else:
+                value -= self._negamax(opp, 0)
+            s.sold[good] = sold
+            s.add_to_hand(seat, good, n)
+            if bonus:
+                s.bonus_pos[k] -= 1
+        else:
+            take, give = EXCHANGES[action - EXCHANGE]
+            for c in range(N_CARDS):
+                if take[c] != give[c]:
+                    s.add_to_hand(seat, c, take[c] - give[c])
+                    s.add_to_market(c, give[c] - take[c])
+            value = -self._negamax(opp, streak + 1)
+            for c in range(N_CARDS):
+                if take[c] != give[c]:
+                    s.add_to_hand(seat, c, give[c] - take[c])
+                    s.add_to_market(c, take[c] - give[c])
+        return value
+
+    def _refill(self, k: int, seat: int) -> float:
+        """Expected value for ``seat``, to move next, of drawing ``k`` cards into the market"""
+        if k == 0:
+            return self._negamax(seat, 0)
+        s = self._s
+        counts = s.deck_counts
+        remaining = sum(counts)
+        total = 0.0
+        for c in range(N_CARDS):
+            n = counts[c]
+            if n:
+                counts[c] = n - 1
+                s.add_to_market(c)
+                # Drawing the last card ends the game
+                total += n * (self._terminal(seat) if remaining == 1 else self._refill(k - 1, seat))
+                s.add_to_market(c, -1)
+                counts[c] = n
+        return total / remaining
+
@@ -0,0 +1,69 @@
+from functools import lru_cache
+from typing import Dict, Tuple
+from .cards import CARDS, N_CARDS, N_GOODS, Card
+
+MIN_EXCHANGE = 2
+MAX_EXCHANGE = 5  # the whole market
+
+CountVector = Tuple[int, ...]
+
+
+@lru_cache(maxsize=None)
+def submultisets(bound: CountVector, k: int) -> Tuple[CountVector, ...]:
+    """Every count vector with total ``k`` that is elementwise <= ``bound``"""
+    if len(bound) == 1:
+        return ((k,),) if k <= bound[0] else ()
+    rest = sum(bound[1:])
+    result = []
+    for n in range(max(0, k - rest), min(bound[0], k) + 1):
+        result.extend((n,) + tail for tail in submultisets(bound[1:], k - n))
+    return tuple(result)
+
+
+def _build_exchange_table() -> Tuple[Tuple[CountVector, CountVector], ...]:
+    table = []
+    for k in range(MIN_EXCHANGE, MAX_EXCHANGE + 1):
+        for take in submultisets((k,) * N_GOODS + (0,), k):
+            # A type cannot be both taken and given, camels can only be given
+            give_bound = tuple(0 if take[c] else k for c in range(N_CARDS))
+            table.extend((take, give) for give in submultisets(give_bound, k))
+    return tuple(table)
+
+
+# Every exchange the rules allow, as (take, give) count vectors. An exchange is
+# encoded everywhere by its index in this table.
+EXCHANGES = _build_exchange_table()
+EXCHANGE_INDEX: Dict[Tuple[CountVector, CountVector], int] = {e: i for i, e in enumerate(EXCHANGES)}
+N_EXCHANGES = len(EXCHANGES)
+
+
+@lru_cache(maxsize=1 << 16)
+def legal_exchanges(market: CountVector, hand: CountVector) -> Tuple[int, ...]:
+    """Indices of the exchanges allowed by the given market and hand counts
+
+    ``hand`` must already be capped to what can be given: at most
+    ``MAX_EXCHANGE`` of a type and, for camels, no more than the room left
+    under the hand limit (see ``GameState.legal_exchanges``). The capping
+    keeps the number of distinct keys small, so after warm-up almost every
+    call is a cache hit.
+    """
+    market_goods = market[:N_GOODS] + (0,)
+    result = []
+    for k in range(MIN_EXCHANGE, min(MAX_EXCHANGE, sum(market_goods)) + 1):
+        for take in submultisets(market_goods, k):
+            give_bound = tuple(0 if take[c] else hand[c] for c in range(N_CARDS))
+            result.extend(EXCHANGE_INDEX[take, give] for give in submultisets(give_bound, k))
+    return tuple(result)
+
+
+def exchange_cards(index: int) -> Tuple[Dict[Card, int], Dict[Card, int]]:
+    """The exchange at ``index`` as (take, give) card-count dicts"""
+    take, give = EXCHANGES[index]
+    return ({CARDS[c]: n for c, n in enumerate(take) if n},
+            {CARDS[c]: n for c, n in enumerate(give) if n})
+
+
+def describe_exchange(index: int) -> str:
+    take, give = exchange_cards(index)
+    fmt = lambda d: ', '.join(f'{n} {c.name.capitalize()}' for c, n in d.items())
+    return f'Take {fmt(take)} | Give {fmt(give)}'
@@ -1,110 +1,131 @@
-from typing import List
-from collections import defaultdict
-from .market import Market
-from .players import BasePlayer, AIPlayer, HumanPlayer
-from .deck import Deck, Card
-from ..gui import (TerminalGUI,
-                  PygameGUI,
-                  BaseGUI, PlayerView, MarketView)
+import random
+from typing import Dict, List, Optional
+from .players import BasePlayer, HumanPlayer, make_player
+from .deck import Card
+from .cards import GOODS
+from .replay import Replay, new_game
+from .utils import BONUS_CAMEL
+from ..gui import BaseGUI, BlindGUI, PlayerView, MarketView, make_gui
 
 
 class Game:
-    def __init__(self, gui: str = 'terminal', player_types: List[str] = ['human', 'human']) -> None:
-        self.deck = Deck()
-        self.market = Market(self.deck)
-        self.gui: BaseGUI = TerminalGUI() if gui == 'terminal' else PygameGUI()
-        
+    def __init__(self, gui: Optional[str] = 'terminal', player_types: List[str] = ['human', 'human'],
+                 seed: Optional[int] = None) -> None:
+        # Every random choice in the game (deal, bonus piles, AI moves) comes
+        # from this seed, so seed + actions (see to_replay) reproduce the game
+        self.seed = seed if seed is not None else random.getrandbits(64)
+        self.rng = random.Random(self.seed)
+        self.state, self.deck, self.market, self.bank = new_game(self.rng)
+        self.actions: List[int] = []
+        # gui=None runs the game headless: nothing is rendered and no GUI
+        # module is imported, which is what simulations and training want
+        self.headless = gui is None
+        self.gui: BaseGUI = BlindGUI() if self.headless else make_gui(gui)
+
         # Create players based on types
         self.players: List[BasePlayer] = []
         for i, p_type in enumerate(player_types, 1):
             if p_type == 'human':
+                if self.headless:
+                    raise ValueError("Human players need a GUI")
                 self.players.append(HumanPlayer(f"Player {i}", self.gui))
             else:
-                self.players.append(AIPlayer(f"AI {i}"))
-        
-        self.transactions = {card: 0 for card in Card}
-        for p in self.players:
-            initial = self.deck.draw(5)
-            p.add_cards_to_hand(initial)
-        self.turn = 0
+                self.players.append(make_player(p_type, i, self.rng))
+
+        for seat, p in enumerate(self.players):
+            p.bind(self.state, seat)
+
+    @property
+    def turn(self) -> int:
+        return self.state.turn
+
+    @turn.setter
+    def turn(self, value: int) -> None:
+        self.state.turn = value
+
+    @property
+    def transactions(self) -> dict[Card, int]:
+        return self.bank.transactions
 
     def get_player_view(self, player: BasePlayer) -> PlayerView:
-        hand_counts = {card: player.hand.count(card) for card in Card}
+        hand_counts = dict(zip(GOODS, player.counts))
         return PlayerView(
             name=player.name,
             hand=hand_counts,
-            camels=len(player.camels),
-            tokens=sum(player.tokens)
+            camels=player.herd_size,
+            tokens=player.score
         )
 
     def get_market_view(self) -> MarketView:
-        goods_counts = {card: self.market.cards.count(card) for card in Card if card != Card.CAMEL}
+        goods_counts = dict(zip(GOODS, self.market.counts))
         return MarketView(
             goods=goods_counts,
-            camels=self.market.cards.count(Card.CAMEL)
+            camels=self.market.camel_count()
         )
 
+    def action_mask(self) -> int:
+        """Legal-action bitmask for the player to move (encoding in actions.py)"""
+        return self.state.legal_mask(self.turn % 2)
+
+    def legal_actions(self) -> List[int]:
+        return self.state.legal_actions(self.turn % 2)
+
     def is_game_over(self) -> bool:
-        return len(self.deck.cards) == 0 or sum(v == 5 for v in self.transactions.values()) >= 3
+        return self.state.is_terminal()
 
     def play_turn(self) -> None:
         current_player = self.players[self.turn % 2]
 
-        # Show game state
-        players_view = [self.get_player_view(p) for p in self.players]
-        market_view = self.get_market_view()
-        self.gui.show_game_state(players_view, market_view, current_player.name)
-
-        # Get player action
-        self.gui.show_turn_options()
-        choice = self.gui.get_action_choice()
-
-        # Handle action
-        success = False
-        if choice == 1:
-            goods_in_market = [card for card in self.market.goods() if self.market.cards.count(card) > 0]
-            selected = self.gui.select_good(goods_in_market)
-            if selected:
-                success = current_player.take_single_good(selected, self.market, self.deck)
-        elif choice == 2:
-            success = current_player.take_camels(self.market, self.deck)
-        elif choice == 3:
-            player_goods = {card: current_player.hand.count(card) for card in Card if card != Card.CAMEL}
-            selection = self.gui.select_goods_to_sell(player_goods)
-            if selection:
-                card, count = selection
-                success = current_player.sell_goods(card, count)
-                if success:
-                    self.transactions[card] += count
-        elif choice == 4:
-            self.gui.show_message("Exchange functionality not yet implemented")
-        elif choice == 5:
-            # Just show state again
-            success = False
-
-        if success:
+        if not self.headless:
+            players_view = [self.get_player_view(p) for p in self.players]
+            market_view = self.get_market_view()
+            self.gui.show_game_state(players_view, market_view, current_player.name)
+
+        # Human players drive their turn through the GUI, AIs decide on their own
+        if current_player.take_turn(self.market, self.deck):
+            self.record(current_player.last_action, current_player.seat)
             self.turn += 1
 
-    def final_scoring(self) -> None:
+    def record(self, action: int, mover: int) -> None:
+        """Log a move played on the state and show it to every player"""
+        self.actions.append(action)
+        for player in self.players:
+            player.observe(action, mover)
+
+    def to_replay(self) -> Replay:
+        return Replay(self.seed, list(self.actions))
+
+    def final_scores(self) -> Dict[str, int]:
+        return {p.name: points for p, points in zip(self.players, self.state.final_points())}
+
+    def final_scoring(self) -> Dict[str, int]:
+        scores = self.final_scores()
+        if self.headless:
+            return scores
+
         players_view = [self.get_player_view(p) for p in self.players]
         market_view = self.get_market_view()
         self.gui.show_game_state(players_view, market_view)
 
         print("\nFinal scoring...")
-        scores = defaultdict(int)
-        for p in self.players:
-            scores[p.name] += sum(p.tokens)
-        camels_counts = [(p.name, len(p.camels)) for p in self.players]
-        camels_counts.sort(key=lambda x: x[1], reverse=True)
+        camels_counts = sorted(((p.name, p.herd_size) for p in self.players), key=lambda x: x[1], reverse=True)
         if camels_counts[0][1] > camels_counts[1][1]:
-            scores[camels_counts[0][0]] += 5
-            self.gui.show_message(f"{camels_counts[0][0]} gets camel bonus 5 points!")
+            self.gui.show_message(f"{camels_counts[0][0]} gets camel bonus {BONUS_CAMEL} points!")
         for p in self.players:
             self.gui.show_message(f"{p.name} final score: {scores[p.name]}")
         winner = max(scores, key=scores.get)
         self.gui.show_message(f"\nWinner is {winner}!")
+        return scores
+
+    def play(self) -> Dict[str, int]:
+        try:
+            while not self.is_game_over():
+                self.play_turn()
+            return self.final_scoring()
+        finally:
+            self.close()
 
-    def play(self) -> None:
-        while not self.is_game_over():
-            self.play_turn()
-        self.final_scoring()
\ No newline at end of file
+    def close(self) -> None:
+        """Release the players' resources; ``play`` does this when the game ends"""
+        for player in self.players:
+            player.close()
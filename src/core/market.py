@@ -1,32 +1,48 @@
 from typing import List
 from .deck import Deck, Card
+from .cards import CARDS, CARD_INDEX, CAMEL, GOODS
 
 
 class Market:
     def __init__(self, deck: Deck) -> None:
-        self.cards: List[Card] = [Card.CAMEL, Card.CAMEL, Card.CAMEL] + deck.draw(2)
+        self.state = deck.state
+        self.add_cards(deck.init_market())
+
+    @property
+    def counts(self) -> List[int]:
+        return self.state.market
+
+    @property
+    def cards(self) -> List[Card]:
+        return [card for card, n in zip(CARDS, self.state.market) for _ in range(n)]
+
+    def count(self, card: Card) -> int:
+        return self.state.market[CARD_INDEX[card]]
 
     def add_cards(self, cards: List[Card]) -> None:
-        self.cards.extend(cards)
+        for c in cards:
+            self.state.add_to_market(CARD_INDEX[c])
 
     def remove_cards(self, cards_to_remove: List[Card]) -> None:
         for c in cards_to_remove:
-            self.cards.remove(c)
+            i = CARD_INDEX[c]
+            if not self.state.market[i]:
+                raise ValueError(f'{c.name} is not in the market')
+            self.state.add_to_market(i, -1)
+
+    def camel_count(self) -> int:
+        return self.state.market[CAMEL]
 
     def camels(self) -> List[Card]:
-        return [c for c in self.cards if c == Card.CAMEL]
+        return [Card.CAMEL] * self.state.market[CAMEL]
 
     def goods(self) -> List[Card]:
-        return [c for c in self.cards if c != Card.CAMEL]
+        return [card for card, n in zip(GOODS, self.state.market) for _ in range(n)]
 
     def describe_str(self) -> str:
         return (
-            '| '.join(c.name.capitalize() for c in self.goods) + f'Camels: {len(self.camels)}'
+            '| '.join(c.name.capitalize() for c in self.goods()) + f'Camels: {self.camel_count()}'
         )
-        
+
     def describe(self) -> dict[Card, int]:
-        d = dict.fromkeys(Card, 0)
-        for g in self.cards:
-            d[g] += 1
-        return d
-        
\ No newline at end of file
+        return dict(zip(CARDS, self.state.market))
@@ -1,5 +1,9 @@
 from .base_player import BasePlayer
 from .ai import AIPlayer
 from .human import HumanPlayer
+from .mcts import MCTSPlayer
+from .parallel_mcts import ParallelMCTSPlayer
+from .registry import register_player, registered_players, make_player
 
-__all__ = ['BasePlayer', 'AIPlayer', 'HumanPlayer']
+__all__ = ['BasePlayer', 'AIPlayer', 'HumanPlayer', 'MCTSPlayer', 'ParallelMCTSPlayer',
+           'register_player', 'registered_players', 'make_player']
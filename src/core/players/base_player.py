@@ -3,91 +3,111 @@ from abc import ABC, abstractmethod
 from typing import List, Dict, Optional
 from ..market import Market
 from ..deck import Deck, Card
-from ..utils import sell_tokens_for
+from ..cards import CARDS, CARD_INDEX, CAMEL, GOODS, N_CARDS
+from ..state import GameState
+from ..actions import TAKE_CAMELS, SELL_OFFSET, EXCHANGE, partial_sell
+from ..exchanges import EXCHANGE_INDEX
 
 class BasePlayer(ABC):
     def __init__(self, name: str) -> None:
         self.name: str = name
-        self.hand: List[Card] = []
-        self.camels: List[Card] = []
         self.tokens: List[int] = []
-        self.transactions: Dict[Card, int] = {card: 0 for card in Card}
+        # Encoded action of the last successful move, for replays
+        self.last_action: int = -1
+        # Until a game binds it, the player keeps its cards in a private state
+        self.bind(GameState(), 0)
+
+    def bind(self, state: GameState, seat: int) -> None:
+        self.state = state
+        self.seat = seat
+
+    def observe(self, action: int, mover: int) -> None:
+        """Called after every successful move of either seat, e.g. to track beliefs"""
+
+    def close(self) -> None:
+        """Release what the player holds outside Python (processes, shared memory)"""
+
+    @property
+    def counts(self) -> List[int]:
+        """Hand count vector indexed like ``Card``; the camel slot is the herd"""
+        return self.state.hands[self.seat]
+
+    @property
+    def hand(self) -> List[Card]:
+        return [card for card, n in zip(GOODS, self.counts) for _ in range(n)]
+
+    @property
+    def camels(self) -> List[Card]:
+        return [Card.CAMEL] * self.counts[CAMEL]
+
+    @property
+    def herd_size(self) -> int:
+        return self.counts[CAMEL]
+
+    @property
+    def hand_size(self) -> int:
+        return self.state.hand_size(self.seat)
+
+    @property
+    def score(self) -> int:
+        return self.state.points[self.seat]
+
+    def legal_mask(self) -> int:
+        return self.state.legal_mask(self.seat)
+
+    def count(self, card: Card) -> int:
+        return self.counts[CARD_INDEX[card]]
 
     def add_cards_to_hand(self, cards: List[Card]) -> None:
-        camels = [c for c in cards if c == Card.CAMEL]
-        goods = [c for c in cards if c != Card.CAMEL]
-        self.camels.extend(camels)
-        self.hand.extend(goods)
+        for c in cards:
+            self.state.add_to_hand(self.seat, CARD_INDEX[c])
 
     def describe_hand_str(self) -> str:
-        hand_str = ''
-        for c in Card:
-            c_name = c.name.capitalize()
-            hand_str += f'{c_name}: {self.hand.count(c)} |'
-        return hand_str + f' Camels: {len(self.camels)}'
-    
+        hand_str = ''.join(f'{c.name.capitalize()}: {n} |' for c, n in zip(GOODS, self.counts))
+        return hand_str + f' Camels: {self.herd_size}'
+
     def describe_hand(self) -> Dict[Card, int]:
-        d = {card: 0 for card in Card}
-        for c in self.hand:
-            d[c] += 1
-        d[Card.CAMEL] = len(self.camels)
-        return d
+        return dict(zip(CARDS, self.counts))
 
     @abstractmethod
     def take_turn(self, market: Market, deck: Deck) -> bool:
         pass
 
+    # The market and deck arguments are views over the same ``GameState`` the
+    # player is bound to, so actions are applied straight to the count vectors.
     def take_single_good(self, card: Card, market: Market, deck: Deck) -> bool:
-        if card not in market.goods():
-            return False
-        self.hand.append(card)
-        market.remove_cards([card])
-        market.add_cards(deck.draw())
-        return True
+        return self.play_action(CARD_INDEX[card])
 
     def take_camels(self, market: Market, deck: Deck) -> bool:
-        camels_in_market = market.camels()
-        if not camels_in_market:
-            return False
-        self.camels.extend(camels_in_market)
-        market.remove_cards(camels_in_market)
-        market.add_cards(deck.draw(len(camels_in_market)))
-        return True
+        return self.play_action(TAKE_CAMELS)
 
     def sell_goods(self, card: Card, number: int) -> bool:
-        if card not in self.hand or self.hand.count(card) < number:
+        good = CARD_INDEX[card]
+        gained = self.state.sell(self.seat, good, number)
+        if gained < 0:
             return False
-        for _ in range(number):
-            self.hand.remove(card)
-        tokens, bonus = sell_tokens_for(card, number)
-        self.tokens.extend(tokens)
-        if bonus > 0:
-            self.tokens.append(bonus)
-        self.transactions[card] += number
+        self.tokens.append(gained)
+        self.last_action = partial_sell(good, number) if self.counts[good] else SELL_OFFSET + good
         return True
 
     def exchange(self, market: Market, take_dict: Dict[Card, int], give_dict: Dict[Card, int]) -> bool:
         if not take_dict or not give_dict:
             return False
-        if sum(take_dict.values()) != sum(give_dict.values()):
-            return False
-        if any(c == Card.CAMEL for c in take_dict):
-            return False
-            
-        market_goods = {card: market.cards.count(card) for card in Card}
-        if any(market_goods[c] < nb for c, nb in take_dict.items()):
-            return False
-            
-        hand_goods = self.describe_hand()
-        if any(hand_goods[c] < nb for c, nb in give_dict.items()):
-            return False
-            
+        take, give = [0] * N_CARDS, [0] * N_CARDS
         for c, nb in take_dict.items():
-            for _ in range(nb):
-                self.hand.append(c)
-                market.cards.remove(c)
+            take[CARD_INDEX[c]] = nb
         for c, nb in give_dict.items():
-            for _ in range(nb):
-                self.hand.remove(c)
-                market.cards.append(c)
-        return True
\ No newline at end of file
+            give[CARD_INDEX[c]] = nb
+        # Every legal exchange is in the table
+        index = EXCHANGE_INDEX.get((tuple(take), tuple(give)))
+        return index is not None and self.play_action(EXCHANGE + index)
+
+    def play_action(self, action: int) -> bool:
+        """Play an encoded action (see actions.py)"""
+        if SELL_OFFSET <= action < EXCHANGE:
+            good = action - SELL_OFFSET
+            return self.sell_goods(GOODS[good], self.counts[good])
+        if not self.state.play(self.seat, action):
+            return False
+        self.last_action = action
+        return True
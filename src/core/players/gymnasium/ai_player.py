@@ -1,56 +1,94 @@
 # trained_ai_player.py
-from typing import List, Dict
+import inspect
+import json
+import os
+import random
+import zipfile
+from typing import Optional
 import numpy as np
+from gymnasium import spaces
 from stable_baselines3 import PPO
 from ...market import Market
-from ...deck import Deck, Card
+from ...deck import Deck
+from ...state import GameState
 from ..base_player import BasePlayer
-from .environment import JaipurEnv
+from .environment import action_mask
+from .observation import Observation, ObservationEncoder, has_belief
+from .inference import InferenceServer
+
+def load_model(path: str):
+    """Load a checkpoint saved by PPO or by sb3-contrib's MaskablePPO, whichever wrote it"""
+    if not os.path.exists(path) and os.path.exists(path + '.zip'):
+        path += '.zip'
+    with zipfile.ZipFile(path) as archive:
+        policy = json.loads(archive.read('data'))['policy_class'].get('__module__', '')
+    if policy.startswith('sb3_contrib'):
+        from sb3_contrib import MaskablePPO
+        return MaskablePPO.load(path)
+    return PPO.load(path)
+
 
 class TrainedAIPlayer(BasePlayer):
-    def __init__(self, name: str = "Trained AI", model_path: str = None):
+    def __init__(self, name: str = "Trained AI", model_path: str = None,
+                 server: Optional[InferenceServer] = None, rng: Optional[random.Random] = None, model=None):
         super().__init__(name)
-        self.env = JaipurEnv()
-        if model_path:
-            self.model = PPO.load(model_path)
-        else:
-            self.model = None
+        # Players sharing a server get their moves batched with other games
+        self.server = server
+        if server is not None:
+            model = server.model
+        elif model is None and model_path:
+            model = load_model(model_path)
+        self.model = model
+        self.rng = rng if rng is not None else random.Random()
+        self.illegal_moves = 0
+
+    @property
+    def model(self):
+        return self._model
+
+    @model.setter
+    def model(self, model) -> None:
+        self._model = model
+        # Models trained on a flat env (MlpPolicy) take the encoder's buffer as
+        # is, and models trained with belief features get them encoded
+        space = getattr(model, 'observation_space', None)
+        self.flat = isinstance(space, spaces.Box)
+        self.encoder = ObservationEncoder(belief=space is not None and has_belief(space))
+        self.masked = model is not None and 'action_masks' in inspect.signature(model.predict).parameters
+        if self.encoder.belief is not None:
+            self.encoder.belief.reset(self.state, self.seat)
+
+    def bind(self, state: GameState, seat: int) -> None:
+        super().bind(state, seat)
+        # BasePlayer.__init__ binds before the encoder exists
+        encoder = getattr(self, 'encoder', None)
+        if encoder is not None and encoder.belief is not None:
+            encoder.belief.reset(state, seat)
+
+    def observe(self, action: int, mover: int) -> None:
+        if self.encoder.belief is not None:
+            self.encoder.belief.update(self.state, action, mover)
 
     def take_turn(self, market: Market, deck: Deck) -> bool:
         if not self.model:
-            return False  # Fallback to random if no model loaded
-            
-        # Get current observation
+            return False
+
         obs = self._get_observation(market)
-        
-        # Get action from model
-        action, _ = self.model.predict(obs, deterministic=True)
-        
-        # Execute action
-        if action < 7:  # Take single good
-            card = list(Card)[action]
-            return self.take_single_good(card, market, deck)
-        elif action == 7:  # Take all camels
-            return self.take_camels(market, deck)
-        elif action < 14:  # Sell goods
-            card = list(Card)[action - 8]
-            count = self.hand.count(card)
-            if count > 0:
-                return self.sell_goods(card, count)
-        return False
-
-    def _get_observation(self, market: Market) -> Dict[str, np.ndarray]:
+        if self.server is not None:
+            action = self.server.predict(obs, action_mask(self.state, self.seat) if self.server.masked else None)
+        elif self.masked:
+            action, _ = self.model.predict(obs, deterministic=True, action_masks=action_mask(self.state, self.seat))
+        else:
+            action, _ = self.model.predict(obs, deterministic=True)
+
+        if self.play_action(int(action)):
+            return True
+        # An unmasked policy can pick an illegal move; play a random legal one
+        # rather than stalling the game
+        self.illegal_moves += 1
+        return self.play_action(self.rng.choice(self.state.legal_actions(self.seat)))
+
+    def _get_observation(self, market: Market) -> Observation:
         """Convert current game state to observation for the model"""
-        card_order = list(Card)
-        market_counts = [market.cards.count(c) for c in card_order]
-        hand_counts = [self.hand.count(c) for c in card_order]
-        
-        return {
-            'market': np.array(market_counts, dtype=np.int32),
-            'hand': np.array(hand_counts, dtype=np.int32),
-            'camels': np.array([len(self.camels)], dtype=np.int32),
-            'tokens': np.array([sum(self.tokens)], dtype=np.int32),
-            'opponent_camels': np.array([0], dtype=np.int32),  # Placeholder
-            'opponent_tokens': np.array([0], dtype=np.int32),  # Placeholder
-            'transactions': np.array([0]*7, dtype=np.int32)    # Placeholder
-        }
\ No newline at end of file
+        obs = self.encoder.encode(self.state, self.seat)
+        return obs.copy() if self.flat else self.encoder.as_dict()
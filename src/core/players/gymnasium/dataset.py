@@ -0,0 +1,354 @@
+# dataset.py
+import json
+import os
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+import gymnasium as gym
+import numpy as np
+from ...actions import N_ACTIONS, EXCHANGE, EXCHANGE_BIT
+from ...cards import CAMEL, N_GOODS
+from ...exchanges import MAX_EXCHANGE, legal_exchanges
+from ...state import HAND_LIMIT
+from ...game import Game
+from .observation import BELIEF_SIZE, BELIEF_SLICES, OBS_SLICES, OBS_SIZE, Observation, ObservationEncoder, has_belief
+
+# Records are fixed width: the observation flattened in observation-space
+# order (int16 counts, or float32 with the belief features, see obs_layout),
+# the engine's 15-bit legal mask (the exchange columns follow from the
+# market and hand in the observation, see expand_masks) and the policy target
+# as its POLICY_SIZE most likely actions.
+POLICY_SIZE = 16
+CORE_MASK = (EXCHANGE_BIT << 1) - 1
+VERSION = 2
+
+
+def obs_layout(space: Optional[gym.Space] = None) -> Tuple[Dict[str, slice], int, np.dtype]:
+    """Fields, size and dtype of the stored observations of an env's observation space
+
+    Without a space (or belief features) every field is a small count and
+    fits int16; the belief features are fractional and need float32.
+    """
+    if space is not None and has_belief(space):
+        return {**OBS_SLICES, **BELIEF_SLICES}, OBS_SIZE + BELIEF_SIZE, np.dtype(np.float32)
+    return dict(OBS_SLICES), OBS_SIZE, np.dtype(np.int16)
+
+
+def record_dtype(policy_size: int = POLICY_SIZE, obs_size: int = OBS_SIZE, obs_dtype: type = np.int16) -> np.dtype:
+    return np.dtype([
+        ('obs', obs_dtype, (obs_size,)),
+        ('mask', np.uint16),
+        ('action', np.int32),
+        ('reward', np.float32),
+        ('done', np.bool_),
+        ('policy_actions', np.int32, (policy_size,)),
+        ('policy_probs', np.float32, (policy_size,)),
+    ])
+
+
+def flatten_obs(obs: Observation, dtype: type = np.int16) -> np.ndarray:
+    if isinstance(obs, np.ndarray):  # already flat (ObservationEncoder.buffer)
+        return obs.astype(dtype)
+    keys = [key for key in (*OBS_SLICES, *BELIEF_SLICES) if key in obs]
+    return np.concatenate([obs[key] for key in keys]).astype(dtype)
+
+
+def unflatten_obs(flat: np.ndarray, slices: Optional[Dict[str, slice]] = None) -> Dict[str, np.ndarray]:
+    """Observation dict from flat rows: int32 counts, float32 belief features"""
+    return {key: flat[:, s].astype(np.float32 if key in BELIEF_SLICES else np.int32)
+            for key, s in (slices or OBS_SLICES).items()}
+
+
+def expand_masks(masks: np.ndarray, obs: np.ndarray) -> np.ndarray:
+    """(n, N_ACTIONS) bool masks from stored core masks and flat observations"""
+    n = len(masks)
+    full = np.zeros((n, N_ACTIONS), dtype=bool)
+    full[:, :EXCHANGE] = (masks[:, None].astype(np.int64) >> np.arange(EXCHANGE)) & 1
+    market = obs[:, OBS_SLICES['market']]
+    hand = obs[:, OBS_SLICES['hand']].astype(np.int64)
+    camels = obs[:, OBS_SLICES['camels']][:, 0]
+    for i in np.flatnonzero(masks & EXCHANGE_BIT):
+        give = [min(int(c), MAX_EXCHANGE) for c in hand[i, :N_GOODS]]
+        give.append(min(int(camels[i]), HAND_LIMIT - int(hand[i, :N_GOODS].sum()), MAX_EXCHANGE))
+        columns = legal_exchanges(tuple(int(c) for c in market[i]), tuple(give))
+        full[i, EXCHANGE + np.array(columns, dtype=np.int64)] = True
+    return full
+
+
+def dense_policy(actions: np.ndarray, probs: np.ndarray) -> np.ndarray:
+    """(n, N_ACTIONS) policy targets from the stored sparse ones"""
+    dense = np.zeros((len(actions), N_ACTIONS), dtype=np.float32)
+    rows, cols = np.nonzero(actions >= 0)
+    dense[rows, actions[rows, cols]] = probs[rows, cols]
+    return dense
+
+
+def _fill_record(row: np.void, obs: Observation, mask: int, action: int, reward: float, done: bool,
+                 policy: Optional[Dict[int, float]]) -> None:
+    row['obs'] = flatten_obs(obs, row['obs'].dtype)
+    row['mask'] = mask & CORE_MASK
+    row['action'] = action
+    row['reward'] = reward
+    row['done'] = done
+    actions, probs = row['policy_actions'], row['policy_probs']
+    actions[:] = -1
+    probs[:] = 0
+    if not policy:
+        actions[0], probs[0] = action, 1.0
+        return
+    top = sorted(policy.items(), key=lambda kv: kv[1], reverse=True)[:len(actions)]
+    total = sum(w for _, w in top)
+    for j, (a, w) in enumerate(top):
+        actions[j], probs[j] = a, w / total
+
+
+class Trajectory:
+    """Records of one game kept in memory, with the same ``add`` as ``DatasetWriter``"""
+
+    def __init__(self, policy_size: int = POLICY_SIZE, observation_space: Optional[gym.Space] = None) -> None:
+        _, obs_size, obs_dtype = obs_layout(observation_space)
+        self.rows = np.zeros(128, dtype=record_dtype(policy_size, obs_size, obs_dtype))
+        self.n = 0
+
+    def add(self, obs: Observation, mask: int, action: int, reward: float, done: bool,
+            policy: Optional[Dict[int, float]] = None) -> None:
+        if self.n == len(self.rows):
+            self.rows = np.concatenate([self.rows, np.zeros_like(self.rows)])
+        _fill_record(self.rows[self.n], obs, mask, action, reward, done, policy)
+        self.n += 1
+
+    @property
+    def records(self) -> np.ndarray:
+        return self.rows[:self.n]
+
+
+class DatasetWriter:
+    """Streams self-play records into fixed-size ``.npy`` shards.
+
+    Records are buffered in one preallocated shard-sized array and written
+    out as ``shard-NNNNNN.npy`` when it fills up (and on ``close()``), so
+    memory stays at one shard however long the run. Writing into an existing
+    dataset appends new shards. The observations are stored as laid out by
+    ``obs_layout(observation_space)``, which ``meta.json`` records.
+    """
+
+    def __init__(self, directory: str, shard_size: int = 1 << 16, policy_size: int = POLICY_SIZE,
+                 observation_space: Optional[gym.Space] = None) -> None:
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        slices, self.obs_size, self.obs_dtype = obs_layout(observation_space)
+        meta = {'version': VERSION, 'obs_size': self.obs_size, 'obs_dtype': self.obs_dtype.name,
+                'obs_fields': list(slices), 'policy_size': policy_size}
+        meta_path = os.path.join(directory, 'meta.json')
+        if os.path.exists(meta_path):
+            with open(meta_path) as f:
+                if json.load(f) != meta:
+                    raise ValueError(f'{directory} holds a dataset with a different record layout')
+        else:
+            with open(meta_path, 'w') as f:
+                json.dump(meta, f)
+        self.policy_size = policy_size
+        self.buffer = np.zeros(shard_size, dtype=record_dtype(policy_size, self.obs_size, self.obs_dtype))
+        self.n = 0
+        self.shards = len(_shard_paths(directory))
+        self.records = 0
+
+    def add(self, obs: Observation, mask: int, action: int, reward: float, done: bool,
+            policy: Optional[Dict[int, float]] = None) -> None:
+        """Record one ply; ``policy`` maps actions to weights (one-hot on ``action`` if None)"""
+        _fill_record(self.buffer[self.n], obs, mask, action, reward, done, policy)
+        self._advance(1)
+
+    def add_records(self, records: np.ndarray) -> None:
+        """Append an array of records already in ``record_dtype`` layout"""
+        i = 0
+        while i < len(records):
+            n = min(len(records) - i, len(self.buffer) - self.n)
+            self.buffer[self.n:self.n + n] = records[i:i + n]
+            i += n
+            self._advance(n)
+
+    def _advance(self, n: int) -> None:
+        self.n += n
+        self.records += n
+        if self.n == len(self.buffer):
+            self.flush()
+
+    def flush(self) -> None:
+        if not self.n:
+            return
+        path = os.path.join(self.directory, f'shard-{self.shards:06d}.npy')
+        # Write then rename, so readers never see half a shard
+        tmp = path + '.tmp'
+        with open(tmp, 'wb') as f:
+            np.save(f, self.buffer[:self.n])
+        os.replace(tmp, path)
+        self.shards += 1
+        self.n = 0
+
+    def close(self) -> None:
+        self.flush()
+
+    def __enter__(self) -> 'DatasetWriter':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+# A player failing this many moves in a row is stuck (e.g. a policy that keeps
+# choosing an illegal action) and the game is abandoned
+MAX_FAILED_MOVES = 100
+
+
+def record_game(game: Game, writer: Optional[Union[DatasetWriter, Trajectory]]) -> int:
+    """Play a headless game to the end, recording every ply; returns the plies played
+
+    Rewards follow ``JaipurEnv``: 0 until the last ply, which gets the final
+    point margin seen by the player who made it. Players with a
+    ``last_visits`` attribute (the MCTS players) give their root visit
+    counts as the policy target, the others a one-hot of their move. With
+    ``writer`` None the game is only played, nothing is encoded.
+    """
+    state = game.state
+    encoder = ObservationEncoder(np.int16) if writer is not None else None
+    rows: List[Any] = []
+    plies = failed = 0
+    while not game.is_game_over():
+        seat = game.turn % 2
+        player = game.players[seat]
+        if encoder is not None:
+            obs, mask = encoder.encode(state, seat).copy(), state.legal_mask(seat)
+        played = len(game.actions)
+        game.play_turn()
+        if len(game.actions) > played:
+            if encoder is not None:
+                rows.append((obs, mask, game.actions[-1], getattr(player, 'last_visits', None), seat))
+            plies += 1
+            failed = 0
+        else:
+            failed += 1
+            if failed >= MAX_FAILED_MOVES:
+                raise RuntimeError(f"{player.name} failed {failed} moves in a row")
+    final = state.final_points()
+    for i, (obs, mask, action, policy, seat) in enumerate(rows):
+        last = i == len(rows) - 1
+        reward = final[seat] - final[1 - seat] if last else 0.0
+        writer.add(obs, mask, action, reward, last, policy)
+    return plies
+
+
+class RecordEpisodes(gym.Wrapper):
+    """Records every ``JaipurEnv`` step into a ``DatasetWriter``
+
+    The writer must store the env's observations, i.e. be made with
+    ``observation_space=env.observation_space``. Stored rewards follow
+    ``record_game`` rather than the env's shaped ones: 0 until the game
+    ends, then the final point margin seen by the player who moved (the
+    env still returns its own rewards). A policy target can be set on
+    ``self.policy`` before calling ``step``.
+    """
+
+    def __init__(self, env: gym.Env, writer: DatasetWriter) -> None:
+        super().__init__(env)
+        _, obs_size, obs_dtype = obs_layout(env.observation_space)
+        if (writer.obs_size, writer.obs_dtype) != (obs_size, obs_dtype):
+            raise ValueError(f'the writer stores {writer.obs_size} {writer.obs_dtype} observation values, the env '
+                             f'gives {obs_size} {obs_dtype}: make it with observation_space=env.observation_space')
+        self.writer = writer
+        self.policy: Optional[Dict[int, float]] = None
+        self._obs: Optional[Observation] = None
+
+    def reset(self, **kwargs):
+        self._obs, info = self.env.reset(**kwargs)
+        return self._obs, info
+
+    def step(self, action):
+        env = self.env.unwrapped
+        seat, mask = env.current_player.seat, env.current_player.legal_mask()
+        obs, reward, terminated, truncated, info = self.env.step(action)
+        margin = 0.0
+        if terminated:
+            final = env.game.state.final_points()
+            margin = final[seat] - final[1 - seat]
+        self.writer.add(self._obs, mask, int(action), margin, terminated or truncated, self.policy)
+        self.policy = None
+        self._obs = obs
+        return obs, reward, terminated, truncated, info
+
+
+def _shard_paths(directory: str) -> List[str]:
+    return sorted(os.path.join(directory, name) for name in os.listdir(directory)
+                  if name.startswith('shard-') and name.endswith('.npy'))
+
+
+class DatasetReader:
+    """Shuffled minibatches from a dataset written by ``DatasetWriter``.
+
+    Shards are memory-mapped, never read whole: each pass takes them in
+    random groups of ``shards_in_memory``, shuffles the record indices of
+    the group and gathers every batch from the maps. Only those indices and
+    one batch are held in RAM, so the dataset can be far larger than memory
+    while records from different shards still end up in the same batch.
+    """
+
+    def __init__(self, directory: str, batch_size: int = 1024, shuffle: bool = True, shards_in_memory: int = 4,
+                 expand_masks: bool = False, flat_obs: bool = False, seed: Optional[int] = None) -> None:
+        with open(os.path.join(directory, 'meta.json')) as f:
+            meta = json.load(f)
+        if meta['version'] != VERSION:
+            raise ValueError(f'{directory} holds a version {meta["version"]} dataset, expected {VERSION}')
+        self.obs_slices = {key: {**OBS_SLICES, **BELIEF_SLICES}[key] for key in meta['obs_fields']}
+        self.paths = _shard_paths(directory)
+        self.sizes = [len(np.load(p, mmap_mode='r')) for p in self.paths]
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.shards_in_memory = shards_in_memory
+        self.expand_masks = expand_masks
+        # flat_obs gives (n, obs_size) float32 rows, as a flat JaipurEnv observes
+        self.flat_obs = flat_obs
+        self.rng = np.random.default_rng(seed)
+
+    def __len__(self) -> int:
+        return sum(self.sizes)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        order = self.rng.permutation(len(self.paths)) if self.shuffle else np.arange(len(self.paths))
+        leftover = None
+        for start in range(0, len(order), self.shards_in_memory):
+            group = order[start:start + self.shards_in_memory]
+            maps = [np.load(self.paths[i], mmap_mode='r') for i in group]
+            offsets = np.cumsum([0] + [len(m) for m in maps])
+            idx = self.rng.permutation(offsets[-1]) if self.shuffle else np.arange(offsets[-1])
+            for b in range(0, len(idx), self.batch_size):
+                records = self._gather(maps, offsets, idx[b:b + self.batch_size])
+                if leftover is not None:
+                    records, leftover = np.concatenate([leftover, records]), None
+                if len(records) < self.batch_size:
+                    leftover = records
+                    continue
+                yield self._batch(records[:self.batch_size])
+                if len(records) > self.batch_size:
+                    leftover = records[self.batch_size:]
+        if leftover is not None and len(leftover):
+            yield self._batch(leftover)
+
+    @staticmethod
+    def _gather(maps: List[np.ndarray], offsets: np.ndarray, idx: np.ndarray) -> np.ndarray:
+        shard = np.searchsorted(offsets, idx, side='right') - 1
+        parts = []
+        for j in np.unique(shard):
+            # Sorted reads keep the page cache happy; order inside a batch does not matter
+            rows = np.sort(idx[shard == j] - offsets[j])
+            parts.append(maps[j][rows])
+        return np.concatenate(parts)
+
+    def _batch(self, records: np.ndarray) -> Dict[str, Any]:
+        obs = records['obs']
+        return {
+            'obs': obs.astype(np.float32) if self.flat_obs else unflatten_obs(obs, self.obs_slices),
+            'masks': expand_masks(records['mask'], obs) if self.expand_masks else records['mask'],
+            'actions': records['action'],
+            'rewards': records['reward'],
+            'dones': records['done'],
+            'policy_actions': records['policy_actions'],
+            'policy_probs': records['policy_probs'],
+        }
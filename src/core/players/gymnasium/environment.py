@@ -2,67 +2,102 @@
 import gymnasium as gym
 from gymnasium import spaces
 import numpy as np
-from typing import Dict, Tuple, Optional
+from typing import Dict, Tuple, Optional, Union
 from ...game import Game
 from ...deck import Card
+from ...cards import CARDS, GOODS
+from ...state import GameState
+from ...actions import N_ACTIONS, EXCHANGE, EXCHANGE_BIT
+from .observation import ObservationEncoder, make_observation_space, make_flat_observation_space, observe
+
+
+def action_mask(state: GameState, seat: int) -> np.ndarray:
+    """Legal actions of ``seat`` as a bool array over every encoded action"""
+    mask = state.legal_mask(seat)
+    masks = np.zeros(N_ACTIONS, dtype=bool)
+    masks[:EXCHANGE] = [bool(mask >> a & 1) for a in range(EXCHANGE)]
+    if mask & EXCHANGE_BIT:
+        masks[EXCHANGE + np.array(state.legal_exchanges(seat))] = True
+    return masks
+
 
 class JaipurEnv(gym.Env):
     metadata = {'render_modes': ['human', 'ansi'], 'render_fps': 4}
 
-    def __init__(self, render_mode: str = None):
+    def __init__(self, render_mode: str = None, flat: bool = False, league=None, belief: bool = False):
         super().__init__()
-        self.game = Game(player_types=['ai', 'ai'])  # Both players are AI for training
+        # With a League (see league.py) the agent plays one random seat and
+        # the opponent's moves are made inside step by a league member;
+        # without one the agent plays both seats in turn
+        self.league = league
+        self.opponent_entry = None
+        self.game = Game(gui=None, player_types=['ai', 'ai'])  # Both players are AI for training
         self.current_player = self.game.players[0]
         self.opponent = self.game.players[1]
         self.render_mode = render_mode
 
-        # Define action space
-        # Actions: 
-        # 0-6: Take single good (Diamond, Gold, Silver, Cloth, Spice, Leather, Camel)
-        # 7: Take all camels
-        # 8-13: Sell goods (Diamond, Gold, Silver, Cloth, Spice, Leather)
-        # 14: Exchange (not implemented yet)
-        self.action_space = spaces.Discrete(15)
-
-        # Define observation space
-        # Observation includes:
-        # - Market goods counts (7 cards)
-        # - Player hand counts (7 cards)
-        # - Player camel count
-        # - Player tokens
-        # - Opponent visible info (camel count, tokens)
-        # - Transaction counts (7 cards)
-        self.observation_space = spaces.Dict({
-            'market': spaces.Box(low=0, high=20, shape=(7,), dtype=np.int32),
-            'hand': spaces.Box(low=0, high=10, shape=(7,), dtype=np.int32),
-            'camels': spaces.Box(low=0, high=20, shape=(1,), dtype=np.int32),
-            'tokens': spaces.Box(low=0, high=100, shape=(1,), dtype=np.int32),
-            'opponent_camels': spaces.Box(low=0, high=20, shape=(1,), dtype=np.int32),
-            'opponent_tokens': spaces.Box(low=0, high=100, shape=(1,), dtype=np.int32),
-            'transactions': spaces.Box(low=0, high=5, shape=(7,), dtype=np.int32)
-        })
-
-    def _get_obs(self) -> Dict[str, np.ndarray]:
-        """Convert game state to observation vector"""
-        card_order = list(Card)
-        market_counts = [self.game.market.cards.count(c) for c in card_order]
-        hand_counts = [self.current_player.hand.count(c) for c in card_order]
-        
-        return {
-            'market': np.array(market_counts, dtype=np.int32),
-            'hand': np.array(hand_counts, dtype=np.int32),
-            'camels': np.array([len(self.current_player.camels)], dtype=np.int32),
-            'tokens': np.array([sum(self.current_player.tokens)], dtype=np.int32),
-            'opponent_camels': np.array([len(self.opponent.camels)], dtype=np.int32),
-            'opponent_tokens': np.array([sum(self.opponent.tokens)], dtype=np.int32),
-            'transactions': np.array([self.game.transactions[c] for c in card_order], dtype=np.int32)
-        }
+        self.action_space = spaces.Discrete(N_ACTIONS)
+        # flat=True gives one float32 vector per observation, for MlpPolicy
+        self.flat = flat
+        # belief=True adds what each seat can infer about the opponent's hand
+        self.observation_space = (make_flat_observation_space(belief=belief) if flat
+                                  else make_observation_space(belief))
+        # One encoder per seat, updated in place after every move
+        self.encoders = [ObservationEncoder(belief=belief), ObservationEncoder(belief=belief)]
+        self._encode()
+
+    def _encode(self) -> None:
+        for seat, encoder in enumerate(self.encoders):
+            encoder.encode(self.game.state, seat)
+
+    def _get_obs(self) -> Union[Dict[str, np.ndarray], np.ndarray]:
+        """Observation of the player to move"""
+        encoder = self.encoders[self.current_player.seat]
+        return encoder.buffer.copy() if self.flat else encoder.as_dict()
+
+    def action_masks(self) -> np.ndarray:
+        """Legal actions for the player to move, as used by sb3-contrib's MaskablePPO"""
+        return action_mask(self.game.state, self.current_player.seat)
+
+    def _release_opponent(self) -> None:
+        """Hand the league opponent of the finished game back to the league"""
+        if self.opponent_entry is not None:
+            self.opponent.close()
+            self.league.release(self.opponent_entry)
+            self.opponent_entry = None
+
+    def _seat_opponent(self) -> None:
+        seat = int(self.np_random.integers(2))
+        self.opponent_entry = self.league.sample(self.np_random)
+        opponent = self.league.make_player(self.opponent_entry, self.game.rng)
+        opponent.bind(self.game.state, 1 - seat)
+        self.game.players[1 - seat] = opponent
+        self.current_player, self.opponent = self.game.players[seat], opponent
+
+    def _opponent_turn(self) -> None:
+        """Let the league opponent move until it is the agent's turn"""
+        while not self.game.is_game_over() and self.game.turn % 2 == self.opponent.seat:
+            played = len(self.game.actions)
+            self.game.play_turn()
+            if len(self.game.actions) > played:
+                for encoder in self.encoders:
+                    encoder.update(self.game.state, self.game.actions[-1], self.opponent.seat)
+            else:
+                # A stuck opponent passes rather than stall the episode
+                self.game.turn += 1
 
     def reset(self, seed=None, options=None) -> Tuple[Dict, Dict]:
         super().reset(seed=seed)
-        self.game = Game(player_types=['ai', 'ai'])
+        self._release_opponent()
+        # The game is dealt from the env's seeded generator, so reset(seed=...) is reproducible
+        self.game = Game(gui=None, player_types=['ai', 'ai'], seed=int(self.np_random.integers(1 << 63)))
         self.current_player = self.game.players[0]
         self.opponent = self.game.players[1]
+        if self.league is not None:
+            self._seat_opponent()
+        self._encode()
+        if self.league is not None:
+            self._opponent_turn()
         observation = self._get_obs()
         info = {}
         
@@ -77,46 +112,68 @@ class JaipurEnv(gym.Env):
         # 0-6: Take single good (Diamond, Gold, Silver, Cloth, Spice, Leather, Camel)
         # 7: Take all camels
         # 8-13: Sell goods (Diamond, Gold, Silver, Cloth, Spice, Leather)
-        # 14: Exchange (not implemented yet)
-        
+        # 14+: Exchanges (see core/exchanges.py)
+
         terminated = False
         truncated = False
         reward = 0
+        success = False
         info = {}
-        
+
         try:
             # Execute action
             if action < 7:  # Take single good
-                card = list(Card)[action]
-                if self.current_player.take_single_good(card, self.game.market, self.game.deck):
+                card = CARDS[action]
+                success = self.current_player.take_single_good(card, self.game.market, self.game.deck)
+                if success:
                     reward = 0.1  # Small reward for successful action
             elif action == 7:  # Take all camels
-                if self.current_player.take_camels(self.game.market, self.game.deck):
+                success = self.current_player.take_camels(self.game.market, self.game.deck)
+                if success:
                     reward = 0.2
             elif action < 14:  # Sell goods
-                card = list(Card)[action - 8]
-                count = self.current_player.hand.count(card)
-                if count > 0:
-                    if self.current_player.sell_goods(card, count):
-                        reward = count * 0.5  # Reward based on number of cards sold
-            
-            # Switch players
-            self.current_player, self.opponent = self.opponent, self.current_player
-            
-            # Check if game is over
-            if self.game.is_game_over():
-                terminated = True
-                # Calculate final reward based on score difference
-                my_score = sum(self.current_player.tokens) + (5 if len(self.current_player.camels) > len(self.opponent.camels) else 0)
-                opp_score = sum(self.opponent.tokens) + (5 if len(self.opponent.camels) > len(self.current_player.camels) else 0)
-                reward = my_score - opp_score
-            
-            observation = self._get_obs()
-            
+                card = GOODS[action - 8]
+                count = self.current_player.count(card)
+                success = self.current_player.sell_goods(card, count)
+                if success:
+                    reward = count * 0.5  # Reward based on number of cards sold
+            else:  # Exchange
+                success = self.current_player.play_action(action)
+                if success:
+                    reward = 0.1
         except Exception as e:
+            success = False
             reward = -1  # Penalize invalid actions
             info['error'] = str(e)
-        
+
+        if success:
+            self.game.record(self.current_player.last_action, self.current_player.seat)
+            for encoder in self.encoders:
+                encoder.update(self.game.state, self.current_player.last_action, self.current_player.seat)
+            self.game.turn += 1
+            if self.league is not None:
+                self._opponent_turn()
+        else:
+            # Nothing was played: the same player moves again
+            info['invalid_action'] = True
+
+        # Check if game is over
+        if self.game.is_game_over():
+            terminated = True
+            # Final reward is the score difference seen by the player who just moved
+            final = self.game.state.final_points()
+            reward = final[self.current_player.seat] - final[self.opponent.seat]
+            if self.league is not None:
+                self.league.report(self.opponent_entry, reward)
+                info['opponent'] = self.opponent_entry.name
+
+        # Without a league the agent plays whichever seat is to move
+        if self.league is None:
+            seat = self.game.turn % 2
+            self.current_player, self.opponent = self.game.players[seat], self.game.players[1 - seat]
+
+        observation = self._get_obs()
+
         if self.render_mode == 'human':
             self.render()
             
@@ -127,10 +184,10 @@ class JaipurEnv(gym.Env):
             print(f"\nCurrent Player: {self.current_player.name}")
             print(f"Market: {[c.name for c in self.game.market.cards]}")
             print(f"Hand: {[c.name for c in self.current_player.hand]}")
-            print(f"Camels: {len(self.current_player.camels)}")
-            print(f"Tokens: {sum(self.current_player.tokens)}")
+            print(f"Camels: {self.current_player.herd_size}")
+            print(f"Tokens: {self.current_player.score}")
         elif self.render_mode == 'ansi':
             return str(self.game)
 
     def close(self):
-        pass
\ No newline at end of file
+        self._release_opponent()
\ No newline at end of file
@@ -0,0 +1,157 @@
+# inference.py
+import asyncio
+import inspect
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional, Tuple, Union
+import numpy as np
+
+
+class InferenceServer:
+    """Batches policy queries from many concurrent games into one ``predict`` call.
+
+    Games running on threads call ``predict`` (or ``await predict_async``
+    from asyncio) with one observation; a background thread collects
+    requests until ``max_batch`` are waiting or ``max_wait`` seconds have
+    passed since the first one, stacks them, runs the model once and hands
+    each caller its action. Masks are forwarded to models whose ``predict``
+    takes ``action_masks`` (sb3-contrib's MaskablePPO). Once closed, the
+    server fails pending and new requests with ``RuntimeError`` until it is
+    started again.
+    """
+
+    def __init__(self, model: Any, max_batch: int = 256, max_wait: float = 0.002,
+                 deterministic: bool = True, history: int = 100_000) -> None:
+        self.model = model
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.deterministic = deterministic
+        self.masked = 'action_masks' in inspect.signature(model.predict).parameters
+        self.requests: queue.Queue = queue.Queue()
+        self.latencies: deque = deque(maxlen=history)
+        self.batch_sizes: deque = deque(maxlen=history)
+        self.served = 0
+        self.batches = 0
+        self.started = time.perf_counter()
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+        # Orders submits against close, so no request lands behind the sentinel
+        self._lock = threading.Lock()
+
+    def start(self) -> 'InferenceServer':
+        if self._thread is None:
+            self._closed = False
+            self.started = time.perf_counter()
+            self._thread = threading.Thread(target=self._serve, name='inference-server', daemon=True)
+            self._thread.start()
+        return self
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+            self.requests.put(None)
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        # Whatever the serving thread left behind will never run
+        while True:
+            try:
+                item = self.requests.get_nowait()
+            except queue.Empty:
+                break
+            if item is not None:
+                item[3].set_exception(RuntimeError('inference server closed'))
+
+    def __enter__(self) -> 'InferenceServer':
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def submit(self, obs: Union[Dict[str, np.ndarray], np.ndarray], mask: Optional[np.ndarray] = None) -> Future:
+        future: Future = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError('inference server closed')
+            self.requests.put((obs, mask, time.perf_counter(), future))
+        return future
+
+    def predict(self, obs: Union[Dict[str, np.ndarray], np.ndarray], mask: Optional[np.ndarray] = None) -> int:
+        """Action for one observation; blocks until its batch has run"""
+        self._start_once()
+        return self.submit(obs, mask).result()
+
+    async def predict_async(self, obs: Union[Dict[str, np.ndarray], np.ndarray], mask: Optional[np.ndarray] = None) -> int:
+        self._start_once()
+        return await asyncio.wrap_future(self.submit(obs, mask))
+
+    def _start_once(self) -> None:
+        # A server never started starts on first use; a closed one stays closed
+        with self._lock:
+            if self._thread is None and not self._closed:
+                self.start()
+
+    def _collect(self) -> List[Tuple]:
+        first = self.requests.get()
+        if first is None:
+            return []
+        batch = [first]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch:
+            timeout = deadline - time.perf_counter()
+            try:
+                item = self.requests.get(timeout=timeout) if timeout > 0 else self.requests.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                self.requests.put(None)
+                break
+            batch.append(item)
+        return batch
+
+    def _serve(self) -> None:
+        while not self._closed:
+            batch = self._collect()
+            if not batch:
+                continue
+            first = batch[0][0]
+            if isinstance(first, dict):
+                obs = {key: np.stack([o[key] for o, _, _, _ in batch]) for key in first}
+            else:
+                obs = np.stack([o for o, _, _, _ in batch])
+            try:
+                if self.masked and batch[0][1] is not None:
+                    masks = np.stack([m for _, m, _, _ in batch])
+                    actions, _ = self.model.predict(obs, deterministic=self.deterministic, action_masks=masks)
+                else:
+                    actions, _ = self.model.predict(obs, deterministic=self.deterministic)
+            except Exception as e:
+                for _, _, _, future in batch:
+                    future.set_exception(e)
+                continue
+            now = time.perf_counter()
+            for (_, _, sent, future), action in zip(batch, np.asarray(actions).reshape(len(batch))):
+                self.latencies.append(now - sent)
+                future.set_result(int(action))
+            self.served += len(batch)
+            self.batches += 1
+            self.batch_sizes.append(len(batch))
+
+    def stats(self) -> Dict[str, float]:
+        """Throughput, batch size and latency percentiles (ms) over the recent history"""
+        elapsed = time.perf_counter() - self.started
+        latencies = np.array(self.latencies) * 1000 if self.latencies else np.zeros(1)
+        p50, p90, p99 = np.percentile(latencies, [50, 90, 99])
+        return {
+            'requests': self.served,
+            'batches': self.batches,
+            'mean_batch': float(np.mean(self.batch_sizes)) if self.batch_sizes else 0.0,
+            'requests_per_s': self.served / elapsed if elapsed else 0.0,
+            'p50_ms': float(p50),
+            'p90_ms': float(p90),
+            'p99_ms': float(p99),
+            'max_ms': float(latencies.max()),
+        }
@@ -0,0 +1,174 @@
+# league.py
+import io
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, List, Optional
+import gymnasium as gym
+import numpy as np
+from stable_baselines3.common.vec_env import DummyVecEnv
+from ..base_player import BasePlayer
+from ..registry import make_player
+from .ai_player import TrainedAIPlayer, load_model
+from .environment import JaipurEnv
+from .inference import InferenceServer
+
+
+@dataclass
+class Opponent:
+    """One league member: a registry kind, or a frozen policy behind a shared InferenceServer"""
+    name: str
+    weight: float = 1.0
+    kind: Optional[str] = None
+    server: Optional[InferenceServer] = None
+    games: int = 0
+    # Learner results against this opponent: 1 win, 0.5 draw, 0 loss
+    score: float = 0.0
+    # Games sampled against this member and not yet released; a dropped
+    # snapshot keeps its server until the last of them is
+    players: int = 0
+
+    @property
+    def win_rate(self) -> float:
+        """Learner's score rate against this opponent (0.5 before any game)"""
+        return (self.score + 0.5) / (self.games + 1)
+
+
+@dataclass
+class League:
+    """Pool of opponents for ``JaipurEnv(league=...)``.
+
+    Every episode the env samples an opponent, proportional to its weight
+    or, with ``prioritized``, also to how often it still beats the learner
+    (prioritized fictitious self-play). Snapshots of the learner are
+    frozen copies served by one ``InferenceServer`` each, so their moves in
+    every env of a ``LeagueVecEnv`` run as a single batch. At most
+    ``max_snapshots`` are kept; the oldest is dropped first, and its server
+    closed once no env is still playing against it (see ``release``).
+    """
+    prioritized: bool = False
+    max_snapshots: int = 10
+    opponents: List[Opponent] = field(default_factory=list)
+
+    def __post_init__(self) -> None:
+        self._lock = threading.Lock()
+        # Snapshots dropped from the pool while envs still play against them
+        self._dropped: List[Opponent] = []
+        # Snapshots ever added, for default names that stay unique after evictions
+        self._snapshots = 0
+
+    def add(self, kind: str, weight: float = 1.0) -> Opponent:
+        """Add a registry kind (``ai``, ``mcts:200``, ...); ``trained:PATH`` becomes a batched snapshot"""
+        name, _, arg = kind.partition(':')
+        if name == 'trained' and arg:
+            return self.add_snapshot(load_model(arg), weight, name=kind)
+        opponent = Opponent(kind, weight, kind=kind)
+        self.opponents.append(opponent)
+        return opponent
+
+    def add_snapshot(self, model: Any, weight: float = 1.0, name: Optional[str] = None) -> Opponent:
+        """Freeze a copy of ``model`` (e.g. the PPO being trained) as a new opponent"""
+        buffer = io.BytesIO()
+        model.save(buffer)
+        buffer.seek(0)
+        frozen = type(model).load(buffer, device='cpu')
+        retired = None
+        with self._lock:
+            snapshots = [o for o in self.opponents if o.server is not None]
+            if len(snapshots) >= self.max_snapshots:
+                self.opponents.remove(snapshots[0])
+                if snapshots[0].players:
+                    self._dropped.append(snapshots[0])
+                else:
+                    retired = snapshots[0]
+            opponent = Opponent(name or f'snapshot-{self._snapshots}', weight, server=InferenceServer(frozen).start())
+            self._snapshots += 1
+            self.opponents.append(opponent)
+        if retired is not None:
+            retired.server.close()
+        return opponent
+
+    def sample(self, rng: np.random.Generator) -> Opponent:
+        """Draw the opponent of a new game; ``release`` it when the game is over"""
+        with self._lock:
+            weights = np.array([o.weight * ((1 - o.win_rate) if self.prioritized else 1) for o in self.opponents])
+            opponent = self.opponents[rng.choice(len(self.opponents), p=weights / weights.sum())]
+            opponent.players += 1
+            return opponent
+
+    def make_player(self, opponent: Opponent, rng: random.Random) -> BasePlayer:
+        if opponent.server is not None:
+            return TrainedAIPlayer(opponent.name, server=opponent.server, rng=random.Random(rng.getrandbits(64)))
+        return make_player(opponent.kind, 2, rng)
+
+    def release(self, opponent: Opponent) -> None:
+        """A game against ``opponent`` is over; closes a dropped snapshot's server after its last one"""
+        with self._lock:
+            opponent.players -= 1
+            if opponent.players or opponent not in self._dropped:
+                return
+            self._dropped.remove(opponent)
+        opponent.server.close()
+
+    def report(self, opponent: Opponent, margin: float) -> None:
+        """Record a finished game; ``margin`` is the learner's final point difference"""
+        with self._lock:
+            opponent.games += 1
+            opponent.score += 1.0 if margin > 0 else 0.5 if margin == 0 else 0.0
+
+    def close(self) -> None:
+        with self._lock:
+            opponents, self._dropped = self.opponents + self._dropped, []
+        for opponent in opponents:
+            if opponent.server is not None:
+                opponent.server.close()
+
+
+class LeagueVecEnv(DummyVecEnv):
+    """``DummyVecEnv`` stepping its envs on a thread pool.
+
+    Game logic still takes turns on the GIL, but while one env waits for a
+    snapshot opponent's move the others keep playing, so the league's
+    servers see requests from every env at once and batch them.
+    """
+
+    def __init__(self, env_fns: List[Callable[[], gym.Env]], threads: Optional[int] = None) -> None:
+        super().__init__(env_fns)
+        self.pool = ThreadPoolExecutor(threads or self.num_envs)
+
+    def _reset_env(self, env_idx: int) -> None:
+        maybe_options = {"options": self._options[env_idx]} if self._options[env_idx] else {}
+        obs, self.reset_infos[env_idx] = self.envs[env_idx].reset(seed=self._seeds[env_idx], **maybe_options)
+        self._save_obs(env_idx, obs)
+
+    def _step_env(self, env_idx: int) -> None:
+        obs, self.buf_rews[env_idx], terminated, truncated, self.buf_infos[env_idx] = self.envs[env_idx].step(
+            self.actions[env_idx])
+        self.buf_dones[env_idx] = terminated or truncated
+        self.buf_infos[env_idx]["TimeLimit.truncated"] = truncated and not terminated
+        if self.buf_dones[env_idx]:
+            self.buf_infos[env_idx]["terminal_observation"] = obs
+            obs, self.reset_infos[env_idx] = self.envs[env_idx].reset()
+        self._save_obs(env_idx, obs)
+
+    def reset(self):
+        list(self.pool.map(self._reset_env, range(self.num_envs)))
+        self._reset_seeds()
+        self._reset_options()
+        return self._obs_from_buf()
+
+    def step_wait(self):
+        list(self.pool.map(self._step_env, range(self.num_envs)))
+        return self._obs_from_buf(), np.copy(self.buf_rews), np.copy(self.buf_dones), [dict(i) for i in self.buf_infos]
+
+    def close(self) -> None:
+        self.pool.shutdown()
+        super().close()
+
+
+def make_league_env(league: League, n_envs: int, flat: bool = False, threads: Optional[int] = None,
+                    belief: bool = False) -> LeagueVecEnv:
+    """``n_envs`` JaipurEnvs playing against ``league``, stepped on a thread pool"""
+    return LeagueVecEnv([lambda: JaipurEnv(flat=flat, league=league, belief=belief) for _ in range(n_envs)],
+                        threads)
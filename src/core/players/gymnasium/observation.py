@@ -0,0 +1,157 @@
+# observation.py
+from typing import Dict, List, Tuple, Union
+import numpy as np
+from gymnasium import spaces
+from ...cards import CAMEL, N_GOODS
+from ...state import GameState
+from ...belief import BeliefTracker
+from ...actions import SELL_OFFSET, EXCHANGE, N_ACTIONS
+from ...tokens import TOP_TOKEN, BONUS_SIZES
+
+# Observation fields in order, with their size and upper bound:
+# - Market goods counts (7 cards)
+# - Player hand counts (7 cards, camel slot 0)
+# - Player camel count
+# - Player tokens
+# - Opponent visible info (camel count, tokens)
+# - Transaction counts (7 cards)
+# - Next token of every goods stack and tokens left in each bonus pile
+FIELDS: List[Tuple[str, int, int]] = [
+    ('market', 7, 20),
+    ('hand', 7, 10),
+    ('camels', 1, 20),
+    ('tokens', 1, 100),
+    ('opponent_camels', 1, 20),
+    ('opponent_tokens', 1, 100),
+    ('transactions', 7, 10),
+    ('goods_tokens', N_GOODS, 7),
+    ('bonus_tokens', len(BONUS_SIZES), 7),
+]
+# Optional belief features (see belief.py), after the others in flat vectors:
+# expected goods counts in the opponent's hand and in the deck
+BELIEF_FIELDS: List[Tuple[str, int, int]] = [
+    ('opponent_goods', N_GOODS, 7),
+    ('deck_goods', N_GOODS, 10),
+]
+OBS_SLICES: Dict[str, slice] = {}
+BELIEF_SLICES: Dict[str, slice] = {}
+_offset = 0
+for _slices, _fields in ((OBS_SLICES, FIELDS), (BELIEF_SLICES, BELIEF_FIELDS)):
+    for _key, _size, _ in _fields:
+        _slices[_key] = slice(_offset, _offset + _size)
+        _offset += _size
+BELIEF_SIZE = sum(size for _, size, _ in BELIEF_FIELDS)
+OBS_SIZE = _offset - BELIEF_SIZE
+OBS_HIGH = np.concatenate([np.full(size, high) for _, size, high in FIELDS + BELIEF_FIELDS])
+# Either layout: the Dict of make_observation_space or one flat vector
+Observation = Union[Dict[str, np.ndarray], np.ndarray]
+
+
+def make_observation_space(belief: bool = False) -> spaces.Dict:
+    fields = {key: spaces.Box(low=0, high=high, shape=(size,), dtype=np.int32) for key, size, high in FIELDS}
+    if belief:
+        fields.update((key, spaces.Box(low=0, high=high, shape=(size,), dtype=np.float32))
+                      for key, size, high in BELIEF_FIELDS)
+    return spaces.Dict(fields)
+
+
+def make_flat_observation_space(dtype: type = np.float32, belief: bool = False) -> spaces.Box:
+    """The same fields concatenated in ``FIELDS`` order, for ``MlpPolicy``"""
+    size = OBS_SIZE + BELIEF_SIZE if belief else OBS_SIZE
+    return spaces.Box(low=0, high=OBS_HIGH[:size].astype(dtype), shape=(size,), dtype=dtype)
+
+
+def has_belief(space: spaces.Space) -> bool:
+    """Whether a model's observation space includes the belief features"""
+    if isinstance(space, spaces.Dict):
+        return BELIEF_FIELDS[0][0] in space.spaces
+    return space.shape == (OBS_SIZE + BELIEF_SIZE,)
+
+
+class ObservationEncoder:
+    """Observation of one seat written into a preallocated flat buffer.
+
+    ``encode`` fills every field; ``update`` rewrites only the fields the
+    given action can have changed, so an env keeping one encoder per seat
+    touches a handful of entries per step. ``fields`` are NumPy views of
+    the buffer, one per key of ``make_observation_space`` (the Dict view),
+    so both layouts always agree without copying.
+
+    With ``belief`` the encoder also tracks what its seat knows about the
+    opponent's hand; that needs every move of both seats passed to
+    ``update`` (``encode`` keeps the history while it is consistent).
+    """
+
+    def __init__(self, dtype: type = np.float32, belief: bool = False) -> None:
+        self.buffer = np.zeros(OBS_SIZE + BELIEF_SIZE if belief else OBS_SIZE, dtype=dtype)
+        slices = dict(OBS_SLICES, **BELIEF_SLICES) if belief else OBS_SLICES
+        self.fields = {key: self.buffer[s] for key, s in slices.items()}
+        self.belief = BeliefTracker() if belief else None
+        self.seat = 0
+
+    def encode(self, state: GameState, seat: int) -> np.ndarray:
+        self.seat = seat
+        self._market(state)
+        self._hand(state)
+        self._camels(state, seat)
+        self._camels(state, 1 - seat)
+        self._sales(state)
+        if self.belief is not None:
+            self.belief.sync(state, seat)
+            self._belief()
+        return self.buffer
+
+    def update(self, state: GameState, action: int, mover: int) -> np.ndarray:
+        """Bring the buffer up to date after ``mover`` played ``action``"""
+        if action >= N_ACTIONS:  # replay-only partial sells
+            return self.encode(state, self.seat)
+        if SELL_OFFSET <= action < EXCHANGE:
+            self._sales(state)
+        else:
+            self._market(state)
+            self._camels(state, mover)
+        if mover == self.seat:
+            self._hand(state)
+        if self.belief is not None:
+            self.belief.update(state, action, mover)
+            self._belief()
+        return self.buffer
+
+    def as_dict(self) -> Dict[str, np.ndarray]:
+        """Copy of the observation in the ``make_observation_space`` layout"""
+        obs = {key: self.fields[key].astype(np.int32) for key, _, _ in FIELDS}
+        if self.belief is not None:
+            obs.update((key, self.fields[key].astype(np.float32)) for key, _, _ in BELIEF_FIELDS)
+        return obs
+
+    def _market(self, state: GameState) -> None:
+        self.fields['market'][:] = state.market
+
+    def _hand(self, state: GameState) -> None:
+        hand = self.fields['hand']
+        hand[:] = state.hands[self.seat]
+        hand[CAMEL] = 0
+
+    def _camels(self, state: GameState, seat: int) -> None:
+        key = 'camels' if seat == self.seat else 'opponent_camels'
+        self.fields[key][0] = state.hands[seat][CAMEL]
+
+    def _sales(self, state: GameState) -> None:
+        fields, sold = self.fields, state.sold
+        fields['tokens'][0] = state.points[self.seat]
+        fields['opponent_tokens'][0] = state.points[1 - self.seat]
+        fields['transactions'][:N_GOODS] = sold
+        fields['goods_tokens'][:] = [TOP_TOKEN[g][sold[g]] for g in range(N_GOODS)]
+        fields['bonus_tokens'][:] = [size - pos for size, pos in zip(BONUS_SIZES, state.bonus_pos)]
+
+    def _belief(self) -> None:
+        hand = self.belief.expected_hand()
+        self.fields['opponent_goods'][:] = hand
+        self.fields['deck_goods'][:] = [p - h + n for p, h, n in zip(self.belief.pool, hand, self.belief.net)]
+
+
+def observe(state: GameState, seat: int) -> Dict[str, np.ndarray]:
+    """Observation of ``state`` for the player in ``seat`` (see make_observation_space)"""
+    encoder = ObservationEncoder(np.int32)
+    encoder.encode(state, seat)
+    return encoder.fields
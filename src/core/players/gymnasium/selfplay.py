@@ -0,0 +1,113 @@
+# selfplay.py
+import multiprocessing as mp
+import os
+import queue
+import random
+import time
+from typing import Any, Callable, Dict, List, Optional
+from ...game import Game
+from ...replay import dump
+from .dataset import DatasetWriter, Trajectory, record_game
+
+
+def _worker(worker_id: int, workers: int, games: int, seed: int, player_types: List[str],
+            results: mp.Queue, record: bool) -> None:
+    # Agents that run torch must not start one thread per core in every worker
+    os.environ.setdefault('OMP_NUM_THREADS', '1')
+    for i in range(worker_id, games, workers):
+        # Seats alternate so neither agent always moves first
+        types = player_types if i % 2 == 0 else player_types[::-1]
+        game = Game(gui=None, player_types=types, seed=seed + i)
+        trajectory = Trajectory() if record else None
+        try:
+            plies = record_game(game, trajectory)
+        except RuntimeError as e:
+            results.put(('error', i, str(e)))
+            continue
+        finally:
+            game.close()
+        points = game.state.final_points()
+        if i % 2:
+            points = points[::-1]
+        records = trajectory.records.copy() if trajectory is not None else None
+        results.put(('game', plies, points, game.to_replay(), records))
+    results.put(('done', worker_id, None))
+
+
+def run_selfplay(games: int, player_types: List[str], workers: Optional[int] = None, seed: Optional[int] = None,
+                 out: Optional[str] = None, replays: Optional[str] = None, shard_size: int = 1 << 16,
+                 report_every: float = 5.0, log: Callable[[str], None] = print) -> Dict[str, Any]:
+    """Play ``games`` headless games over a pool of worker processes
+
+    Workers play their share of the games and put each finished trajectory
+    on a bounded queue. This process is the only writer: it appends the
+    records to the dataset in ``out`` and the replays to the file
+    ``replays``. The queue bound caps memory however slow the writer gets.
+    Game ``i`` is dealt from ``seed + i``, so a run is reproducible
+    whatever the number of workers.
+    """
+    workers = workers or os.cpu_count() or 1
+    seed = seed if seed is not None else random.getrandbits(48)
+    results = mp.Queue(maxsize=4 * workers)
+    # Not daemonic: agents such as parallel_mcts start process pools of their own
+    procs = [mp.Process(target=_worker, args=(w, workers, games, seed, player_types, results, out is not None))
+             for w in range(workers)]
+    for p in procs:
+        p.start()
+
+    writer = DatasetWriter(out, shard_size) if out else None
+    replay_file = open(replays, 'ab') if replays else None
+    played = plies = errors = done = 0
+    wins = [0, 0]
+    start = last_report = time.perf_counter()
+    try:
+        while done < workers:
+            try:
+                kind, a, b, *rest = results.get(timeout=1.0)
+            except queue.Empty:
+                dead = [p for p in procs if p.exitcode not in (None, 0)]
+                if dead:
+                    raise RuntimeError(f"Self-play worker exited with code {dead[0].exitcode}")
+                continue
+            if kind == 'done':
+                done += 1
+            elif kind == 'error':
+                errors += 1
+                log(f"Game {a} abandoned: {b}")
+            else:
+                replay, records = rest
+                played += 1
+                plies += a
+                if b[0] != b[1]:
+                    wins[0 if b[0] > b[1] else 1] += 1
+                if writer is not None:
+                    writer.add_records(records)
+                if replay_file is not None:
+                    dump([replay], replay_file)
+            now = time.perf_counter()
+            if now - last_report >= report_every:
+                last_report = now
+                elapsed = now - start
+                log(f"{played}/{games} games | {played / elapsed:,.1f} games/s | {plies / elapsed:,.0f} plies/s")
+    except BaseException:
+        for p in procs:
+            p.terminate()
+        raise
+    finally:
+        for p in procs:
+            p.join()
+        if writer is not None:
+            writer.close()
+        if replay_file is not None:
+            replay_file.close()
+
+    elapsed = time.perf_counter() - start
+    return {
+        'games': played,
+        'plies': plies,
+        'errors': errors,
+        'seconds': elapsed,
+        'games_per_s': played / elapsed,
+        'plies_per_s': plies / elapsed,
+        'wins': wins,
+    }
@@ -0,0 +1,303 @@
+# jaipur_vec_env.py
+from typing import Any, Dict, List, Optional, Union
+import numpy as np
+from gymnasium import spaces
+from stable_baselines3.common.vec_env.base_vec_env import VecEnv, VecEnvIndices
+from ...cards import CAMEL, N_CARDS, N_GOODS
+from ...state import (DECK_COMPOSITION, MARKET_CAMELS, STARTING_HAND, HAND_LIMIT, SELL_MINIMUM,
+                      DEPLETED_STACKS_TO_END)
+from ...actions import N_ACTIONS, TAKE_CAMELS, SELL_OFFSET, EXCHANGE
+from ...exchanges import EXCHANGES, MAX_EXCHANGE
+from ...tokens import STACK_SIZES, BONUS_TOKENS, BONUS_SIZES, TOKEN_SUMS, TOP_TOKEN, BONUS_PILE
+from ...utils import BONUS_CAMEL
+from .observation import OBS_SLICES, OBS_SIZE, make_observation_space, make_flat_observation_space
+
+_DECK = np.array([c for c, n in enumerate(DECK_COMPOSITION)
+                  for _ in range(n - (MARKET_CAMELS if c == CAMEL else 0))], dtype=np.int8)
+DECK_LEN = len(_DECK)
+
+_SELL_MINIMUM = np.array(SELL_MINIMUM)
+_EXCHANGE_TAKE = np.array([take for take, _ in EXCHANGES], dtype=np.int32)
+_EXCHANGE_GIVE = np.array([give for _, give in EXCHANGES], dtype=np.int32)
+# Token tables from tokens.py as arrays, bonus piles padded to the longest
+_STACK_SIZES = np.array(STACK_SIZES)
+_TOKEN_SUMS = np.array(TOKEN_SUMS, dtype=np.int32)
+_TOP_TOKEN = np.array(TOP_TOKEN, dtype=np.int32)
+_BONUS_PILE = np.array(BONUS_PILE)
+_BONUS_SIZES = np.array(BONUS_SIZES)
+_BONUS_LEN = max(BONUS_SIZES)
+_BONUS = np.array([pile + (0,) * (_BONUS_LEN - len(pile)) for pile in BONUS_TOKENS], dtype=np.int32)
+
+
+
+def _factor_exchanges():
+    """Split the exchange table into its distinct take and give vectors
+
+    EXCHANGES lists all exchanges with the same take vector contiguously,
+    so an exchange is (take block, offset in block) and its give vector
+    one of the few hundred distinct ones. Returns the take vectors, the
+    first exchange and length of each take's block, the give vectors and
+    each exchange's give vector id.
+    """
+    takes, starts, lengths = [], [], []
+    gives, give_ids = {}, []
+    for e, (take, give) in enumerate(EXCHANGES):
+        if not takes or takes[-1] != take:
+            takes.append(take)
+            starts.append(e)
+            lengths.append(0)
+        lengths[-1] += 1
+        give_ids.append(gives.setdefault(give, len(gives)))
+    # int32 indices: expanding the blocks below is twice as fast as with int64
+    return (np.array(takes, dtype=np.int32)[:, :N_GOODS], np.array(starts, dtype=np.int32),
+            np.array(lengths, dtype=np.int32), np.array(list(gives), dtype=np.int32),
+            np.array(give_ids, dtype=np.int32))
+
+
+_TAKES, _TAKE_START, _TAKE_LEN, _GIVES, _GIVE_ID = _factor_exchanges()
+# _TAKE_FITS[c][n]: bitset (np.packbits) of the take vectors that need at
+# most n cards of type c, and likewise for gives. Fitting every vector to a
+# market or hand is then one row lookup and AND per card type
+_TAKE_FITS = np.packbits(_TAKES.T[:, None, :] <= np.arange(MAX_EXCHANGE + 1)[None, :, None], axis=2)
+_GIVE_FITS = np.packbits(_GIVES.T[:, None, :] <= np.arange(MAX_EXCHANGE + 1)[None, :, None], axis=2)
+
+
+class JaipurVecEnv(VecEnv):
+    """Many Jaipur games stepped together on stacked NumPy arrays.
+
+    A drop-in replacement for ``make_vec_env(JaipurEnv, n_envs=...)``: same
+    action and observation spaces and per-step rewards, but every rule is a
+    masked array operation over all games at once instead of a Python loop
+    per env. Finished games are reset automatically, as SB3 expects, with
+    the last observation stored under ``info['terminal_observation']``.
+    With ``flat=True`` observations are (num_envs, OBS_SIZE) float32 rows
+    like a flat ``JaipurEnv``, for ``MlpPolicy``.
+    """
+
+    def __init__(self, num_envs: int, seed: Optional[int] = None, flat: bool = False) -> None:
+        self.render_mode = None
+        self.flat = flat
+        space = make_flat_observation_space() if flat else make_observation_space()
+        super().__init__(num_envs, space, spaces.Discrete(N_ACTIONS))
+        self.rng = np.random.default_rng(seed)
+        self.deck = np.empty((num_envs, DECK_LEN), dtype=np.int8)
+        self.deck_pos = np.zeros(num_envs, dtype=np.int64)
+        self.market = np.zeros((num_envs, N_CARDS), dtype=np.int32)
+        self.hands = np.zeros((num_envs, 2, N_CARDS), dtype=np.int32)
+        self.sold = np.zeros((num_envs, N_GOODS), dtype=np.int32)
+        self.points = np.zeros((num_envs, 2), dtype=np.int32)
+        self.bonus = np.zeros((num_envs, len(BONUS_SIZES), _BONUS_LEN), dtype=np.int32)
+        self.bonus_pos = np.zeros((num_envs, len(BONUS_SIZES)), dtype=np.int64)
+        self.turn = np.zeros(num_envs, dtype=np.int64)
+        self._all = np.arange(num_envs)
+        self._actions = np.zeros(num_envs, dtype=np.int64)
+        self._eye = np.eye(N_CARDS, dtype=np.int32)
+        self._flat = np.zeros((num_envs, OBS_SIZE), dtype=np.float32)
+
+    def _deal(self, rows: np.ndarray) -> None:
+        n = len(rows)
+        order = np.argsort(self.rng.random((n, DECK_LEN)), axis=1)
+        deck = _DECK[order]
+        self.deck[rows] = deck
+        self.market[rows] = self._eye[deck[:, :2]].sum(axis=1)
+        self.market[rows, CAMEL] += MARKET_CAMELS
+        start = 2
+        for seat in range(2):
+            self.hands[rows, seat] = self._eye[deck[:, start:start + STARTING_HAND]].sum(axis=1)
+            start += STARTING_HAND
+        self.deck_pos[rows] = start
+        for k, size in enumerate(BONUS_SIZES):
+            order = np.argsort(self.rng.random((n, size)), axis=1)
+            self.bonus[rows, k, :size] = _BONUS[k][order]
+        self.bonus_pos[rows] = 0
+        self.sold[rows] = 0
+        self.points[rows] = 0
+        self.turn[rows] = 0
+
+    def _refill(self, rows: np.ndarray, counts: np.ndarray) -> None:
+        for j in range(int(counts.max(initial=0))):
+            active = (counts > j) & (self.deck_pos[rows] < DECK_LEN)
+            r = rows[active]
+            cards = self.deck[r, self.deck_pos[r]]
+            self.market[r, cards] += 1
+            self.deck_pos[r] += 1
+
+    def _obs(self) -> Union[Dict[str, np.ndarray], np.ndarray]:
+        if self.flat:
+            return self._flat_obs()
+        me = self.turn & 1
+        hands = self.hands[self._all, me]
+        opp = self.hands[self._all, 1 - me]
+        hand = hands.copy()
+        hand[:, CAMEL] = 0
+        transactions = np.zeros((self.num_envs, N_CARDS), dtype=np.int32)
+        transactions[:, :N_GOODS] = self.sold
+        return {
+            'market': self.market.copy(),
+            'hand': hand,
+            'camels': hands[:, CAMEL:CAMEL + 1],
+            'tokens': self.points[self._all, me][:, None],
+            'opponent_camels': opp[:, CAMEL:CAMEL + 1],
+            'opponent_tokens': self.points[self._all, 1 - me][:, None],
+            'transactions': transactions,
+            'goods_tokens': _TOP_TOKEN[np.arange(N_GOODS), self.sold],
+            'bonus_tokens': (_BONUS_SIZES - self.bonus_pos).astype(np.int32)
+        }
+
+    def _flat_obs(self) -> np.ndarray:
+        """The same fields written straight into one preallocated float32 array"""
+        me = self.turn & 1
+        flat = self._flat
+        flat[:, OBS_SLICES['market']] = self.market
+        flat[:, OBS_SLICES['hand']] = self.hands[self._all, me]
+        flat[:, OBS_SLICES['hand'].start + CAMEL] = 0
+        flat[:, OBS_SLICES['camels'].start] = self.hands[self._all, me, CAMEL]
+        flat[:, OBS_SLICES['tokens'].start] = self.points[self._all, me]
+        flat[:, OBS_SLICES['opponent_camels'].start] = self.hands[self._all, 1 - me, CAMEL]
+        flat[:, OBS_SLICES['opponent_tokens'].start] = self.points[self._all, 1 - me]
+        transactions = OBS_SLICES['transactions'].start
+        flat[:, transactions:transactions + N_GOODS] = self.sold
+        flat[:, OBS_SLICES['goods_tokens']] = _TOP_TOKEN[np.arange(N_GOODS), self.sold]
+        flat[:, OBS_SLICES['bonus_tokens']] = _BONUS_SIZES - self.bonus_pos
+        return flat.copy()
+
+    def action_masks(self) -> np.ndarray:
+        """(num_envs, N_ACTIONS) legal-action mask for the players to move"""
+        hands = self.hands[self._all, self.turn & 1]
+        masks = np.zeros((self.num_envs, N_ACTIONS), dtype=bool)
+        hand_sizes = hands[:, :N_GOODS].sum(axis=1)
+        masks[:, :N_GOODS] = (self.market[:, :N_GOODS] > 0) & (hand_sizes < HAND_LIMIT)[:, None]
+        masks[:, TAKE_CAMELS] = self.market[:, CAMEL] > 0
+        masks[:, SELL_OFFSET:EXCHANGE] = hands[:, :N_GOODS] >= _SELL_MINIMUM
+
+        # An exchange is legal when its take vector fits the market and its
+        # give vector fits the hand (camels: the room under the hand limit).
+        # Only the blocks of exchanges whose take is legal are looked at, a
+        # few hundred per env out of the 25k columns, all envs at once
+        give = np.minimum(hands, MAX_EXCHANGE)
+        give[:, CAMEL] = np.minimum(give[:, CAMEL], HAND_LIMIT - hand_sizes)
+        market = np.minimum(self.market, MAX_EXCHANGE)
+        take_ok = _TAKE_FITS[0][market[:, 0]]
+        for c in range(1, N_GOODS):
+            take_ok &= _TAKE_FITS[c][market[:, c]]
+        give_ok = _GIVE_FITS[0][give[:, 0]]
+        for c in range(1, N_CARDS):
+            give_ok &= _GIVE_FITS[c][give[:, c]]
+        take_ok = np.unpackbits(take_ok, axis=1, count=len(_TAKES))
+        give_ok = np.unpackbits(give_ok, axis=1, count=len(_GIVES)).view(bool).ravel()
+        rows, takes = np.nonzero(take_ok)
+        lengths = _TAKE_LEN[takes]
+        ends = np.cumsum(lengths)
+        exchanges = (np.arange(ends[-1] if len(ends) else 0, dtype=np.int32)
+                     + np.repeat(_TAKE_START[takes] - ends + lengths, lengths))
+        rows = np.repeat(rows.astype(np.int32), lengths)
+        legal = np.flatnonzero(give_ok[rows * len(_GIVES) + _GIVE_ID[exchanges]])
+        masks.ravel()[rows[legal].astype(np.int64) * N_ACTIONS + (EXCHANGE + exchanges[legal])] = True
+        return masks
+
+    def _final_margin(self, rows: np.ndarray, seat: np.ndarray) -> np.ndarray:
+        herd = self.hands[rows, :, CAMEL]
+        points = self.points[rows].copy()
+        points[:, 0] += BONUS_CAMEL * (herd[:, 0] > herd[:, 1])
+        points[:, 1] += BONUS_CAMEL * (herd[:, 1] > herd[:, 0])
+        return points[np.arange(len(rows)), seat] - points[np.arange(len(rows)), 1 - seat]
+
+    def reset(self) -> Union[Dict[str, np.ndarray], np.ndarray]:
+        if self._seeds[0] is not None:
+            self.rng = np.random.default_rng(self._seeds[0])
+        self._reset_seeds()
+        self._deal(self._all)
+        return self._obs()
+
+    def step_async(self, actions: np.ndarray) -> None:
+        self._actions = np.asarray(actions, dtype=np.int64).reshape(self.num_envs)
+
+    def step_wait(self):
+        a = self._actions
+        me = self.turn & 1
+        rewards = np.zeros(self.num_envs, dtype=np.float32)
+        hands = self.hands[self._all, me]
+        hand_sizes = hands[:, :N_GOODS].sum(axis=1)
+
+        # Take a single good
+        good = np.minimum(a, N_GOODS - 1)
+        take = (a < N_GOODS) & (self.market[self._all, good] > 0) & (hand_sizes < HAND_LIMIT)
+        rows, g = self._all[take], a[take]
+        self.market[rows, g] -= 1
+        self.hands[rows, me[rows], g] += 1
+        self._refill(rows, np.ones(len(rows), dtype=np.int64))
+        rewards[take] = 0.1
+
+        # Take all camels
+        camels = (a == TAKE_CAMELS) & (self.market[:, CAMEL] > 0)
+        rows = self._all[camels]
+        n = self.market[rows, CAMEL]
+        self.hands[rows, me[rows], CAMEL] += n
+        self.market[rows, CAMEL] = 0
+        self._refill(rows, n)
+        rewards[camels] = 0.2
+
+        # Sell every good of one type
+        good = np.clip(a - SELL_OFFSET, 0, N_GOODS - 1)
+        held = hands[self._all, good]
+        sell = (a >= SELL_OFFSET) & (a < EXCHANGE) & (held >= _SELL_MINIMUM[good])
+        rows, g, n = self._all[sell], good[sell], held[sell]
+        sold = self.sold[rows, g]
+        points = _TOKEN_SUMS[g, sold + n] - _TOKEN_SUMS[g, sold]
+        k = _BONUS_PILE[n]
+        pile = np.maximum(k, 0)
+        pos = self.bonus_pos[rows, pile]
+        bonus = (k >= 0) & (pos < _BONUS_SIZES[pile])
+        points += np.where(bonus, self.bonus[rows, pile, np.minimum(pos, _BONUS_LEN - 1)], 0)
+        self.bonus_pos[rows[bonus], pile[bonus]] += 1
+        self.points[rows, me[rows]] += points
+        self.hands[rows, me[rows], g] = 0
+        self.sold[rows, g] += n
+        rewards[sell] = 0.5 * n
+
+        # Exchange
+        exchange = a >= EXCHANGE
+        rows = self._all[exchange]
+        e = a[rows] - EXCHANGE
+        take_n, give_n = _EXCHANGE_TAKE[e], _EXCHANGE_GIVE[e]
+        ok = ((self.market[rows] >= take_n).all(axis=1) & (hands[rows] >= give_n).all(axis=1)
+              & (hand_sizes[rows] + give_n[:, CAMEL] <= HAND_LIMIT))
+        rows, delta = rows[ok], (take_n - give_n)[ok]
+        self.hands[rows, me[rows]] += delta
+        self.market[rows] -= delta
+        exchange[exchange] = ok
+        rewards[exchange] = 0.1
+        legal = take | camels | sell | exchange
+
+        # An invalid action leaves the same player to move again, as in JaipurEnv
+        self.turn += legal
+        dones = (self.deck_pos >= DECK_LEN) | ((self.sold >= _STACK_SIZES).sum(axis=1) >= DEPLETED_STACKS_TO_END)
+        infos: List[Dict[str, Any]] = [{} for _ in range(self.num_envs)]
+        for i in self._all[~legal]:
+            infos[i]['invalid_action'] = True
+        if dones.any():
+            rows = self._all[dones]
+            rewards[rows] = self._final_margin(rows, me[rows])
+            terminal = self._obs()
+            for i in rows:
+                infos[i]['terminal_observation'] = (terminal[i] if self.flat else
+                                                    {k: v[i] for k, v in terminal.items()})
+            self._deal(rows)
+        return self._obs(), rewards, dones, infos
+
+    def close(self) -> None:
+        pass
+
+    def get_attr(self, attr_name: str, indices: VecEnvIndices = None) -> List[Any]:
+        return [getattr(self, attr_name)] * len(self._get_indices(indices))
+
+    def set_attr(self, attr_name: str, value: Any, indices: VecEnvIndices = None) -> None:
+        setattr(self, attr_name, value)
+
+    def env_method(self, method_name: str, *method_args, indices: VecEnvIndices = None, **method_kwargs) -> List[Any]:
+        indices = list(self._get_indices(indices))
+        result = getattr(self, method_name)(*method_args, **method_kwargs)
+        return [result[i] for i in indices] if isinstance(result, np.ndarray) else [result] * len(indices)
+
+    def env_is_wrapped(self, wrapper_class, indices: VecEnvIndices = None) -> List[bool]:
+        return [False] * len(self._get_indices(indices))
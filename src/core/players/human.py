@@ -2,6 +2,8 @@
 from typing import List, Dict, Optional
 from ..market import Market
 from ..deck import Deck, Card
+from ..cards import GOODS
+from ..actions import EXCHANGE
 from ...gui.basegui import BaseGUI
 from .base_player import BasePlayer
 
@@ -17,18 +19,24 @@ class HumanPlayer(BasePlayer):
 
         # Handle action
         if choice == 1:
-            goods_in_market = [card for card in market.goods() if market.cards.count(card) > 0]
+            goods_in_market = [card for card in GOODS if market.count(card) > 0]
             selected = self.gui.select_good(goods_in_market)
             if selected:
                 return self.take_single_good(selected, market, deck)
         elif choice == 2:
             return self.take_camels(market, deck)
         elif choice == 3:
-            player_goods = {card: self.hand.count(card) for card in Card if card != Card.CAMEL}
+            player_goods = dict(zip(GOODS, self.counts))
             selection = self.gui.select_goods_to_sell(player_goods)
             if selection:
                 card, count = selection
                 return self.sell_goods(card, count)
         elif choice == 4:
-            self.gui.show_message("Exchange functionality not yet implemented")
+            options = self.state.legal_exchanges(self.seat)
+            if not options:
+                self.gui.show_message("No exchange is possible right now")
+                return False
+            selected = self.gui.select_exchange(options)
+            if selected is not None:
+                return self.play_action(EXCHANGE + selected)
         return False
\ No newline at end of file
@@ -0,0 +1,167 @@
+# parallel_mcts.py
+import math
+import os
+import random
+import threading
+import time
+from array import array
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+from typing import Dict, Optional, Tuple
+from ..market import Market
+from ..deck import Deck
+from ..state import GameState, PACKED_SIZE
+from ..zobrist import TranspositionTable
+from ..belief import BeliefTracker
+from .base_player import BasePlayer
+from .mcts import MCTS, _Node, outcome
+
+_ITEM = array('q').itemsize
+_worker_shm: Optional[SharedMemory] = None
+
+
+def _init_worker(shm_name: str) -> None:
+    global _worker_shm
+    # Pool workers share the parent's resource tracker, so attaching here
+    # does not change who unlinks the block (the parent, in close())
+    _worker_shm = SharedMemory(name=shm_name)
+
+
+def _worker_search(seat: int, iterations: int, time_limit: Optional[float],
+                   exploration: float, seed: int) -> Tuple[Dict[int, int], int]:
+    values = array('q', bytes(_worker_shm.buf[:PACKED_SIZE * _ITEM]))
+    state = GameState.unpack(values)
+    mcts = MCTS(iterations, time_limit, exploration, seed)
+    visits = mcts.search(state, seat)
+    return visits, mcts.playouts
+
+
+class RootParallelMCTS:
+    """Root-parallel IS-MCTS over a pool of worker processes.
+
+    The position is written once per move into a shared-memory block that
+    every worker maps at start-up, so a search only ships a few integers to
+    each worker. Workers grow independent trees from their own
+    determinizations and the root visit counts are summed. The pool lives
+    as long as the object: call ``close()`` (or use it as a context manager)
+    when done.
+    """
+
+    def __init__(self, workers: Optional[int] = None, iterations: int = 1000, time_limit: Optional[float] = None,
+                 exploration: float = 0.7, seed: Optional[int] = None) -> None:
+        self.workers = workers or os.cpu_count() or 1
+        self.iterations = iterations
+        self.time_limit = time_limit
+        self.exploration = exploration
+        self.rng = random.Random(seed)
+        self.playouts = 0
+        self.elapsed = 0.0
+        self.shm = SharedMemory(create=True, size=PACKED_SIZE * _ITEM)
+        self.pool = ProcessPoolExecutor(self.workers, initializer=_init_worker, initargs=(self.shm.name,))
+
+    def search(self, state: GameState, seat: int) -> Dict[int, int]:
+        """Search with every worker and return the merged root visit counts
+
+        ``iterations`` is the total budget, split evenly between workers;
+        ``time_limit`` applies to each worker.
+        """
+        start = time.perf_counter()
+        self.shm.buf[:PACKED_SIZE * _ITEM] = array('q', state.pack()).tobytes()
+        per_worker = math.ceil(self.iterations / self.workers)
+        futures = [self.pool.submit(_worker_search, seat, per_worker, self.time_limit, self.exploration,
+                                    self.rng.getrandbits(32))
+                   for _ in range(self.workers)]
+        visits: Counter = Counter()
+        self.playouts = 0
+        for future in futures:
+            worker_visits, playouts = future.result()
+            visits.update(worker_visits)
+            self.playouts += playouts
+        self.elapsed = time.perf_counter() - start
+        return dict(visits)
+
+    def close(self) -> None:
+        self.pool.shutdown()
+        self.shm.close()
+        self.shm.unlink()
+
+    def __enter__(self) -> 'RootParallelMCTS':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class TreeParallelMCTS(MCTS):
+    """IS-MCTS with several threads sharing one tree through virtual loss.
+
+    Selection, expansion and backpropagation happen under a lock; the
+    playouts run unlocked. Virtual loss makes threads that enter the tree
+    at the same time pick different paths. Under the GIL this mostly helps
+    when playouts release it (or on a free-threaded build); combine it with
+    ``RootParallelMCTS`` for multi-core scaling.
+    """
+
+    def __init__(self, threads: int = 4, iterations: int = 1000, time_limit: Optional[float] = None,
+                 exploration: float = 0.7, virtual_loss: float = 1.0, seed: Optional[int] = None,
+                 transpositions: Optional[TranspositionTable] = None) -> None:
+        super().__init__(iterations, time_limit, exploration, seed, transpositions)
+        self.threads = threads
+        self.virtual_loss = virtual_loss
+
+    def search(self, state: GameState, seat: int, belief: Optional[BeliefTracker] = None) -> Dict[int, int]:
+        root = _Node(-1, 1 - seat)
+        lock = threading.Lock()
+        if belief is not None:
+            belief.sync(state, seat)
+        start = time.perf_counter()
+        deadline = start + self.time_limit if self.time_limit is not None else math.inf
+        remaining = [self.iterations]
+        self.expansions = 0
+        if self.transpositions is not None:
+            self.transpositions.new_search()
+        vl = self.virtual_loss
+
+        def work(rng: random.Random) -> None:
+            while time.perf_counter() < deadline:
+                with lock:
+                    if remaining[0] <= 0:
+                        return
+                    remaining[0] -= 1
+                    det = belief.determinize(state, rng) if belief is not None else state.determinize(seat, rng)
+                    det.turn = seat
+                    path = self._select(root, det, rng, seat, vl)
+                self.playout(det, rng)
+                with lock:
+                    self._backpropagate(path, outcome(det, 0), vl)
+
+        threads = [threading.Thread(target=work, args=(random.Random(self.rng.getrandbits(32)),))
+                   for _ in range(self.threads)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.playouts = self.iterations - max(remaining[0], 0)
+        self.elapsed = time.perf_counter() - start
+        return {a: round(child.visits) for a, child in root.children.items()}
+
+
+class ParallelMCTSPlayer(BasePlayer):
+    """MCTS player that spreads each search over a process pool"""
+
+    def __init__(self, name: str = "Parallel MCTS", workers: Optional[int] = None, iterations: int = 1_000_000,
+                 time_limit: Optional[float] = 1.0, exploration: float = 0.7, seed: Optional[int] = None) -> None:
+        super().__init__(name)
+        self.mcts = RootParallelMCTS(workers, iterations, time_limit, exploration, seed)
+        self.last_visits: Dict[int, int] = {}
+
+    def take_turn(self, market: Market, deck: Deck) -> bool:
+        visits = self.last_visits = self.mcts.search(self.state, self.seat)
+        if not visits:
+            return False
+        action = max(visits, key=visits.get)
+        return self.play_action(action)
+
+    def close(self) -> None:
+        self.mcts.close()
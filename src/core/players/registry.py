@@ -0,0 +1,72 @@
+# registry.py
+import random
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional
+from .base_player import BasePlayer
+from ..endgame import EndgameSolver
+from .ai import AIPlayer
+from .mcts import MCTSPlayer
+from .parallel_mcts import ParallelMCTSPlayer
+
+# A factory builds the player sitting in position ``index`` (1-based) from the
+# game's RNG and the optional argument after the colon in ``kind:arg``
+PlayerFactory = Callable[[int, random.Random, Optional[str]], BasePlayer]
+_FACTORIES: Dict[str, PlayerFactory] = {}
+
+
+def register_player(kind: str, factory: PlayerFactory) -> None:
+    _FACTORIES[kind] = factory
+
+
+def registered_players() -> List[str]:
+    return sorted(_FACTORIES)
+
+
+def make_player(kind: str, index: int, rng: random.Random) -> BasePlayer:
+    """Build a player from a ``kind`` or ``kind:arg`` string; unknown kinds play as ``ai``"""
+    name, _, arg = kind.partition(':')
+    factory = _FACTORIES.get(name, _FACTORIES['ai'])
+    return factory(index, rng, arg or None)
+
+
+@lru_cache(maxsize=None)
+def _load_model(path: str):
+    from .gymnasium.ai_player import load_model
+    return load_model(path)
+
+
+def _trained(index: int, rng: random.Random, arg: Optional[str]) -> BasePlayer:
+    # Imported here so games without trained agents never load torch
+    from .gymnasium.ai_player import TrainedAIPlayer
+    return TrainedAIPlayer(f"Trained AI {index}", rng=random.Random(rng.getrandbits(64)),
+                           model=_load_model(arg) if arg else None)
+
+
+# mcts:N and parallel_mcts:N search N playouts per move instead of one second
+register_player('ai', lambda i, rng, arg: AIPlayer(f"AI {i}", random.Random(rng.getrandbits(64))))
+register_player('mcts', lambda i, rng, arg: MCTSPlayer(
+    f"MCTS {i}", seed=rng.getrandbits(64), **({'iterations': int(arg), 'time_limit': None} if arg else {})))
+register_player('parallel_mcts', lambda i, rng, arg: ParallelMCTSPlayer(
+    f"Parallel MCTS {i}", seed=rng.getrandbits(64), **({'iterations': int(arg), 'time_limit': None} if arg else {})))
+register_player('trained', _trained)
+
+
+@lru_cache(maxsize=None)
+def _load_tablebase(path: str):
+    from ..tablebase import Tablebase
+    return Tablebase(path)
+
+
+def _endgame(index: int, rng: random.Random, arg: Optional[str]) -> BasePlayer:
+    if arg and not arg.isdigit():
+        tablebase = _load_tablebase(arg)
+        solver = EndgameSolver(tablebase.meta['max_deck'], tablebase.meta['max_exchanges'], tablebase=tablebase)
+    else:
+        solver = EndgameSolver(*([int(arg)] if arg else []))
+    return AIPlayer(f"Endgame AI {index}", random.Random(rng.getrandbits(64)), solver)
+
+
+# endgame:N is the rule-based AI playing the last N cards of the deck by the
+# endgame solver (exchange-limited expectimax),
+# endgame:DIR the same backed by a tablebase built with tablebase.py
+register_player('endgame', _endgame)
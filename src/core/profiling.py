@@ -0,0 +1,289 @@
+# profiling.py
+import functools
+import importlib
+import json
+import sys
+import threading
+import time
+import tracemalloc
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Hot-path methods timed while a Profiler is enabled, as (module, class,
+# method, span name). They are wrapped in place on enable() and restored on
+# disable(), so a run without a profiler executes the original code. Only
+# entry points of games, players and envs are listed: engine methods such
+# as GameState.sell also run inside every MCTS playout and endgame search,
+# where wrapping them would time the profiler more than the search.
+# Modules that fail to import (e.g. no gymnasium installed) are skipped, and
+# those in LOADED_ONLY are wrapped only if already imported, so enabling a
+# profiler never loads stable_baselines3 and torch for a run without them.
+TARGETS: List[Tuple[str, str, str, str]] = [
+    ('src.core.game', 'Game', '__init__', 'game.new'),
+    ('src.core.game', 'Game', 'play_turn', 'game.play_turn'),
+    ('src.core.game', 'Game', 'final_scoring', 'game.final_scoring'),
+    ('src.core.players.base_player', 'BasePlayer', 'take_single_good', 'player.take_single_good'),
+    ('src.core.players.base_player', 'BasePlayer', 'take_camels', 'player.take_camels'),
+    ('src.core.players.base_player', 'BasePlayer', 'sell_goods', 'player.sell_goods'),
+    ('src.core.players.base_player', 'BasePlayer', 'exchange', 'player.exchange'),
+    ('src.core.players.base_player', 'BasePlayer', 'play_action', 'player.play_action'),
+    ('src.core.players.ai', 'AIPlayer', 'take_turn', 'agent.ai'),
+    ('src.core.players.mcts', 'MCTSPlayer', 'take_turn', 'agent.mcts'),
+    ('src.core.players.mcts', 'MCTS', 'search', 'mcts.search'),
+    ('src.core.players.parallel_mcts', 'ParallelMCTSPlayer', 'take_turn', 'agent.parallel_mcts'),
+    ('src.core.endgame', 'EndgameSolver', 'values', 'endgame.solve'),
+    ('src.core.belief', 'BeliefTracker', 'update', 'belief.update'),
+    ('src.core.players.gymnasium.ai_player', 'TrainedAIPlayer', 'take_turn', 'agent.trained'),
+    ('src.core.players.gymnasium.ai_player', 'TrainedAIPlayer', '_get_observation', 'agent.trained.observe'),
+    ('src.core.players.gymnasium.inference', 'InferenceServer', 'predict', 'inference.wait'),
+    ('stable_baselines3.common.base_class', 'BaseAlgorithm', 'predict', 'model.predict'),
+    ('src.core.players.gymnasium.environment', 'JaipurEnv', 'reset', 'env.reset'),
+    ('src.core.players.gymnasium.environment', 'JaipurEnv', 'step', 'env.step'),
+    ('src.core.players.gymnasium.environment', 'JaipurEnv', '_get_obs', 'env.observation'),
+    ('src.core.players.gymnasium.environment', 'JaipurEnv', 'action_masks', 'env.action_masks'),
+    ('src.core.players.gymnasium.observation', 'ObservationEncoder', 'encode', 'obs.encode'),
+    ('src.core.players.gymnasium.observation', 'ObservationEncoder', 'update', 'obs.update'),
+    ('src.core.players.gymnasium.vec_env', 'JaipurVecEnv', 'reset', 'vec_env.reset'),
+    ('src.core.players.gymnasium.vec_env', 'JaipurVecEnv', 'step_wait', 'vec_env.step'),
+    ('src.core.players.gymnasium.vec_env', 'JaipurVecEnv', 'action_masks', 'vec_env.action_masks'),
+]
+LOADED_ONLY = {
+    'stable_baselines3.common.base_class',
+    'src.core.players.gymnasium.ai_player',
+    'src.core.players.gymnasium.vec_env',
+}
+
+# Counters bumped from the result of a span: player actions count as applied
+# or invalid (once, however the player methods nest) and every observation
+# built counts once
+_PLAYER_ACTION = 'player.'
+_OBSERVATIONS = ('env.observation', 'agent.trained.observe')
+
+_active: Optional['Profiler'] = None
+
+
+class _Null:
+    def __enter__(self) -> None:
+        return None
+
+    def __exit__(self, *exc) -> None:
+        return None
+
+
+_NULL = _Null()
+
+
+def span(name: str):
+    """``with span('phase'):`` times a block under the enabled profiler; a no-op otherwise"""
+    return _active.span(name) if _active is not None else _NULL
+
+
+def count(name: str, n: int = 1) -> None:
+    if _active is not None:
+        _active.count(name, n)
+
+
+class _Span:
+    __slots__ = ('profiler', 'name')
+
+    def __init__(self, profiler: 'Profiler', name: str) -> None:
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self) -> None:
+        self.profiler._enter(self.name)
+
+    def __exit__(self, *exc) -> None:
+        self.profiler._exit()
+
+
+class Profiler:
+    """Opt-in per-phase timers and counters for games, envs and agents.
+
+    Use as a context manager (or ``enable()``/``disable()``) around the code
+    to measure. Every call of a method in ``TARGETS`` and every ``span()``
+    block becomes a span: calls, total and self time per name go into
+    ``table()``, and up to ``max_events`` individual spans are kept for
+    ``chrome_trace()`` (chrome://tracing, Perfetto) and ``speedscope()``.
+    With ``track_allocations`` each span also records the bytes it left
+    allocated (through tracemalloc, which slows everything down a lot).
+    """
+
+    def __init__(self, track_allocations: bool = False, max_events: int = 1_000_000) -> None:
+        self.track_allocations = track_allocations
+        self.max_events = max_events
+        # name -> [calls, total ns, self ns, net bytes allocated]
+        self.stats: Dict[str, List[int]] = defaultdict(lambda: [0, 0, 0, 0])
+        self.counters: Dict[str, int] = defaultdict(int)
+        # (name, start ns, duration ns, thread id)
+        self.events: List[Tuple[str, int, int, int]] = []
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._patched: List[Tuple[type, str, Any]] = []
+        self.started = 0
+        self.elapsed = 0
+
+    def __enter__(self) -> 'Profiler':
+        return self.enable()
+
+    def __exit__(self, *exc) -> None:
+        self.disable()
+
+    def enable(self) -> 'Profiler':
+        global _active
+        if _active is not None:
+            raise RuntimeError("another Profiler is already enabled")
+        _active = self
+        try:
+            for module, cls_name, method, name in TARGETS:
+                if module in LOADED_ONLY and module not in sys.modules:
+                    continue
+                try:
+                    cls = getattr(importlib.import_module(module), cls_name)
+                except ImportError:
+                    continue
+                original = cls.__dict__[method]
+                self._patched.append((cls, method, original))
+                setattr(cls, method, self._wrap(original, name))
+            if self.track_allocations:
+                tracemalloc.start()
+        except BaseException:
+            # Leave nothing wrapped, so a later Profiler can still be enabled
+            self._restore()
+            _active = None
+            raise
+        self.started = time.perf_counter_ns()
+        return self
+
+    def disable(self) -> None:
+        global _active
+        self.elapsed += time.perf_counter_ns() - self.started
+        self._restore()
+        if self.track_allocations:
+            tracemalloc.stop()
+        _active = None
+
+    def _restore(self) -> None:
+        for cls, method, original in reversed(self._patched):
+            setattr(cls, method, original)
+        self._patched.clear()
+
+    def span(self, name: str) -> _Span:
+        return _Span(self, name)
+
+    def count(self, name: str, n: int = 1) -> None:
+        self.counters[name] += n
+
+    def _wrap(self, fn: Callable, name: str) -> Callable:
+        enter, exit_ = self._enter, self._exit
+        counters = self.counters
+        player_action = name.startswith(_PLAYER_ACTION)
+        observation = name in _OBSERVATIONS
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            enter(name)
+            try:
+                result = fn(*args, **kwargs)
+            finally:
+                parent = exit_()
+            if player_action and not (parent and parent.startswith(_PLAYER_ACTION)):
+                counters['actions.applied' if result else 'actions.invalid'] += 1
+            elif observation:
+                counters['observations.built'] += 1
+            return result
+        return wrapper
+
+    def _stack(self) -> list:
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _enter(self, name: str) -> None:
+        # [name, start, time spent in children, traced bytes at start]
+        memory = tracemalloc.get_traced_memory()[0] if self.track_allocations else 0
+        self._stack().append([name, time.perf_counter_ns(), 0, memory])
+
+    def _exit(self) -> Optional[str]:
+        """Close the innermost span and return the name of its parent, if any"""
+        end = time.perf_counter_ns()
+        stack = self._stack()
+        name, start, children, memory = stack.pop()
+        duration = end - start
+        allocated = tracemalloc.get_traced_memory()[0] - memory if self.track_allocations else 0
+        with self._lock:
+            stat = self.stats[name]
+            stat[0] += 1
+            stat[1] += duration
+            stat[2] += duration - children
+            stat[3] += allocated
+            if len(self.events) < self.max_events:
+                self.events.append((name, start, duration, threading.get_ident()))
+        if stack:
+            stack[-1][2] += duration
+            return stack[-1][0]
+        return None
+
+    def table(self) -> List[List[Any]]:
+        """Rows of name, calls, total ms, self ms, mean us, % of wall time[, KiB allocated], by self time"""
+        wall = self.elapsed or (time.perf_counter_ns() - self.started)
+        rows = []
+        for name, (calls, total, own, allocated) in sorted(self.stats.items(), key=lambda kv: -kv[1][2]):
+            row = [name, calls, total / 1e6, own / 1e6, total / calls / 1e3, 100 * own / wall if wall else 0.0]
+            if self.track_allocations:
+                row.append(allocated / 1024)
+            rows.append(row)
+        return rows
+
+    def summary(self) -> str:
+        from tabulate import tabulate
+        headers = ["Phase", "Calls", "Total ms", "Self ms", "Mean us", "Self %"]
+        if self.track_allocations:
+            headers.append("KiB allocated")
+        out = tabulate(self.table(), headers=headers, floatfmt=".1f")
+        if self.counters:
+            out += '\n\n' + tabulate(sorted(self.counters.items()), headers=["Counter", "Value"])
+        return out
+
+    def chrome_trace(self) -> Dict[str, Any]:
+        """Trace Event Format (chrome://tracing, Perfetto, speedscope all open it)"""
+        origin = self.started
+        events = [{'name': name, 'ph': 'X', 'ts': (start - origin) / 1e3, 'dur': duration / 1e3,
+                   'pid': 0, 'tid': tid} for name, start, duration, tid in self.events]
+        events += [{'name': name, 'ph': 'C', 'ts': 0, 'pid': 0, 'args': {name: value}}
+                   for name, value in self.counters.items()]
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def speedscope(self, name: str = 'jaipur') -> Dict[str, Any]:
+        """speedscope's own format, one evented profile per thread"""
+        frames: Dict[str, int] = {}
+        by_thread: Dict[int, List[Tuple[int, int, int]]] = defaultdict(list)
+        for span_name, start, duration, tid in self.events:
+            frame = frames.setdefault(span_name, len(frames))
+            by_thread[tid].append((start - self.started, duration, frame))
+        profiles = []
+        for tid, spans in by_thread.items():
+            # Parents start no later and end no earlier than their children
+            spans.sort(key=lambda s: (s[0], -s[1]))
+            events, open_spans = [], []
+            for start, duration, frame in spans:
+                while open_spans and open_spans[-1][0] <= start:
+                    end, closing = open_spans.pop()
+                    events.append({'type': 'C', 'frame': closing, 'at': end / 1e3})
+                events.append({'type': 'O', 'frame': frame, 'at': start / 1e3})
+                open_spans.append((start + duration, frame))
+            while open_spans:
+                end, closing = open_spans.pop()
+                events.append({'type': 'C', 'frame': closing, 'at': end / 1e3})
+            profiles.append({'type': 'evented', 'name': f'{name} thread {tid}', 'unit': 'microseconds',
+                             'startValue': events[0]['at'] if events else 0,
+                             'endValue': events[-1]['at'] if events else 0, 'events': events})
+        return {'$schema': 'https://www.speedscope.app/file-format-schema.json',
+                'shared': {'frames': [{'name': f} for f in frames]}, 'profiles': profiles, 'name': name}
+
+    def save(self, path: str) -> None:
+        """Write ``chrome_trace()``, or ``speedscope()`` if the path ends in .speedscope.json"""
+        data = self.speedscope() if path.endswith('.speedscope.json') else self.chrome_trace()
+        with open(path, 'w') as f:
+            json.dump(data, f)
@@ -0,0 +1,127 @@
+import random
+import struct
+from dataclasses import dataclass, field
+from typing import BinaryIO, Iterator, List, Optional, Tuple
+from .deck import Deck
+from .market import Market
+from .state import GameState, STARTING_HAND
+from .tokens import TokenBank
+from .actions import PARTIAL_SELL, MAX_SELL
+
+# A replay is the seed that dealt the game followed by every action played,
+# each as an unsigned LEB128 varint: the common actions take one byte and
+# exchanges two or three.
+MAGIC = b'JPR'
+VERSION = 1
+_HEADER = struct.Struct('<3sBQ')
+
+
+def new_game(rng: random.Random) -> Tuple[GameState, Deck, Market, TokenBank]:
+    """Deal a game: deck, opening market, bonus piles and both hands
+
+    ``Game`` and ``replay()`` both start here, so a seed always deals the
+    same game.
+    """
+    state = GameState()
+    deck = Deck(state, rng)
+    market = Market(deck)
+    bank = TokenBank(state)
+    bank.shuffle(rng)
+    for seat in range(2):
+        for _ in range(STARTING_HAND):
+            state.add_to_hand(seat, state.draw())
+    return state, deck, market, bank
+
+
+def apply_code(state: GameState, code: int) -> bool:
+    """Play a replay code for the player to move: an action or a partial sale"""
+    if code < PARTIAL_SELL:
+        return state.apply(code)
+    good, n = divmod(code - PARTIAL_SELL, MAX_SELL)
+    if state.sell(state.turn & 1, good, n) < 0:
+        return False
+    state.turn += 1
+    return True
+
+
+def _write_varint(out: bytearray, value: int) -> None:
+    while value >= 0x80:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(data: bytes, i: int) -> Tuple[int, int]:
+    value = shift = 0
+    while True:
+        b = data[i]
+        i += 1
+        value |= (b & 0x7F) << shift
+        if b < 0x80:
+            return value, i
+        shift += 7
+
+
+@dataclass
+class Replay:
+    seed: int
+    actions: List[int] = field(default_factory=list)
+
+    def to_bytes(self) -> bytes:
+        out = bytearray(_HEADER.pack(MAGIC, VERSION, self.seed))
+        for a in self.actions:
+            _write_varint(out, a)
+        return bytes(out)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'Replay':
+        magic, version, seed = _HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError('Not a Jaipur replay')
+        actions, i = [], _HEADER.size
+        while i < len(data):
+            a, i = _read_varint(data, i)
+            actions.append(a)
+        return cls(seed, actions)
+
+    def states(self) -> Iterator[GameState]:
+        """The dealt position and the position after every ply, sharing one state"""
+        state = new_game(random.Random(self.seed))[0]
+        yield state
+        for ply, code in enumerate(self.actions):
+            if not apply_code(state, code):
+                raise ValueError(f'Illegal action {code} at ply {ply}')
+            yield state
+
+    def state(self, ply: Optional[int] = None) -> GameState:
+        """The position after ``ply`` actions (the final one by default)"""
+        ply = len(self.actions) if ply is None else ply
+        if not 0 <= ply <= len(self.actions):
+            raise IndexError(f'Replay has {len(self.actions)} plies')
+        for i, state in enumerate(self.states()):
+            if i == ply:
+                return state
+
+
+def replay(data: bytes, ply: Optional[int] = None) -> GameState:
+    """Rebuild the position after ``ply`` actions of an encoded replay"""
+    return Replay.from_bytes(data).state(ply)
+
+
+def dump(replays: List[Replay], f: BinaryIO) -> None:
+    """Append replays to a binary file, each prefixed with its length"""
+    out = bytearray()
+    for r in replays:
+        data = r.to_bytes()
+        _write_varint(out, len(data))
+        out += data
+    f.write(out)
+
+
+def load(f: BinaryIO) -> Iterator[Replay]:
+    data = f.read()
+    i = 0
+    while i < len(data):
+        n, i = _read_varint(data, i)
+        yield Replay.from_bytes(data[i:i + n])
+        i += n
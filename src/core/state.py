@@ -0,0 +1,461 @@
+import random
+from typing import List, Sequence, Tuple
+from .cards import CAMEL, N_CARDS, N_GOODS
+from .actions import (MARKET_BITS, SELL_BITS, TAKE_GOODS_BITS, EXCHANGE_BIT,
+                      TAKE_CAMELS, SELL_OFFSET, EXCHANGE)
+from .exchanges import EXCHANGES, MIN_EXCHANGE, MAX_EXCHANGE, legal_exchanges
+from .tokens import STACK_SIZES, BONUS_TOKENS, BONUS_SIZES, N_BONUS_TOKENS, TOKEN_SUMS, BONUS_PILE
+from .utils import BONUS_CAMEL
+from .zobrist import Z_MARKET, Z_HAND, Z_HAND_SIZE, Z_SOLD, Z_POINTS, Z_BONUS, Z_DECK, Z_TO_MOVE
+
+# Number of copies of each card in ``Card`` order (see cards.py)
+DECK_COMPOSITION = (6, 6, 6, 8, 8, 10, 11)
+MARKET_SIZE = 5
+MARKET_CAMELS = 3
+STARTING_HAND = 5
+HAND_LIMIT = 7
+# Diamonds, gold and silver can only be sold two or more at a time
+SELL_MINIMUM = (2, 2, 2, 1, 1, 1)
+DEPLETED_STACKS_TO_END = 3
+DECK_SIZE = sum(DECK_COMPOSITION) - MARKET_CAMELS
+# Length of GameState.pack(): turn, deck length and pointer, market, both
+# hands, sold counters, points, bonus pile pointers and orders and the deck
+# order padded to DECK_SIZE
+PACKED_SIZE = 3 + N_CARDS * 3 + N_GOODS + 2 + len(BONUS_SIZES) + N_BONUS_TOKENS + DECK_SIZE
+
+
+class GameState:
+    """Compact Jaipur position built from fixed-size count vectors.
+
+    Every zone (deck, market, both hands) is a list of ``N_CARDS`` integers
+    indexed like ``Card``; a hand's ``CAMEL`` slot is the player's herd. The
+    deck keeps its shuffled order as card indices and a draw pointer, the
+    token stacks are represented by how many goods of each type were sold and
+    the bonus piles by their shuffled order and a draw pointer each (see
+    tokens.py).
+    All queries and actions touch a handful of integers, so they run in O(1)
+    regardless of how the cards are distributed.
+
+    Cards must enter and leave the market and hands through ``add_to_market``
+    and ``add_to_hand`` so the hand sizes and the legal-action bits (see
+    actions.py) stay in sync with the counts.
+
+    A Zobrist hash of the public counts (market, herds, sold goods, points,
+    bonus piles drawn, deck size) is kept in ``hash`` and one of each player's goods in
+    ``hand_hashes``; ``key()`` and ``information_key()`` combine them with
+    the side to move. Code that writes the counts directly must call
+    ``rehash()`` afterwards.
+    """
+
+    __slots__ = ('deck', 'deck_pos', 'deck_counts', 'market', 'hands', 'hand_sizes',
+                 'market_bits', 'sell_bits', 'sold', 'points', 'bonus', 'bonus_pos', 'turn',
+                 'undo_log', 'hash', 'hand_hashes')
+
+    def __init__(self) -> None:
+        self.deck: List[int] = []
+        self.deck_pos: int = 0
+        self.deck_counts: List[int] = [0] * N_CARDS
+        self.market: List[int] = [0] * N_CARDS
+        self.hands: List[List[int]] = [[0] * N_CARDS, [0] * N_CARDS]
+        self.hand_sizes: List[int] = [0, 0]
+        self.market_bits: int = 0
+        self.sell_bits: List[int] = [0, 0]
+        self.sold: List[int] = [0] * N_GOODS
+        self.points: List[int] = [0, 0]
+        self.bonus: List[Tuple[int, ...]] = list(BONUS_TOKENS)
+        self.bonus_pos: List[int] = [0] * len(BONUS_TOKENS)
+        self.turn: int = 0
+        self.hash: int = 0
+        self.hand_hashes: List[int] = [0, 0]
+        # Four integers per applied action, see apply() and undo()
+        self.undo_log: List[int] = []
+
+    def shuffle_deck(self, rng: random.Random = random) -> None:
+        """Shuffle a full deck minus the camels that always start in the market"""
+        counts = list(DECK_COMPOSITION)
+        counts[CAMEL] -= MARKET_CAMELS
+        self.deck = [c for c, n in enumerate(counts) for _ in range(n)]
+        rng.shuffle(self.deck)
+        self.deck_pos = 0
+        self.deck_counts = counts
+        self.rehash()
+
+    def shuffle_bonus(self, rng: random.Random = random) -> None:
+        """Shuffle the three bonus piles"""
+        self.bonus = [tuple(rng.sample(pile, len(pile))) for pile in BONUS_TOKENS]
+        self.bonus_pos = [0] * len(BONUS_TOKENS)
+        self.rehash()
+
+    def clone(self) -> 'GameState':
+        other = GameState.__new__(GameState)
+        other.deck = self.deck
+        other.deck_pos = self.deck_pos
+        other.deck_counts = self.deck_counts[:]
+        other.market = self.market[:]
+        other.hands = [self.hands[0][:], self.hands[1][:]]
+        other.hand_sizes = self.hand_sizes[:]
+        other.market_bits = self.market_bits
+        other.sell_bits = self.sell_bits[:]
+        other.sold = self.sold[:]
+        other.points = self.points[:]
+        other.bonus = self.bonus
+        other.bonus_pos = self.bonus_pos[:]
+        other.turn = self.turn
+        other.hash = self.hash
+        other.hand_hashes = self.hand_hashes[:]
+        other.undo_log = []
+        return other
+
+    def pack(self) -> List[int]:
+        """Flatten the state into ``PACKED_SIZE`` integers (see ``unpack``)"""
+        deck = self.deck + [0] * (DECK_SIZE - len(self.deck))
+        bonus = [t for pile in self.bonus for t in pile]
+        return ([self.turn, len(self.deck), self.deck_pos] + self.market + self.hands[0] + self.hands[1]
+                + self.sold + self.points + self.bonus_pos + bonus + deck)
+
+    @classmethod
+    def unpack(cls, values: Sequence[int]) -> 'GameState':
+        """Rebuild a state from ``pack()`` output, recomputing derived fields"""
+        state = cls()
+        state.turn, deck_len, state.deck_pos = values[0], values[1], values[2]
+        i = 3
+        for c in range(N_CARDS):
+            state.add_to_market(c, values[i + c])
+        i += N_CARDS
+        for seat in range(2):
+            for c in range(N_CARDS):
+                state.add_to_hand(seat, c, values[i + c])
+            i += N_CARDS
+        state.sold = list(values[i:i + N_GOODS])
+        i += N_GOODS
+        state.points = list(values[i:i + 2])
+        i += 2
+        state.bonus_pos = list(values[i:i + len(BONUS_SIZES)])
+        i += len(BONUS_SIZES)
+        state.bonus = []
+        for size in BONUS_SIZES:
+            state.bonus.append(tuple(values[i:i + size]))
+            i += size
+        state.deck = list(values[i:i + deck_len])
+        for c in state.deck[state.deck_pos:]:
+            state.deck_counts[c] += 1
+        state.rehash()
+        return state
+
+    def determinize(self, seat: int, rng: random.Random = random) -> 'GameState':
+        """Clone the state with the information hidden from ``seat`` resampled
+
+        The opponent's goods, the deck order and the order of the undrawn
+        bonus tokens are redrawn uniformly from what ``seat`` cannot see,
+        keeping every public count (market, herds, hand sizes, deck size)
+        unchanged. belief.py samples from what the game so far revealed.
+        """
+        opp = 1 - seat
+        opp_hand = self.hands[opp]
+        # Camels never sit in a hand, so unseen camels are all in the deck
+        goods = [c for c in range(N_GOODS) for _ in range(opp_hand[c] + self.deck_counts[c])]
+        rng.shuffle(goods)
+        n = self.hand_sizes[opp]
+        hand = [0] * N_GOODS
+        for c in goods[:n]:
+            hand[c] += 1
+        return self.redeal(opp, hand, goods[n:], rng)
+
+    def redeal(self, seat: int, hand: Sequence[int], deck: List[int], rng: random.Random = random) -> 'GameState':
+        """Clone the state with ``seat``'s goods set to the ``hand`` counts (as
+        many goods as the seat holds), the deck made of the ``deck`` goods and
+        its camels in random order, and the undrawn bonus tokens reshuffled"""
+        other = self.clone()
+        other_hand = other.hands[seat]
+        other_hand[:N_GOODS] = hand
+        deck = deck + [CAMEL] * self.deck_counts[CAMEL]
+        rng.shuffle(deck)
+        other.deck = deck
+        other.deck_pos = 0
+        other.deck_counts = [deck.count(c) for c in range(N_CARDS)]
+        other.sell_bits[seat] = sum(SELL_BITS[c] for c in range(N_GOODS) if other_hand[c] >= SELL_MINIMUM[c])
+        other.hand_hashes[seat] = other._hand_hash(seat)
+        other.bonus = [pile[:pos] + tuple(rng.sample(pile[pos:], len(pile) - pos))
+                       for pile, pos in zip(self.bonus, self.bonus_pos)]
+        return other
+
+    def _hand_hash(self, seat: int) -> int:
+        h, hand, keys = 0, self.hands[seat], Z_HAND[seat]
+        for c in range(N_GOODS):
+            h ^= keys[c][hand[c]]
+        return h
+
+    def rehash(self) -> None:
+        """Recompute the Zobrist hashes from scratch"""
+        h = Z_DECK[self.deck_size()]
+        for c in range(N_CARDS):
+            h ^= Z_MARKET[c][self.market[c]]
+        for g in range(N_GOODS):
+            h ^= Z_SOLD[g][self.sold[g]]
+        for seat in range(2):
+            h ^= Z_HAND[seat][CAMEL][self.hands[seat][CAMEL]] ^ Z_POINTS[seat][self.points[seat]]
+        for k, pos in enumerate(self.bonus_pos):
+            h ^= Z_BONUS[k][pos]
+        self.hash = h
+        self.hand_hashes = [self._hand_hash(0), self._hand_hash(1)]
+
+    def key(self) -> int:
+        """Zobrist key of the full position: every count and the side to move"""
+        h = self.hash ^ self.hand_hashes[0] ^ self.hand_hashes[1]
+        return h ^ Z_TO_MOVE if self.turn & 1 else h
+
+    def information_key(self, seat: int) -> int:
+        """Zobrist key of what ``seat`` can see: the opponent's goods only by count"""
+        opp = 1 - seat
+        h = self.hash ^ self.hand_hashes[seat] ^ Z_HAND_SIZE[opp][self.hand_sizes[opp]]
+        return h ^ Z_TO_MOVE if self.turn & 1 else h
+
+    @property
+    def to_move(self) -> int:
+        return self.turn & 1
+
+    def deck_size(self) -> int:
+        return len(self.deck) - self.deck_pos
+
+    def hand_size(self, seat: int) -> int:
+        return self.hand_sizes[seat]
+
+    def draw(self) -> int:
+        """Pop the top card of the deck, returning its index or -1 if empty"""
+        if self.deck_pos >= len(self.deck):
+            return -1
+        c = self.deck[self.deck_pos]
+        size = len(self.deck) - self.deck_pos
+        self.hash ^= Z_DECK[size] ^ Z_DECK[size - 1]
+        self.deck_pos += 1
+        self.deck_counts[c] -= 1
+        return c
+
+    def add_to_market(self, c: int, n: int = 1) -> None:
+        market = self.market
+        keys = Z_MARKET[c]
+        self.hash ^= keys[market[c]] ^ keys[market[c] + n]
+        market[c] += n
+        if market[c]:
+            self.market_bits |= MARKET_BITS[c]
+        else:
+            self.market_bits &= ~MARKET_BITS[c]
+
+    def add_to_hand(self, seat: int, c: int, n: int = 1) -> None:
+        hand = self.hands[seat]
+        keys = Z_HAND[seat][c]
+        if c == CAMEL:
+            self.hash ^= keys[hand[c]] ^ keys[hand[c] + n]
+            hand[c] += n
+            return
+        self.hand_hashes[seat] ^= keys[hand[c]] ^ keys[hand[c] + n]
+        hand[c] += n
+        self.hand_sizes[seat] += n
+        if hand[c] >= SELL_MINIMUM[c]:
+            self.sell_bits[seat] |= SELL_BITS[c]
+        else:
+            self.sell_bits[seat] &= ~SELL_BITS[c]
+
+    def refill_market(self, n: int) -> None:
+        for _ in range(n):
+            c = self.draw()
+            if c < 0:
+                return
+            self.add_to_market(c)
+
+    def legal_mask(self, seat: int) -> int:
+        """Bitmask of the legal actions for ``seat`` (bit ``a`` for action ``a``)
+
+        Take, camel and sell bits are kept up to date as cards move, so only
+        the hand limit and exchange availability are checked here.
+        """
+        mask = self.market_bits | self.sell_bits[seat]
+        if self.hand_sizes[seat] >= HAND_LIMIT:
+            mask &= ~TAKE_GOODS_BITS
+        if self.can_exchange(seat):
+            mask |= EXCHANGE_BIT
+        return mask
+
+    def legal_actions(self, seat: int) -> List[int]:
+        """Every legal encoded action for ``seat``, exchanges included"""
+        mask = self.legal_mask(seat)
+        actions = [a for a in range(EXCHANGE) if mask >> a & 1]
+        if mask & EXCHANGE_BIT:
+            actions.extend(EXCHANGE + i for i in self.legal_exchanges(seat))
+        return actions
+
+    def legal_exchanges(self, seat: int) -> Tuple[int, ...]:
+        """Indices into ``EXCHANGES`` of the exchanges ``seat`` may play"""
+        hand = self.hands[seat]
+        camels = min(hand[CAMEL], HAND_LIMIT - self.hand_sizes[seat], MAX_EXCHANGE)
+        give = tuple([min(n, MAX_EXCHANGE) for n in hand[:N_GOODS]] + [camels])
+        return legal_exchanges(tuple(self.market), give)
+
+    def can_exchange(self, seat: int) -> bool:
+        # Any legal exchange can be cut down to a legal two-card one, so it is
+        # enough to look for a pair of market goods and two cards to give back
+        # that are of none of the taken types.
+        hand, market = self.hands[seat], self.market
+        camels = min(hand[CAMEL], HAND_LIMIT - self.hand_sizes[seat])
+        free = self.hand_sizes[seat] + camels
+        if free < MIN_EXCHANGE:
+            return False
+        for g in range(N_GOODS):
+            if not market[g]:
+                continue
+            if market[g] >= 2 and free - hand[g] >= MIN_EXCHANGE:
+                return True
+            for h in range(g + 1, N_GOODS):
+                if market[h] and free - hand[g] - hand[h] >= MIN_EXCHANGE:
+                    return True
+        return False
+
+    def take_good(self, seat: int, good: int) -> bool:
+        if good >= N_GOODS or not self.market[good] or self.hand_sizes[seat] >= HAND_LIMIT:
+            return False
+        self.add_to_market(good, -1)
+        self.add_to_hand(seat, good)
+        self.refill_market(1)
+        return True
+
+    def take_camels(self, seat: int) -> bool:
+        n = self.market[CAMEL]
+        if not n:
+            return False
+        self.add_to_market(CAMEL, -n)
+        self.add_to_hand(seat, CAMEL, n)
+        self.refill_market(n)
+        return True
+
+    def sell(self, seat: int, good: int, n: int) -> int:
+        """Sell ``n`` goods and return the points earned, or -1 if illegal"""
+        if good >= N_GOODS or n < SELL_MINIMUM[good] or self.hands[seat][good] < n:
+            return -1
+        self.add_to_hand(seat, good, -n)
+        sold = self.sold[good]
+        gained = TOKEN_SUMS[good][sold + n] - TOKEN_SUMS[good][sold]
+        k = BONUS_PILE[n]
+        if k >= 0:
+            pos = self.bonus_pos[k]
+            if pos < BONUS_SIZES[k]:
+                gained += self.bonus[k][pos]
+                self.hash ^= Z_BONUS[k][pos] ^ Z_BONUS[k][pos + 1]
+                self.bonus_pos[k] = pos + 1
+        self._score(seat, good, n, gained)
+        return gained
+
+    def _score(self, seat: int, good: int, n: int, gained: int) -> None:
+        points, sold = self.points[seat], self.sold[good]
+        self.hash ^= (Z_POINTS[seat][points] ^ Z_POINTS[seat][points + gained]
+                      ^ Z_SOLD[good][sold] ^ Z_SOLD[good][sold + n])
+        self.points[seat] = points + gained
+        self.sold[good] = sold + n
+
+    def exchange(self, seat: int, take: Sequence[int], give: Sequence[int]) -> bool:
+        """Swap ``take`` market goods for ``give`` hand cards (both count vectors)"""
+        hand, market = self.hands[seat], self.market
+        n_take = sum(take)
+        if n_take < MIN_EXCHANGE or n_take != sum(give) or take[CAMEL]:
+            return False
+        if self.hand_sizes[seat] + give[CAMEL] > HAND_LIMIT:
+            return False
+        for c in range(N_CARDS):
+            if market[c] < take[c] or hand[c] < give[c] or (take[c] and give[c]):
+                return False
+        for c in range(N_CARDS):
+            delta = take[c] - give[c]
+            if delta:
+                self.add_to_hand(seat, c, delta)
+                self.add_to_market(c, -delta)
+        return True
+
+    def play(self, seat: int, action: int) -> bool:
+        """Play an encoded action (see actions.py) for ``seat``
+
+        Selling always sells every card of the chosen good. Returns whether
+        the action was legal; the turn counter is left alone.
+        """
+        if action < N_GOODS:
+            return self.take_good(seat, action)
+        if action == TAKE_CAMELS:
+            return self.take_camels(seat)
+        if SELL_OFFSET <= action < EXCHANGE:
+            good = action - SELL_OFFSET
+            return self.sell(seat, good, self.hands[seat][good]) >= 0
+        if action >= EXCHANGE:
+            take, give = EXCHANGES[action - EXCHANGE]
+            return self.exchange(seat, take, give)
+        return False
+
+    def apply(self, action: int) -> bool:
+        """Play an encoded action for the player to move and pass the turn if legal
+
+        Legal actions push (action, deck pointer, cards moved, points gained)
+        onto ``undo_log`` so ``undo()`` can take them back. Everything else
+        (the cards drawn, the exchange contents) is recovered from the deck
+        order and the action encoding.
+        """
+        seat = self.turn & 1
+        if action == TAKE_CAMELS:
+            n = self.market[CAMEL]
+        elif SELL_OFFSET <= action < EXCHANGE:
+            n = self.hands[seat][action - SELL_OFFSET]
+        else:
+            n = 0
+        deck_pos, points = self.deck_pos, self.points[seat]
+        if not self.play(seat, action):
+            return False
+        self.undo_log += (action, deck_pos, n, self.points[seat] - points)
+        self.turn += 1
+        return True
+
+    def undo(self) -> None:
+        """Take back the last action played with ``apply()``"""
+        log = self.undo_log
+        gained, n, deck_pos, action = log.pop(), log.pop(), log.pop(), log.pop()
+        self.turn -= 1
+        seat = self.turn & 1
+        # Cards drawn to refill the market go back on top of the deck
+        for c in self.deck[deck_pos:self.deck_pos]:
+            self.add_to_market(c, -1)
+            self.deck_counts[c] += 1
+        self.hash ^= Z_DECK[len(self.deck) - self.deck_pos] ^ Z_DECK[len(self.deck) - deck_pos]
+        self.deck_pos = deck_pos
+        if action < N_GOODS:
+            self.add_to_hand(seat, action, -1)
+            self.add_to_market(action)
+        elif action == TAKE_CAMELS:
+            self.add_to_hand(seat, CAMEL, -n)
+            self.add_to_market(CAMEL, n)
+        elif action < EXCHANGE:
+            good = action - SELL_OFFSET
+            self.add_to_hand(seat, good, n)
+            self._score(seat, good, -n, -gained)
+            sold = self.sold[good]
+            # Whatever the goods tokens do not account for came from a bonus pile
+            if gained > TOKEN_SUMS[good][sold + n] - TOKEN_SUMS[good][sold]:
+                k = BONUS_PILE[n]
+                pos = self.bonus_pos[k]
+                self.hash ^= Z_BONUS[k][pos] ^ Z_BONUS[k][pos - 1]
+                self.bonus_pos[k] = pos - 1
+        else:
+            take, give = EXCHANGES[action - EXCHANGE]
+            for c in range(N_CARDS):
+                delta = take[c] - give[c]
+                if delta:
+                    self.add_to_hand(seat, c, -delta)
+                    self.add_to_market(c, delta)
+
+    def depleted_stacks(self) -> int:
+        return sum(s >= size for s, size in zip(self.sold, STACK_SIZES))
+
+    def is_terminal(self) -> bool:
+        return self.deck_pos >= len(self.deck) or self.depleted_stacks() >= DEPLETED_STACKS_TO_END
+
+    def final_points(self) -> List[int]:
+        """Token points per seat plus the camel bonus for the larger herd"""
+        points = list(self.points)
+        herd0, herd1 = self.hands[0][CAMEL], self.hands[1][CAMEL]
+        if herd0 != herd1:
+            points[0 if herd0 > herd1 else 1] += BONUS_CAMEL
+        return points
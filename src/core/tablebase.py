@@ -0,0 +1,128 @@
+# tablebase.py
+import hashlib
+import json
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from .endgame import EndgameSolver
+from .game import Game
+from .state import GameState
+
+# A tablebase directory holds keys.npy, the sorted 64-bit hashes of the
+# solver's memo keys, and values.npy, the expected margin still to come for
+# the player to move in each position. Both are flat arrays, so a lookup is
+# one binary search over the memory-mapped keys and one read of a value.
+VERSION = 1
+
+
+def table_key(key: bytes) -> int:
+    """Stable 64-bit hash of an ``EndgameSolver`` memo key, leaving out its exchange streak"""
+    return int.from_bytes(hashlib.blake2b(key[:1] + key[2:], digest_size=8).digest(), 'little')
+
+
+class Tablebase:
+    """Solved endgame positions memory-mapped from a directory written by ``build_tablebase``
+
+    The table is opened with ``mmap_mode='r'``: nothing is read up front and
+    worker processes probing the same file share its pages through the OS
+    cache. Keys are 64-bit hashes, so a lookup could in principle return
+    the value of a colliding position (about one in 10^19 per probe).
+    """
+
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+        with open(os.path.join(directory, 'meta.json')) as f:
+            self.meta = json.load(f)
+        # Plain ndarray views of the maps skip np.memmap's per-call overhead
+        self.keys = np.asarray(np.load(os.path.join(directory, 'keys.npy'), mmap_mode='r'))
+        self.values = np.asarray(np.load(os.path.join(directory, 'values.npy'), mmap_mode='r'))
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def probe(self, key: bytes) -> Optional[float]:
+        """Stored value for an ``EndgameSolver`` memo key, or None"""
+        h = np.uint64(table_key(key))
+        keys = self.keys
+        i = keys.searchsorted(h)
+        if i < len(keys) and keys[i] == h:
+            return float(self.values[i])
+        return None
+
+    def lookup(self, state: GameState) -> Optional[float]:
+        """Expected final margin of the player to move in ``state``, or None if not stored"""
+        value = self.probe(EndgameSolver.key(state))
+        if value is None:
+            return None
+        seat = state.turn & 1
+        return state.points[seat] - state.points[1 - seat] + value
+
+
+def solve_games(games: int, max_deck: int, seed: int, player_types: Sequence[str] = ('ai', 'ai'),
+                max_exchanges: int = 0) -> Tuple[np.ndarray, np.ndarray]:
+    """Play headless games to the last ``max_deck`` cards and solve them; returns (keys, values)
+
+    Every position the solver visits below each game's end is kept, not
+    just the positions the games reached.
+    """
+    solver = EndgameSolver(max_deck, max_exchanges)
+    rng = random.Random(seed)
+    for _ in range(games):
+        game = Game(gui=None, player_types=list(player_types), seed=rng.getrandbits(64))
+        while not game.is_game_over() and not solver.applicable(game.state):
+            game.play_turn()
+        if solver.applicable(game.state):
+            solver.values(game.state)
+        game.close()
+    entries = [(table_key(key), value) for key, value in solver.memo.items() if not key[1]]
+    keys = np.fromiter((k for k, _ in entries), dtype=np.uint64, count=len(entries))
+    values = np.fromiter((v for _, v in entries), dtype=np.float32, count=len(entries))
+    return keys, values
+
+
+def write_tablebase(directory: str, keys: np.ndarray, values: np.ndarray, meta: Dict) -> int:
+    """Sort, deduplicate and write a table, merging with the one already there; returns its size"""
+    os.makedirs(directory, exist_ok=True)
+    keys_path = os.path.join(directory, 'keys.npy')
+    values_path = os.path.join(directory, 'values.npy')
+    meta_path = os.path.join(directory, 'meta.json')
+    meta = dict(meta, version=VERSION)
+    if os.path.exists(keys_path):
+        with open(meta_path) as f:
+            if json.load(f) != meta:
+                raise ValueError(f'{directory} holds a tablebase built with different settings')
+        keys = np.concatenate([np.load(keys_path), keys])
+        values = np.concatenate([np.load(values_path), values])
+    keys, first = np.unique(keys, return_index=True)
+    # Write then rename, so processes mapping the old table never see half a file
+    for path, array in ((values_path, values[first].astype(np.float32)), (keys_path, keys.astype(np.uint64))):
+        tmp = path + '.tmp'
+        with open(tmp, 'wb') as f:
+            np.save(f, array)
+        os.replace(tmp, path)
+    with open(meta_path, 'w') as f:
+        json.dump(meta, f)
+    return len(keys)
+
+
+def build_tablebase(directory: str, games: int, max_deck: int = 3, workers: Optional[int] = None,
+                    seed: Optional[int] = None, player_types: Sequence[str] = ('ai', 'ai'),
+                    max_exchanges: int = 0, log: Callable[[str], None] = print) -> int:
+    """Solve the endgames of ``games`` games on ``workers`` processes into ``directory``"""
+    workers = workers or os.cpu_count() or 1
+    rng = random.Random(seed)
+    chunks = [games // workers + (i < games % workers) for i in range(workers)]
+    keys: List[np.ndarray] = []
+    values: List[np.ndarray] = []
+    with ProcessPoolExecutor(workers) as pool:
+        futures = [pool.submit(solve_games, n, max_deck, rng.getrandbits(64), tuple(player_types), max_exchanges)
+                   for n in chunks if n]
+        for future in futures:
+            k, v = future.result()
+            keys.append(k)
+            values.append(v)
+            log(f"worker solved {len(k):,} positions")
+    meta = {'max_deck': max_deck, 'max_exchanges': max_exchanges}
+    return write_tablebase(directory, np.concatenate(keys), np.concatenate(values), meta)
@@ -0,0 +1,77 @@
+import random
+from typing import Dict, List, TYPE_CHECKING
+from .cards import Card, GOODS, N_GOODS
+
+if TYPE_CHECKING:
+    from .state import GameState
+
+# Goods tokens of each type in ``Card`` order, top of the stack first
+GOODS_TOKENS = (
+    (7, 7, 5, 5, 5),
+    (6, 6, 5, 5, 5),
+    (5, 5, 5, 5, 5),
+    (5, 3, 3, 2, 2, 1, 1),
+    (5, 3, 3, 2, 2, 1, 1),
+    (4, 3, 2, 1, 1, 1, 1, 1, 1),
+)
+STACK_SIZES = tuple(len(stack) for stack in GOODS_TOKENS)
+# Bonus piles for selling 3, 4 and 5+ goods at once, shuffled every game
+BONUS_TOKENS = (
+    (1, 1, 2, 2, 2, 3, 3),
+    (4, 4, 5, 5, 6, 6),
+    (8, 8, 9, 10, 10),
+)
+BONUS_SIZES = tuple(len(pile) for pile in BONUS_TOKENS)
+N_BONUS_TOKENS = sum(BONUS_SIZES)
+
+# Longer than any number of goods of one type, so sold + n always fits
+MAX_SOLD = 16
+# TOKEN_SUMS[g][i] is the value of the first i tokens of stack g (the whole
+# stack once i runs past it), so a sale is scored with one subtraction
+TOKEN_SUMS = tuple(tuple(sum(stack[:i]) for i in range(MAX_SOLD)) for stack in GOODS_TOKENS)
+# TOP_TOKEN[g][i] is the token on top of stack g after i sales, 0 once empty
+TOP_TOKEN = tuple(tuple(stack[i] if i < len(stack) else 0 for i in range(MAX_SOLD)) for stack in GOODS_TOKENS)
+# Bonus pile drawn from when selling n goods, -1 for none
+BONUS_PILE = tuple(-1 if n < 3 else min(n, 5) - 3 for n in range(MAX_SOLD))
+
+
+class TokenBank:
+    """View of a game's goods token stacks and bonus piles.
+
+    The stacks are fixed, so they are represented by how many goods of each
+    type were sold (``GameState.sold``); the bonus piles are shuffled tuples
+    shared between clones with a draw pointer each (``GameState.bonus`` and
+    ``bonus_pos``). Selling goes through ``GameState.sell``.
+    """
+
+    def __init__(self, state: 'GameState') -> None:
+        self.state = state
+
+    def shuffle(self, rng: random.Random = random) -> None:
+        self.state.shuffle_bonus(rng)
+
+    def remaining(self, card: Card) -> int:
+        g = GOODS.index(card)
+        return max(STACK_SIZES[g] - self.state.sold[g], 0)
+
+    def stack(self, card: Card) -> List[int]:
+        """Tokens left on a goods stack, top first"""
+        g = GOODS.index(card)
+        return list(GOODS_TOKENS[g][self.state.sold[g]:])
+
+    def top_tokens(self) -> List[int]:
+        """Value of the next token of every goods stack, 0 for empty stacks"""
+        sold = self.state.sold
+        return [TOP_TOKEN[g][sold[g]] for g in range(N_GOODS)]
+
+    def bonus_remaining(self) -> List[int]:
+        """Tokens left in the 3, 4 and 5-card bonus piles"""
+        return [size - pos for size, pos in zip(BONUS_SIZES, self.state.bonus_pos)]
+
+    def depleted_stacks(self) -> int:
+        return self.state.depleted_stacks()
+
+    @property
+    def transactions(self) -> Dict[Card, int]:
+        """Goods sold so far, per type"""
+        return dict(zip(GOODS, self.state.sold))
@@ -0,0 +1,198 @@
+import math
+import os
+import random
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from itertools import combinations
+from typing import Callable, Dict, List, Optional, Tuple
+from .game import Game
+
+
+def _score(points: List[int], seat: int) -> float:
+    if points[0] == points[1]:
+        return 0.5
+    return 1.0 if points[seat] > points[1 - seat] else 0.0
+
+
+def play_pair(a: str, b: str, seed: int) -> Tuple[float, float]:
+    """Play the deal ``seed`` twice, ``a`` moving first and then second
+
+    Returns the score of ``a`` (1, 0.5 or 0) in each game.
+    """
+    first = Game(gui=None, player_types=[a, b], seed=seed)
+    first.play()
+    second = Game(gui=None, player_types=[b, a], seed=seed)
+    second.play()
+    return _score(first.state.final_points(), 0), _score(second.state.final_points(), 1)
+
+
+def expected_score(elo: float) -> float:
+    return 1.0 / (1.0 + 10.0 ** (-elo / 400.0))
+
+
+def elo_difference(score: float) -> float:
+    score = min(max(score, 1e-6), 1 - 1e-6)
+    return -400.0 * math.log10(1.0 / score - 1.0)
+
+
+@dataclass
+class Pairing:
+    """Results of ``a`` against ``b`` and the SPRT of H1: a is ``elo1`` stronger vs H0: ``elo0``
+
+    Each entry of ``pairs`` is the mean score of ``a`` over one deal played
+    from both seats, so the test uses the pentanomial model: pairing the
+    seats cancels most of the luck of the deal and the variance is estimated
+    over pairs, not games.
+    """
+    a: str
+    b: str
+    pairs: List[float] = field(default_factory=list)
+    wins: int = 0
+    draws: int = 0
+    losses: int = 0
+    decision: Optional[str] = None
+
+    def add(self, scores: Tuple[float, float]) -> None:
+        for s in scores:
+            self.wins += s == 1.0
+            self.draws += s == 0.5
+            self.losses += s == 0.0
+        self.pairs.append(sum(scores) / 2)
+
+    @property
+    def games(self) -> int:
+        return 2 * len(self.pairs)
+
+    @property
+    def score(self) -> float:
+        return sum(self.pairs) / len(self.pairs) if self.pairs else 0.5
+
+    def _variance(self) -> float:
+        m = self.score
+        return sum((x - m) ** 2 for x in self.pairs) / len(self.pairs)
+
+    def elo(self) -> Tuple[float, float]:
+        """Elo difference of ``a`` over ``b`` and its 95% confidence half-width"""
+        n = len(self.pairs)
+        if n < 2:
+            return 0.0, math.inf
+        m, se = self.score, math.sqrt(self._variance() / n)
+        return elo_difference(m), (elo_difference(m + 1.96 * se) - elo_difference(m - 1.96 * se)) / 2
+
+    def llr(self, elo0: float, elo1: float) -> float:
+        """Generalized SPRT log-likelihood ratio (normal approximation)"""
+        var = self._variance() if self.pairs else 0.0
+        if var <= 0:
+            return 0.0
+        s0, s1 = expected_score(elo0), expected_score(elo1)
+        return len(self.pairs) * (s1 - s0) * (2 * self.score - s0 - s1) / (2 * var)
+
+
+def fit_ratings(pairings: List[Pairing], players: List[str], anchor: float = 1500.0,
+                iterations: int = 500) -> Dict[str, float]:
+    """Elo ratings fitted to every game played (Bradley-Terry, draws as half wins)
+
+    Unlike incremental Elo updates the fit does not depend on the order in
+    which games finished. Each pairing gets one virtual draw so a clean
+    sweep still gives a finite rating; ratings average to ``anchor``.
+    """
+    index = {p: i for i, p in enumerate(players)}
+    n = len(players)
+    wins = [0.0] * n
+    games = [[0.0] * n for _ in range(n)]
+    for p in pairings:
+        i, j = index[p.a], index[p.b]
+        wins[i] += p.wins + 0.5 * p.draws + 0.5
+        wins[j] += p.losses + 0.5 * p.draws + 0.5
+        games[i][j] += p.games + 1
+        games[j][i] += p.games + 1
+    strength = [1.0] * n
+    for _ in range(iterations):
+        for i in range(n):
+            denom = sum(games[i][j] / (strength[i] + strength[j]) for j in range(n) if games[i][j])
+            if denom:
+                strength[i] = wins[i] / denom
+        mean = sum(math.log(s) for s in strength) / n
+        strength = [s / math.exp(mean) for s in strength]
+    return {p: anchor + 400.0 * math.log10(strength[index[p]]) for p in players}
+
+
+class Tournament:
+    """Round-robin or gauntlet between registered player kinds (see players/registry.py)
+
+    Every pairing plays paired deals (the same seed from both seats) on a
+    process pool until its SPRT accepts a hypothesis or ``max_pairs`` deals
+    were played. Undecided pairings share the pool, so a pairing that is
+    settled early hands its workers to the others at once. In a gauntlet
+    the first player meets every other one.
+    """
+
+    def __init__(self, players: List[str], format: str = 'round-robin', max_pairs: int = 500,
+                 elo0: float = 0.0, elo1: float = 50.0, alpha: float = 0.05, beta: float = 0.05,
+                 min_pairs: int = 10, workers: Optional[int] = None, seed: Optional[int] = None) -> None:
+        if format == 'round-robin':
+            matchups = list(combinations(players, 2))
+        elif format == 'gauntlet':
+            matchups = [(players[0], p) for p in players[1:]]
+        else:
+            raise ValueError(f"Unknown tournament format {format!r}")
+        self.players = players
+        self.pairings = [Pairing(a, b) for a, b in matchups]
+        self.max_pairs = max_pairs
+        self.elo0, self.elo1 = elo0, elo1
+        self.lower = math.log(beta / (1 - alpha))
+        self.upper = math.log((1 - beta) / alpha)
+        self.min_pairs = min_pairs
+        self.workers = workers or os.cpu_count() or 1
+        self.seed = seed if seed is not None else random.getrandbits(48)
+
+    def _decide(self, p: Pairing) -> None:
+        if p.decision is not None or len(p.pairs) < self.min_pairs:
+            return
+        llr = p.llr(self.elo0, self.elo1)
+        if llr >= self.upper:
+            p.decision = 'H1'
+        elif llr <= self.lower:
+            p.decision = 'H0'
+        elif len(p.pairs) >= self.max_pairs:
+            p.decision = 'max'
+
+    def run(self, log: Callable[[str], None] = print) -> Dict[str, float]:
+        """Play until every pairing is decided; returns the fitted ratings"""
+        submitted = {id(p): 0 for p in self.pairings}
+        running: Dict[Future, Pairing] = {}
+        # Every pairing replays the same deals, seed + k for its k-th pair
+        with ProcessPoolExecutor(self.workers) as pool:
+            while True:
+                open_pairings = [p for p in self.pairings
+                                 if p.decision is None and submitted[id(p)] < self.max_pairs]
+                while open_pairings and len(running) < 2 * self.workers:
+                    p = min(open_pairings, key=lambda p: submitted[id(p)])
+                    running[pool.submit(play_pair, p.a, p.b, self.seed + submitted[id(p)])] = p
+                    submitted[id(p)] += 1
+                    if submitted[id(p)] >= self.max_pairs:
+                        open_pairings.remove(p)
+                if not running:
+                    break
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    p = running.pop(future)
+                    decided = p.decision is not None
+                    p.add(future.result())
+                    self._decide(p)
+                    if p.decision is not None and not decided:
+                        elo, ci = p.elo()
+                        log(f"{p.a} vs {p.b}: {p.decision} after {p.games} games, "
+                            f"Elo {elo:+.0f} ± {ci:.0f}")
+        for p in self.pairings:
+            if p.decision is None:
+                p.decision = 'max'
+        return fit_ratings(self.pairings, self.players)
+
+    def table(self) -> List[List]:
+        rows = []
+        for p in self.pairings:
+            elo, ci = p.elo()
+            rows.append([p.a, p.b, p.games, f"{p.wins}-{p.draws}-{p.losses}", f"{p.score:.1%}",
+                         f"{elo:+.0f} ± {ci:.0f}", f"{p.llr(self.elo0, self.elo1):.2f}", p.decision])
+        return rows
@@ -0,0 +1,103 @@
+import random
+from typing import Any, Dict, List, Optional
+from .cards import N_CARDS, N_GOODS
+
+# Zobrist keys for every (zone, card, count) a GameState can hold. The key for
+# a count of zero is 0, so an empty state hashes to 0 and every count change
+# is a pair of XORs (see GameState.add_to_market / add_to_hand).
+MAX_COUNT = 16
+MAX_DECK = 64
+MAX_POINTS = 1024
+
+_rng = random.Random(0x4A414950)
+
+
+def _table(n: int) -> List[int]:
+    return [0] + [_rng.getrandbits(64) for _ in range(n - 1)]
+
+
+Z_MARKET = tuple(_table(MAX_COUNT) for _ in range(N_CARDS))
+Z_HAND = tuple(tuple(_table(MAX_COUNT) for _ in range(N_CARDS)) for _ in range(2))
+Z_HAND_SIZE = tuple(_table(MAX_COUNT) for _ in range(2))
+Z_SOLD = tuple(_table(MAX_COUNT) for _ in range(N_GOODS))
+Z_POINTS = tuple(_table(MAX_POINTS) for _ in range(2))
+Z_BONUS = tuple(_table(MAX_COUNT) for _ in range(3))
+Z_DECK = _table(MAX_DECK)
+Z_TO_MOVE = _rng.getrandbits(64)
+
+
+class TranspositionTable:
+    """Bounded hash table from Zobrist keys to search results.
+
+    Entries live in a power-of-two array indexed by the low bits of the key.
+    On a collision the newer entry wins if the slot holds the same position,
+    comes from an older search (see ``new_search``) or has a depth no
+    greater than the new one; otherwise the store is dropped. Counters for
+    probes, hits, stores and replacements are kept for tuning.
+    """
+
+    def __init__(self, size: int = 1 << 20) -> None:
+        size = 1 << max(size - 1, 1).bit_length()
+        self.mask = size - 1
+        self.keys: List[int] = [0] * size
+        self.values: List[Any] = [None] * size
+        self.depths: List[int] = [0] * size
+        self.generations: List[int] = [0] * size
+        self.generation = 0
+        self.probes = 0
+        self.hits = 0
+        self.stores = 0
+        self.replacements = 0
+        self.rejections = 0
+
+    def __len__(self) -> int:
+        return self.mask + 1
+
+    def new_search(self) -> None:
+        """Mark every current entry as replaceable by the next search"""
+        self.generation += 1
+
+    def get(self, key: int) -> Optional[Any]:
+        self.probes += 1
+        i = key & self.mask
+        if self.keys[i] == key and self.values[i] is not None:
+            self.hits += 1
+            self.generations[i] = self.generation
+            return self.values[i]
+        return None
+
+    def put(self, key: int, value: Any, depth: int = 0) -> bool:
+        i = key & self.mask
+        if self.values[i] is not None and self.keys[i] != key:
+            if self.generations[i] == self.generation and self.depths[i] > depth:
+                self.rejections += 1
+                return False
+            self.replacements += 1
+        self.keys[i] = key
+        self.values[i] = value
+        self.depths[i] = depth
+        self.generations[i] = self.generation
+        self.stores += 1
+        return True
+
+    def clear(self) -> None:
+        size = self.mask + 1
+        self.keys = [0] * size
+        self.values = [None] * size
+        self.depths = [0] * size
+        self.generations = [0] * size
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / self.probes if self.probes else 0.0
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            'size': self.mask + 1,
+            'probes': self.probes,
+            'hits': self.hits,
+            'hit_rate': self.hit_rate,
+            'stores': self.stores,
+            'replacements': self.replacements,
+            'rejections': self.rejections,
+        }
@@ -0,0 +1,65 @@
+# bench_action_head.py
+# What the flat Discrete(N_ACTIONS) action space costs MaskablePPO: the
+# policy head's share of the parameters, the masks kept in the rollout
+# buffer, and where a training step spends its time. Run from the
+# repository root:
+#   python -m src.experiments.bench_action_head [num_envs] [n_steps] [rollouts]
+import sys
+import time
+import numpy as np
+import torch
+from tabulate import tabulate
+from sb3_contrib import MaskablePPO
+from src.core.actions import N_ACTIONS
+from src.core.players.gymnasium.vec_env import JaipurVecEnv
+
+
+def timed(fn, repeat: int = 20) -> float:
+    """Mean milliseconds per call of ``fn``"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main() -> None:
+    num_envs = int(sys.argv[1]) if len(sys.argv) > 1 else 32
+    n_steps = int(sys.argv[2]) if len(sys.argv) > 2 else 64
+    rollouts = int(sys.argv[3]) if len(sys.argv) > 3 else 3
+    env = JaipurVecEnv(num_envs, seed=0, flat=True)
+    model = MaskablePPO("MlpPolicy", env, n_steps=n_steps, batch_size=min(2048, num_envs * n_steps), n_epochs=4,
+                        device='cpu', seed=0)
+    policy = model.policy
+    params = sum(p.numel() for p in policy.parameters())
+    head = sum(p.numel() for p in policy.action_net.parameters())
+
+    obs, masks = env.reset(), env.action_masks()
+    actions = np.array([np.flatnonzero(m)[0] for m in masks])
+    env_ms = timed(lambda: (env.action_masks(), env.step(actions)))
+    with torch.no_grad():
+        features = torch.as_tensor(obs)
+        latent = policy.mlp_extractor.forward_actor(policy.extract_features(features, policy.pi_features_extractor))
+        head_ms = timed(lambda: policy.action_net(latent))
+        forward_ms = timed(lambda: policy(features))
+        masked_ms = timed(lambda: policy(features, action_masks=masks))
+
+    steps = rollouts * num_envs * n_steps
+    start = time.perf_counter()
+    model.learn(total_timesteps=steps)
+    rate = steps / (time.perf_counter() - start)
+
+    print(f"{N_ACTIONS:,} actions, {num_envs} envs x {n_steps} steps, torch threads {torch.get_num_threads()}")
+    print(tabulate([
+        ['policy parameters', f"{params:,}"],
+        ['in the action head', f"{head:,} ({head / params:.1%})"],
+        ['rollout buffer masks', f"{model.rollout_buffer.action_masks.nbytes / 2 ** 20:,.0f} MiB"],
+        ['env step + masks', f"{env_ms:.1f} ms"],
+        ['action head (linear)', f"{head_ms:.1f} ms"],
+        ['policy forward', f"{forward_ms:.1f} ms"],
+        ['masked policy forward', f"{masked_ms:.1f} ms"],
+        ['learn (all envs)', f"{rate:,.0f} steps/s"],
+    ], headers=["", f"per step of {num_envs} envs"]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+# bench_inference.py
+# Compares per-move predict() calls with the batched InferenceServer when many
+# games run concurrently on threads. Uses an untrained policy, which costs the
+# same per forward pass as a trained one. Run from the repository root:
+#   python -m src.experiments.bench_inference [games] [max_batch] [max_wait_ms]
+import sys
+import threading
+import time
+from tabulate import tabulate
+from stable_baselines3 import PPO
+from src.core.game import Game
+from src.core.players.gymnasium.environment import JaipurEnv
+from src.core.players.gymnasium.ai_player import TrainedAIPlayer
+from src.core.players.gymnasium.inference import InferenceServer
+
+
+def play_games(model, games: int, server=None) -> float:
+    """Play ``games`` games at once, one thread each, and return moves per second"""
+    moves = [0] * games
+
+    def play(i: int) -> None:
+        game = Game(gui=None, player_types=['ai', 'ai'], seed=i)
+        for seat in range(2):
+            player = TrainedAIPlayer(f"Trained AI {seat + 1}", server=server)
+            player.model = model
+            player.bind(game.state, seat)
+            game.players[seat] = player
+        game.play()
+        moves[i] = len(game.actions)
+
+    threads = [threading.Thread(target=play, args=(i,)) for i in range(games)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return sum(moves) / (time.perf_counter() - start)
+
+
+def main() -> None:
+    games = int(sys.argv[1]) if len(sys.argv) > 1 else 64
+    max_batch = int(sys.argv[2]) if len(sys.argv) > 2 else games
+    max_wait = float(sys.argv[3]) / 1000 if len(sys.argv) > 3 else 0.002
+    model = PPO("MultiInputPolicy", JaipurEnv(), device='cpu')
+
+    rows = [['predict per move', '-', f"{play_games(model, games):,.0f}", '-', '-', '-']]
+    with InferenceServer(model, max_batch, max_wait) as server:
+        rate = play_games(model, games, server)
+        s = server.stats()
+    rows.append([f'server (batch {max_batch}, wait {max_wait * 1000:g}ms)', f"{s['mean_batch']:.1f}",
+                 f"{rate:,.0f}", f"{s['p50_ms']:.2f}", f"{s['p90_ms']:.2f}", f"{s['p99_ms']:.2f}"])
+    print(f"{games} concurrent games")
+    print(tabulate(rows, headers=["Mode", "Mean batch", "Moves/s", "p50 ms", "p90 ms", "p99 ms"]))
+
+
+if __name__ == "__main__":
+    main()
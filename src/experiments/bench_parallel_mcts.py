@@ -0,0 +1,44 @@
+# bench_parallel_mcts.py
+# Measures how root-parallel MCTS throughput scales with the number of worker
+# processes. Run from the repository root:
+#   python -m src.experiments.bench_parallel_mcts [max_workers] [seconds_per_search]
+import os
+import sys
+from tabulate import tabulate
+from src.core.game import Game
+from src.core.players.parallel_mcts import RootParallelMCTS, TreeParallelMCTS
+
+
+def measure(search, state, searches: int = 3) -> float:
+    search.search(state, 0)  # warm up workers and caches
+    playouts, elapsed = 0, 0.0
+    for _ in range(searches):
+        search.search(state, 0)
+        playouts += search.playouts
+        elapsed += search.elapsed
+    return playouts / elapsed
+
+
+def main() -> None:
+    max_workers = int(sys.argv[1]) if len(sys.argv) > 1 else os.cpu_count() or 1
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 1.0
+    state = Game(gui=None, player_types=['ai', 'ai']).state
+
+    workers = sorted({1, max_workers} | {w for w in (2, 4, 8, 16, 32, 64) if w < max_workers})
+    rows, base = [], None
+    for n in workers:
+        with RootParallelMCTS(workers=n, iterations=10 ** 9, time_limit=seconds, seed=0) as search:
+            rate = measure(search, state)
+        base = base or rate
+        rows.append(['root', n, f"{rate:,.0f}", f"{rate / base:.2f}x", f"{rate / (base * n):.0%}"])
+
+    for n in (1, 4):
+        rate = measure(TreeParallelMCTS(threads=n, iterations=10 ** 9, time_limit=seconds, seed=0), state)
+        rows.append(['tree (threads)', n, f"{rate:,.0f}", f"{rate / base:.2f}x", f"{rate / (base * n):.0%}"])
+
+    print(f"{os.cpu_count()} CPUs, {seconds:g}s per search from the opening position")
+    print(tabulate(rows, headers=["Mode", "Workers", "Playouts/s", "Speedup", "Efficiency"], tablefmt="simple"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,440 @@
+# bench_suite.py
+# Micro and macro benchmarks of the rules engine, env and agents, compared
+# against stored baselines. Run from the repository root:
+#   python -m src.experiments.bench_suite                 # run and compare with the baseline
+#   python -m src.experiments.bench_suite --save          # run and store as the new baseline
+#   python -m src.experiments.bench_suite -k player. --threshold 0.1
+# Exits with status 1 if any benchmark is slower (or allocates more) than its
+# baseline by more than the threshold.
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional
+from tabulate import tabulate
+from src.core.game import Game
+from src.core.deck import Deck
+from src.core.market import Market
+from src.core.cards import CARDS, GOODS, CAMEL, N_GOODS
+from src.core.state import GameState
+from src.core.actions import TAKE_CAMELS, SELL_OFFSET, EXCHANGE
+from src.core.exchanges import EXCHANGES
+from src.core.players.ai import AIPlayer
+from src.core.players.mcts import MCTS
+from src.core.rollout import random_playout, heuristic_playout
+
+BASELINE = os.path.join(os.path.dirname(__file__), 'bench_baseline.json')
+
+# A benchmark gets the number of operations to run and returns a closure
+# running them; everything before the closure is setup and is not timed. It
+# is called again for every timed repeat, so the closure may consume state.
+Benchmark = Callable[[int], Callable[[], None]]
+
+
+@dataclass
+class _Entry:
+    name: str
+    setup: Benchmark
+    unit: str
+
+
+BENCHMARKS: List[_Entry] = []
+
+
+def benchmark(name: str, unit: str = 'op') -> Callable[[Benchmark], Benchmark]:
+    def register(setup: Benchmark) -> Benchmark:
+        BENCHMARKS.append(_Entry(name, setup, unit))
+        return setup
+    return register
+
+
+@lru_cache(maxsize=None)
+def positions(count: int = 256) -> List[GameState]:
+    """Reproducible mid-game positions reached by random play"""
+    rng = random.Random(0)
+    out = []
+    while len(out) < count:
+        state = Game(gui=None, player_types=['ai', 'ai'], seed=rng.getrandbits(64)).state
+        for _ in range(rng.randrange(4, 30)):
+            if state.is_terminal():
+                break
+            seat = state.turn & 1
+            mask = state.legal_mask(seat)
+            action = rng.choice([a for a in range(EXCHANGE + 1) if mask >> a & 1])
+            if action == EXCHANGE:
+                action += rng.choice(state.legal_exchanges(seat))
+            state.apply(action)
+        if not state.is_terminal():
+            out.append(state)
+    return out
+
+
+def _positions_where(n: int, legal: Callable[[GameState], List[int]]) -> List[tuple]:
+    """``n`` (state copy, action) pairs cycling over the positions where ``legal`` finds actions"""
+    pool = [(s, a) for s in positions() for a in legal(s)[:1]]
+    return [(pool[i % len(pool)][0].clone(), pool[i % len(pool)][1]) for i in range(n)]
+
+
+def _market(state: GameState) -> Market:
+    """Market view of ``state``, without dealing a new one"""
+    market = Market.__new__(Market)
+    market.state = state
+    return market
+
+
+def _player(state: GameState) -> AIPlayer:
+    player = AIPlayer(rng=random.Random(0))
+    player.bind(state, state.turn & 1)
+    return player
+
+
+# -- Rules engine ---------------------------------------------------------
+
+@benchmark('deck.shuffle')
+def deck_shuffle(n: int) -> Callable[[], None]:
+    state, rng = GameState(), random.Random(0)
+
+    def run() -> None:
+        for _ in range(n):
+            Deck(state, rng)
+    return run
+
+
+@benchmark('deck.draw', unit='card')
+def deck_draw(n: int) -> Callable[[], None]:
+    decks = []
+    while sum(len(d) for d in decks) < n:
+        decks.append(Deck(GameState(), random.Random(len(decks))))
+
+    def run() -> None:
+        left = n
+        for deck in decks:
+            left -= len(deck.draw(min(left, len(deck))))
+    return run
+
+
+@benchmark('market.queries')
+def market_queries(n: int) -> Callable[[], None]:
+    markets = [Market(Deck(GameState(), random.Random(i))) for i in range(16)]
+
+    def run() -> None:
+        for i in range(n):
+            market = markets[i & 15]
+            market.count(CARDS[i % 7])
+            market.camel_count()
+            market.goods()
+    return run
+
+
+@benchmark('player.take_single_good')
+def take_single_good(n: int) -> Callable[[], None]:
+    pairs = _positions_where(n, lambda s: [a for a in s.legal_actions(s.turn & 1) if a < N_GOODS])
+    players = [(_player(s), GOODS[a]) for s, a in pairs]
+
+    def run() -> None:
+        for player, card in players:
+            player.take_single_good(card, None, None)
+    return run
+
+
+@benchmark('player.take_camels')
+def take_camels(n: int) -> Callable[[], None]:
+    players = [_player(s) for s, _ in _positions_where(n, lambda s: [TAKE_CAMELS] if s.market[CAMEL] else [])]
+
+    def run() -> None:
+        for player in players:
+            player.take_camels(None, None)
+    return run
+
+
+@benchmark('player.sell_goods')
+def sell_goods(n: int) -> Callable[[], None]:
+    pairs = _positions_where(n, lambda s: [a for a in s.legal_actions(s.turn & 1) if SELL_OFFSET <= a < EXCHANGE])
+    players = [(_player(s), GOODS[a - SELL_OFFSET]) for s, a in pairs]
+
+    def run() -> None:
+        for player, card in players:
+            player.sell_goods(card, player.count(card))
+    return run
+
+
+@benchmark('player.exchange')
+def exchange(n: int) -> Callable[[], None]:
+    pairs = _positions_where(n, lambda s: [a for a in s.legal_actions(s.turn & 1) if a >= EXCHANGE])
+    moves = []
+    for s, a in pairs:
+        take, give = EXCHANGES[a - EXCHANGE]
+        moves.append((_player(s), {CARDS[c]: k for c, k in enumerate(take) if k},
+                      {CARDS[c]: k for c, k in enumerate(give) if k}))
+
+    def run() -> None:
+        for player, take, give in moves:
+            player.exchange(None, take, give)
+    return run
+
+
+@benchmark('state.legal_actions')
+def legal_actions(n: int) -> Callable[[], None]:
+    states = positions()
+
+    def run() -> None:
+        for i in range(n):
+            state = states[i & 255]
+            state.legal_actions(state.turn & 1)
+    return run
+
+
+@benchmark('state.random_playout', unit='game')
+def state_playout(n: int) -> Callable[[], None]:
+    states = [positions()[0].clone() for _ in range(n)]
+    rng = random.Random(0)
+
+    def run() -> None:
+        for state in states:
+            random_playout(state, rng)
+    return run
+
+
+@benchmark('rollout.heuristic_playout', unit='game')
+def rollout_heuristic(n: int) -> Callable[[], None]:
+    states = [positions()[0].clone() for _ in range(n)]
+    rng = random.Random(0)
+
+    def run() -> None:
+        for state in states:
+            heuristic_playout(state, rng)
+    return run
+
+
+@benchmark('rollout.epsilon_playout', unit='game')
+def rollout_epsilon(n: int) -> Callable[[], None]:
+    states = [positions()[0].clone() for _ in range(n)]
+    rng = random.Random(0)
+
+    def run() -> None:
+        for state in states:
+            heuristic_playout(state, rng, 0.1)
+    return run
+
+
+@benchmark('game.headless_ai_vs_ai', unit='game')
+def game_playout(n: int) -> Callable[[], None]:
+    games = [Game(gui=None, player_types=['ai', 'ai'], seed=i) for i in range(n)]
+
+    def run() -> None:
+        for game in games:
+            game.play()
+    return run
+
+
+# -- Agents ---------------------------------------------------------------
+
+@benchmark('ai.take_turn', unit='move')
+def ai_take_turn(n: int) -> Callable[[], None]:
+    players = [(_player(s), _market(s)) for s, _ in _positions_where(n, lambda s: [0])]
+
+    def run() -> None:
+        for player, market in players:
+            player.take_turn(market, None)
+    return run
+
+
+@benchmark('mcts.search_100', unit='search')
+def mcts_search(n: int) -> Callable[[], None]:
+    search, state = MCTS(iterations=100, seed=0), positions()[0]
+
+    def run() -> None:
+        for _ in range(n):
+            search.search(state, state.turn & 1)
+    return run
+
+
+@lru_cache(maxsize=None)
+def _model():
+    from stable_baselines3 import PPO
+    from src.core.players.gymnasium.environment import JaipurEnv
+    return PPO("MlpPolicy", JaipurEnv(flat=True), device='cpu', seed=0)
+
+
+@benchmark('trained.take_turn', unit='move')
+def trained_take_turn(n: int) -> Callable[[], None]:
+    from src.core.players.gymnasium.ai_player import TrainedAIPlayer
+    players = []
+    for state, _ in _positions_where(n, lambda s: [0]):
+        player = TrainedAIPlayer(rng=random.Random(0), model=_model())
+        player.bind(state, state.turn & 1)
+        players.append(player)
+
+    def run() -> None:
+        for player in players:
+            player.take_turn(None, None)
+    return run
+
+
+# -- Gymnasium env --------------------------------------------------------
+
+@benchmark('env.reset')
+def env_reset(n: int) -> Callable[[], None]:
+    from src.core.players.gymnasium.environment import JaipurEnv
+    env = JaipurEnv()
+    env.reset(seed=0)
+
+    def run() -> None:
+        for _ in range(n):
+            env.reset()
+    return run
+
+
+@benchmark('env.step', unit='step')
+def env_step(n: int) -> Callable[[], None]:
+    from src.core.players.gymnasium.environment import JaipurEnv
+    env = JaipurEnv()
+    env.reset(seed=0)
+    rng = random.Random(0)
+
+    def run() -> None:
+        for _ in range(n):
+            seat = env.current_player.seat
+            _, _, done, _, _ = env.step(rng.choice(env.game.state.legal_actions(seat)))
+            if done:
+                env.reset()
+    return run
+
+
+@benchmark('vec_env.step_256', unit='step')
+def vec_env_step(n: int) -> Callable[[], None]:
+    import numpy as np
+    from src.core.actions import EXCHANGE
+    from src.core.exchanges import N_EXCHANGES
+    from src.core.players.gymnasium.vec_env import JaipurVecEnv
+    env = JaipurVecEnv(256, seed=0, flat=True)
+    env.reset()
+    rng = np.random.default_rng(0)
+    envs = np.arange(256)
+
+    def run() -> None:
+        # Roughly uniform legal moves, like an untrained masked policy, so
+        # games wander (always playing the first legal action revisits few
+        # positions). Exchanges are played in proportion to how many are
+        # legal; the one played is the first legal after a random column.
+        for _ in range(n):
+            masks = env.action_masks()
+            simple = masks[:, :EXCHANGE]
+            actions = (rng.random((256, EXCHANGE)) * simple).argmax(axis=1)
+            start = EXCHANGE + int(rng.integers(N_EXCHANGES))
+            exchange = masks[:, start:].argmax(axis=1) + start
+            exchange = np.where(masks[envs, exchange], exchange, masks[:, EXCHANGE:].argmax(axis=1) + EXCHANGE)
+            exchanges = np.count_nonzero(masks[:, EXCHANGE:], axis=1)
+            use = rng.random(256) * (simple.sum(axis=1) + exchanges) < exchanges
+            actions[use] = exchange[use]
+            env.step(actions)
+    return run
+
+
+# -- Harness --------------------------------------------------------------
+
+def measure(entry: _Entry, min_time: float, repeat: int) -> Dict[str, float]:
+    """Best-of-``repeat`` throughput, with ``n`` grown until a run takes ``min_time``, and allocations"""
+    n = 1
+    while True:
+        run = entry.setup(n)
+        start = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time or n >= 1 << 20:
+            break
+        n = max(n * 2, int(n * min_time / max(elapsed, 1e-9) * 1.2))
+    best = elapsed
+    for _ in range(repeat - 1):
+        run = entry.setup(n)
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+
+    # Allocations over a short run: peak traced memory and blocks left allocated
+    k = max(1, min(n, 100))
+    run = entry.setup(k)
+    tracemalloc.start()
+    run()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {'ops_per_s': n / best, 'peak_kib': peak / 1024, 'retained_b_per_op': retained / k}
+
+
+def compare(result: Dict[str, float], base: Optional[Dict[str, float]], threshold: float) -> str:
+    if base is None:
+        return 'new'
+    if result['ops_per_s'] < base['ops_per_s'] * (1 - threshold):
+        return 'SLOWER'
+    # Allocation sizes are noisy at the kilobyte level, so allow a small absolute slack too
+    if result['peak_kib'] > base['peak_kib'] * (1 + threshold) + 4:
+        return 'MORE MEMORY'
+    if result['ops_per_s'] > base['ops_per_s'] * (1 + threshold):
+        return 'faster'
+    return 'ok'
+
+
+def machine() -> str:
+    return f"{platform.python_implementation()} {platform.python_version()}, {platform.machine()}, " \
+           f"{os.cpu_count()} CPUs"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the Jaipur engine, env and agents")
+    parser.add_argument('-k', '--filter', default='', help="only run benchmarks whose name contains this")
+    parser.add_argument('--min-time', type=float, default=0.2, help="seconds per timed run")
+    parser.add_argument('--repeat', type=int, default=3)
+    # Runs on a busy machine vary by up to ~20%, hence the default
+    parser.add_argument('--threshold', type=float, default=0.25, help="allowed relative slowdown")
+    parser.add_argument('--baseline', default=BASELINE)
+    parser.add_argument('--save', action='store_true', help="store the results as the new baseline")
+    args = parser.parse_args()
+
+    stored = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            stored = json.load(f)
+    baselines = stored.get('results', {})
+    if stored and stored.get('machine') != machine():
+        print(f"note: baseline recorded on {stored.get('machine')}, running on {machine()}")
+
+    rows, results, regressions = [], {}, []
+    for entry in BENCHMARKS:
+        if args.filter not in entry.name:
+            continue
+        try:
+            result = measure(entry, args.min_time, args.repeat)
+        except ImportError as e:
+            rows.append([entry.name, '-', '-', '-', '-', f'skipped ({e.name} missing)'])
+            continue
+        results[entry.name] = result
+        base = baselines.get(entry.name)
+        status = compare(result, base, args.threshold)
+        if status.isupper():
+            regressions.append(entry.name)
+        change = f"{result['ops_per_s'] / base['ops_per_s'] - 1:+.0%}" if base else '-'
+        rows.append([entry.name, f"{result['ops_per_s']:,.0f} {entry.unit}/s", change,
+                     f"{result['peak_kib']:,.1f}", f"{result['retained_b_per_op']:,.0f}", status])
+        print(f"{entry.name}: {result['ops_per_s']:,.0f} {entry.unit}/s", file=sys.stderr)
+
+    print(machine())
+    print(tabulate(rows, headers=["Benchmark", "Throughput", "vs baseline", "Peak KiB", "Retained B/op", "Status"]))
+    if args.save:
+        rounded = {name: {k: round(v, 1) for k, v in r.items()} for name, r in results.items()}
+        merged = dict(baselines, **rounded)
+        with open(args.baseline, 'w') as f:
+            json.dump({'machine': machine(), 'results': merged}, f, indent=1, sort_keys=True)
+        print(f"baseline saved to {args.baseline}")
+    elif regressions:
+        print(f"{len(regressions)} regression(s) beyond {args.threshold:.0%}: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+# profile_game.py
+# Where the time goes in headless games and env steps. Run from the
+# repository root:
+#   python -m src.experiments.profile_game --players ai mcts:200 --games 5
+#   python -m src.experiments.profile_game --env-steps 20000 --trace env.json
+#   python -m src.experiments.profile_game --trace games.speedscope.json --allocations
+# Traces open in chrome://tracing, https://ui.perfetto.dev or https://www.speedscope.app
+import argparse
+import random
+from src.core.game import Game
+from src.core.profiling import Profiler, span
+
+
+def play_games(games: int, players, rng: random.Random) -> None:
+    for _ in range(games):
+        game = Game(gui=None, player_types=list(players), seed=rng.getrandbits(64))
+        with span('game.play'):
+            game.play()
+
+
+def step_env(steps: int, rng: random.Random) -> None:
+    import numpy as np
+    from src.core.players.gymnasium.environment import JaipurEnv
+    env = JaipurEnv()
+    env.reset(seed=rng.getrandbits(32))
+    for _ in range(steps):
+        action = rng.choice(np.flatnonzero(env.action_masks()))
+        _, _, terminated, truncated, _ = env.step(action)
+        if terminated or truncated:
+            env.reset()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile headless games and env steps")
+    parser.add_argument('--players', nargs=2, default=['ai', 'ai'], help="player kinds (see registry.py)")
+    parser.add_argument('--games', type=int, default=20)
+    parser.add_argument('--env-steps', type=int, default=0, help="random masked JaipurEnv steps to play")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--allocations', action='store_true', help="track allocations (much slower)")
+    parser.add_argument('--trace', help="write a Chrome trace, or speedscope for *.speedscope.json")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    if any(kind.startswith('trained') for kind in args.players):
+        # The profiler only wraps the model stack once it is loaded
+        import src.core.players.gymnasium.ai_player  # noqa: F401
+    with Profiler(track_allocations=args.allocations) as profiler:
+        play_games(args.games, args.players, rng)
+        if args.env_steps:
+            step_env(args.env_steps, rng)
+    print(profiler.summary())
+    if args.trace:
+        profiler.save(args.trace)
+        print(f"\n{len(profiler.events):,} spans written to {args.trace}")
+
+
+if __name__ == "__main__":
+    main()
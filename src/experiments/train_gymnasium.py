@@ -1,21 +1,22 @@
 # train.py
-import gymnasium as gym
-from stable_baselines3 import PPO
-from stable_baselines3.common.env_util import make_vec_env
-from stable_baselines3.common.callbacks import EvalCallback
-from src.core.players.gymnasium.environment import JaipurEnv
+from sb3_contrib import MaskablePPO
+from sb3_contrib.common.maskable.callbacks import MaskableEvalCallback
+from src.core.players.gymnasium.vec_env import JaipurVecEnv
 
-# Create environment
-env = make_vec_env(lambda: JaipurEnv(), n_envs=4)
+# Create environment: all games are stepped together in NumPy, so use many
+# envs and short rollouts instead of a few long ones. Flat observations let
+# PPO use a plain MlpPolicy instead of the Dict-splitting MultiInputPolicy
+env = JaipurVecEnv(num_envs=256, seed=0, flat=True)
 
-# Create model
-model = PPO(
-    "MultiInputPolicy",
+# Create model. Almost every action is illegal in any given position,
+# so MaskablePPO samples only from env.action_masks() (it calls it itself)
+model = MaskablePPO(
+    "MlpPolicy",
     env,
     verbose=1,
     learning_rate=0.0003,
-    n_steps=2048,
-    batch_size=64,
+    n_steps=64,
+    batch_size=2048,
     n_epochs=10,
     gamma=0.99,
     gae_lambda=0.95,
@@ -24,7 +25,7 @@ model = PPO(
 )
 
 # Evaluation callback
-eval_callback = EvalCallback(
+eval_callback = MaskableEvalCallback(
     env,
     best_model_save_path="./logs/",
     log_path="./logs/",
@@ -0,0 +1,47 @@
+# train_league.py
+from sb3_contrib import MaskablePPO
+from stable_baselines3.common.callbacks import BaseCallback
+from src.core.players.gymnasium.league import League, make_league_env
+
+# The agent plays one seat against opponents drawn from a league: the
+# rule-based AI, a cheap search agent and frozen snapshots of itself
+league = League(prioritized=True, max_snapshots=8)
+league.add('ai')
+league.add('mcts:50', weight=0.5)
+env = make_league_env(league, n_envs=32, flat=True)
+
+
+class SnapshotCallback(BaseCallback):
+    """Adds a frozen copy of the learner to the league every ``every`` steps"""
+
+    def __init__(self, every: int) -> None:
+        super().__init__()
+        self.every = every
+
+    def _on_step(self) -> bool:
+        if self.num_timesteps % self.every < self.training_env.num_envs:
+            league.add_snapshot(self.model)
+        return True
+
+
+# Masked like train_gymnasium.py; the league env's action_masks covers the learner's seat
+model = MaskablePPO(
+    "MlpPolicy",
+    env,
+    verbose=1,
+    learning_rate=0.0003,
+    n_steps=128,
+    batch_size=1024,
+    n_epochs=10,
+    gamma=0.99,
+    gae_lambda=0.95,
+    clip_range=0.2,
+    ent_coef=0.01
+)
+
+model.learn(total_timesteps=1_000_000, callback=SnapshotCallback(every=50_000))
+model.save("jaipur_ppo_league")
+for opponent in league.opponents:
+    print(f"{opponent.name}: {opponent.games} games, learner score {opponent.win_rate:.1%}")
+env.close()
+league.close()
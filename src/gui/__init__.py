@@ -1,15 +1,42 @@
-from .terminal import TerminalGUI
-from .pygame import PygameGUI
 from .blind import BlindGUI
 from .basegui import BaseGUI
 from .views import PlayerView, MarketView
 
 
+# The concrete front ends pull in pygame, colorama and tabulate, so they are
+# only imported when first requested. Headless simulations never pay for them.
+_LAZY_GUIS = {
+    'TerminalGUI': '.terminal',
+    'PygameGUI': '.pygame',
+    'Spectator': '.spectate',
+}
+
+
+def __getattr__(name: str):
+    if name in _LAZY_GUIS:
+        from importlib import import_module
+        return getattr(import_module(_LAZY_GUIS[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def make_gui(kind: str = 'terminal') -> BaseGUI:
+    """Build the GUI named by ``kind`` ('terminal', 'pygame' or 'blind')"""
+    if kind == 'blind':
+        return BlindGUI()
+    if kind == 'pygame':
+        from .pygame import PygameGUI
+        return PygameGUI()
+    from .terminal import TerminalGUI
+    return TerminalGUI()
+
+
 __all__ = [
     'TerminalGUI',
     'PygameGUI',
+    'Spectator',
     'BlindGUI',
     'BaseGUI',
     'PlayerView',
-    'MarketView'
-]
\ No newline at end of file
+    'MarketView',
+    'make_gui'
+]
@@ -4,8 +4,8 @@ from .views import PlayerView, MarketView
 
 class BaseGUI(ABC):
     @abstractmethod
-    def show_game_state(self, players: List[PlayerView], market: MarketView) -> None:
+    def show_game_state(self, players: List[PlayerView], market: MarketView, current_player_name: str = None) -> None:
         pass
     @abstractmethod
-    def show_turn_options(self, players: List[PlayerView], market: MarketView) -> None:
+    def show_turn_options(self) -> None:
         pass
@@ -1,12 +1,31 @@
-from abc import ABC, abstractmethod
-from typing import List
+from typing import List, Dict, Optional, Sequence
+from .basegui import BaseGUI
 from .views import PlayerView, MarketView
 
 
-class BlindGUI(ABC):
+class BlindGUI(BaseGUI):
+    """No-op GUI for headless games: renders nothing and never prompts"""
 
-    def show_game_state(self, players: List[PlayerView], market: MarketView) -> None:
+    def show_game_state(self, players: List[PlayerView], market: MarketView, current_player_name: str = None) -> None:
         pass
 
-    def show_turn_options(self, players: List[PlayerView], market: MarketView) -> None:
-        pass
\ No newline at end of file
+    def show_turn_options(self) -> None:
+        pass
+
+    def get_action_choice(self) -> Optional[int]:
+        return None
+
+    def select_good(self, available_goods: List['Card']) -> Optional['Card']:
+        return None
+
+    def select_goods_to_sell(self, player_goods: Dict['Card', int]) -> Optional[tuple]:
+        return None
+
+    def select_exchange(self, exchanges: Sequence[int]) -> Optional[int]:
+        return None
+
+    def show_message(self, message: str) -> None:
+        pass
+
+    def show_error(self, error: str) -> None:
+        pass
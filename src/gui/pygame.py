@@ -1,9 +1,15 @@
 # pygame_gui.py
 import pygame
+import queue
 import sys
-from typing import List, Dict, Optional
-from dataclasses import dataclass
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
 from ..core import Card
+from ..core.exchanges import describe_exchange
 from .basegui import BaseGUI
 from .views import PlayerView, MarketView
 
@@ -17,6 +23,7 @@ GREEN = (0, 128, 0)
 BROWN = (165, 42, 42)
 RED = (255, 0, 0)
 BEIGE = (245, 245, 220)
+GREY = (110, 110, 110)
 
 # Card colors
 CARD_COLORS = {
@@ -29,9 +36,48 @@ CARD_COLORS = {
     Card.CAMEL: (210, 180, 140)
 }
 
+FPS = 60
+CARD_STEP = 90
+BUTTON_HEIGHT = 50
+# Screen areas redrawn independently; a change to one only repaints its rectangle
+REGIONS = {
+    'title': pygame.Rect(0, 0, 1024, 65),
+    'market': pygame.Rect(40, 70, 640, 200),
+    'player0': pygame.Rect(40, 285, 640, 210),
+    'player1': pygame.Rect(40, 495, 640, 215),
+    'panel': pygame.Rect(690, 70, 320, 640),
+    'status': pygame.Rect(0, 720, 1024, 48),
+}
+SPINNER = '|/-\\'
+
+
+@dataclass
+class _Prompt:
+    """A question for the human player, answered from the UI loop through ``future``"""
+    title: str
+    options: List[Tuple[str, Any]]
+    cancel: bool = True
+    # Wide prompts (long labels, messages) cover the board instead of the side panel
+    wide: bool = False
+    message: List[str] = field(default_factory=list)
+    per_page: int = 9
+    page: int = 0
+    future: Future = field(default_factory=Future)
+
+
+class PygameGUI(BaseGUI):
+    """Pygame front end driven by a single event loop.
+
+    ``run(game.play)`` plays the game on a worker thread while the calling
+    (main) thread runs the render loop at ``FPS``: the game thread posts
+    state updates and questions for the human player, and blocks on the
+    answers, so AI turns (search, inference) never stall the window. Only
+    the screen regions whose contents changed are repainted, and every text
+    and button surface is rendered once and cached. Without ``run`` the GUI
+    methods still work when called from the UI thread: questions run the
+    same loop until they are answered.
+    """
 
-
-class PygameGUI:
     def __init__(self):
         pygame.init()
         self.screen_width = 1024
@@ -46,6 +92,22 @@ class PygameGUI:
 
         # Load card images or create placeholders
         self.card_images = self._create_card_placeholders()
+        self._texts: 'OrderedDict[Tuple, pygame.Surface]' = OrderedDict()
+        self._buttons: Dict[Tuple, pygame.Surface] = {}
+
+        self._ui_thread = threading.current_thread()
+        self._inbox: 'queue.SimpleQueue[Tuple[str, Any]]' = queue.SimpleQueue()
+        self.players: List[PlayerView] = []
+        self.market: Optional[MarketView] = None
+        self.current_player: Optional[str] = None
+        self.turn_started = time.perf_counter()
+        self.prompt: Optional[_Prompt] = None
+        # (rect, value) of the clickable buttons on screen, and the one under the mouse
+        self._hits: List[Tuple[pygame.Rect, Any]] = []
+        self._hover: Optional[pygame.Rect] = None
+        self._dirty = set(REGIONS)
+        self._full = True
+        self._status = ''
 
     def _create_card_placeholders(self):
         """Create simple colored rectangles as card placeholders"""
@@ -63,209 +125,320 @@ class PygameGUI:
             card_images[card] = surf
         return card_images
 
-    def _draw_button(self, text, rect, hover=False):
-        color = self.button_hover if hover else self.button_color
-        pygame.draw.rect(self.screen, color, rect, border_radius=5)
-        pygame.draw.rect(self.screen, BLACK, rect, 2, border_radius=5)
-
-        text_surf = self.font.render(text, True, WHITE)
-        text_rect = text_surf.get_rect(center=rect.center)
-        self.screen.blit(text_surf, text_rect)
+    # -- Cached drawing -----------------------------------------------------
+
+    def _text(self, text: str, color=BLACK, title: bool = False) -> pygame.Surface:
+        key = (text, color, title)
+        surf = self._texts.get(key)
+        if surf is None:
+            surf = (self.title_font if title else self.font).render(text, True, color)
+            self._texts[key] = surf
+            # Status lines change every frame, so keep the cache bounded
+            if len(self._texts) > 512:
+                self._texts.popitem(last=False)
+        else:
+            self._texts.move_to_end(key)
+        return surf
+
+    def _button(self, text: str, size: Tuple[int, int], hover: bool) -> pygame.Surface:
+        key = (text, size, hover)
+        surf = self._buttons.get(key)
+        if surf is None:
+            surf = pygame.Surface(size, pygame.SRCALPHA)
+            rect = surf.get_rect()
+            pygame.draw.rect(surf, self.button_hover if hover else self.button_color, rect, border_radius=5)
+            pygame.draw.rect(surf, BLACK, rect, 2, border_radius=5)
+            label = self._text(text, WHITE)
+            surf.blit(label, label.get_rect(center=rect.center))
+            self._buttons[key] = surf
+        return surf
+
+    def _draw_button(self, text, rect, value=None):
+        self.screen.blit(self._button(text, rect.size, rect == self._hover), rect)
+        self._hits.append((rect, value))
         return rect
 
-    def show_game_state(self, players: List[PlayerView], market: MarketView):
-        self.screen.fill(BEIGE)
-
-        # Draw title
-        title = self.title_font.render("JAIPUR", True, BLACK)
-        self.screen.blit(title, (self.screen_width // 2 - title.get_width() // 2, 20))
-
-        # Draw market
-        self._draw_market(market)
-
-        # Draw players
-        for i, player in enumerate(players):
-            self._draw_player(player, i)
-
-        pygame.display.flip()
-
-    def _draw_market(self, market: MarketView):
-        # Market title
-        market_title = self.font.render("MARKET", True, BLACK)
-        self.screen.blit(market_title, (50, 80))
-
-        # Draw goods
-        x, y = 50, 120
-        for card, count in market.goods.items():
-            if count > 0:
-                for _ in range(count):
-                    self.screen.blit(self.card_images[card], (x, y))
-                    x += 90
-        for _ in range(market.camels):
-            self.screen.blit(self.card_images[Card.CAMEL], (x, y))
-            x += 90
-
-    def _draw_player(self, player: PlayerView, player_num: int):
-        y_offset = 300 if player_num == 0 else 500
-        player_title = self.font.render(player.name, True, BLACK)
-        self.screen.blit(player_title, (50, y_offset))
-
-        # Draw hand
-        x, y = 50, y_offset + 40
-        for card, count in player.hand.items():
-            if count > 0:
-                for _ in range(count):
-                    self.screen.blit(self.card_images[card], (x, y))
-                    x += 90
-
-        # Draw camels and tokens
-        camel_text = self.font.render(f"Camels: {player.camels}", True, BLACK)
-        self.screen.blit(camel_text, (50, y_offset + 180))
-
-        token_text = self.font.render(f"Tokens: {player.tokens}", True, BLACK)
-        self.screen.blit(token_text, (200, y_offset + 180))
+    # -- Calls from the game ------------------------------------------------
+
+    def run(self, target: Callable[[], Any]) -> Any:
+        """Call ``target`` (e.g. ``game.play``) on a worker thread and run the UI until it returns"""
+        outcome: List[Any] = []
+
+        def work() -> None:
+            try:
+                outcome.append((target(), None))
+            except BaseException as e:
+                outcome.append((None, e))
+
+        worker = threading.Thread(target=work, name='jaipur-game', daemon=True)
+        worker.start()
+        self._loop(lambda: bool(outcome))
+        result, error = outcome[0]
+        if error is not None:
+            raise error
+        return result
+
+    def _post(self, kind: str, value: Any) -> None:
+        if threading.current_thread() is self._ui_thread:
+            self._apply(kind, value)
+            self._render()
+        else:
+            self._inbox.put((kind, value))
+
+    def _ask(self, prompt: _Prompt) -> Any:
+        """Show ``prompt`` and wait for the player's answer"""
+        if threading.current_thread() is self._ui_thread:
+            self._apply('prompt', prompt)
+            self._loop(prompt.future.done)
+        else:
+            self._inbox.put(('prompt', prompt))
+        return prompt.future.result()
+
+    def show_game_state(self, players: List[PlayerView], market: MarketView, current_player_name: str = None):
+        self._post('state', (players, market, current_player_name))
 
     def show_turn_options(self):
-        buttons = [
-            ("Take Good", pygame.Rect(700, 100, 200, 50)),
-            ("Take Camels", pygame.Rect(700, 170, 200, 50)),
-            ("Sell Goods", pygame.Rect(700, 240, 200, 50)),
-            ("Exchange", pygame.Rect(700, 310, 200, 50)),
-            ("View State", pygame.Rect(700, 380, 200, 50))
-        ]
-
-        mouse_pos = pygame.mouse.get_pos()
-        for text, rect in buttons:
-            hover = rect.collidepoint(mouse_pos)
-            self._draw_button(text, rect, hover)
-
-        pygame.display.flip()
-        return buttons
+        # The options are offered by get_action_choice
+        pass
 
     def get_action_choice(self) -> Optional[int]:
-        while True:
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    pygame.quit()
-                    sys.exit()
-
-                if event.type == pygame.MOUSEBUTTONDOWN:
-                    buttons = self.show_turn_options()  # Redraw to get button rects
-                    mouse_pos = pygame.mouse.get_pos()
-
-                    for i, (_, rect) in enumerate(buttons, 1):
-                        if rect.collidepoint(mouse_pos):
-                            return i
-            self.clock.tick(30)
+        options = [("Take Good", 1), ("Take Camels", 2), ("Sell Goods", 3), ("Exchange", 4), ("View State", 5)]
+        return self._ask(_Prompt("Your move", options, cancel=False))
 
     def select_good(self, available_goods: List[Card]) -> Optional[Card]:
         if not available_goods:
             return None
+        return self._ask(_Prompt("Select a good to take:", [(c.name.capitalize(), c) for c in available_goods]))
 
-        self.screen.fill(BEIGE)
-        title = self.font.render("Select a good to take:", True, BLACK)
-        self.screen.blit(title, (50, 50))
-
-        cards_rects = []
-        x, y = 50, 100
-        for i, card in enumerate(available_goods):
-            rect = pygame.Rect(x, y, 100, 150)
-            cards_rects.append((card, rect))
-
-            pygame.draw.rect(self.screen, WHITE, rect, border_radius=5)
-            pygame.draw.rect(self.screen, BLACK, rect, 2, border_radius=5)
-
-            # Draw card
-            self.screen.blit(self.card_images[card], (x + 10, y + 10))
-
-            x += 120
-            if x > self.screen_width - 120:
-                x = 50
-                y += 170
-
-        # Cancel button
-        cancel_rect = pygame.Rect(self.screen_width // 2 - 100, y + 100, 200, 50)
-        self._draw_button("Cancel", cancel_rect)
-
-        pygame.display.flip()
-
-        while True:
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    pygame.quit()
-                    sys.exit()
-
-                if event.type == pygame.MOUSEBUTTONDOWN:
-                    mouse_pos = pygame.mouse.get_pos()
-
-                    if cancel_rect.collidepoint(mouse_pos):
-                        return None
+    def select_goods_to_sell(self, player_goods: Dict[Card, int]) -> Optional[Tuple[Card, int]]:
+        options = [(f"{card.name.capitalize()} x{n}", (card, n))
+                   for card, count in player_goods.items() for n in range(count, 0, -1)]
+        if not options:
+            return None
+        return self._ask(_Prompt("Select goods to sell:", options))
 
-                    for card, rect in cards_rects:
-                        if rect.collidepoint(mouse_pos):
-                            return card
-            self.clock.tick(30)
+    def select_exchange(self, exchanges: Sequence[int]) -> Optional[int]:
+        if not exchanges:
+            return None
+        return self._ask(_Prompt("Select an exchange", [(describe_exchange(i), i) for i in exchanges], wide=True))
 
     def show_message(self, message: str):
-        # Create a semi-transparent overlay
-        overlay = pygame.Surface((self.screen_width, self.screen_height), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, 128))
-        self.screen.blit(overlay, (0, 0))
-
-        # Draw message box
-        box_width = 600
-        box_height = 200
-        box_x = (self.screen_width - box_width) // 2
-        box_y = (self.screen_height - box_height) // 2
-
-        pygame.draw.rect(self.screen, WHITE, (box_x, box_y, box_width, box_height))
-        pygame.draw.rect(self.screen, BLACK, (box_x, box_y, box_width, box_height), 2)
-
-        # Render message text (with word wrapping)
-        words = message.split(' ')
-        lines = []
-        current_line = []
-
-        for word in words:
-            test_line = ' '.join(current_line + [word])
-            test_width = self.font.size(test_line)[0]
-
-            if test_width < box_width - 40:
-                current_line.append(word)
-            else:
-                lines.append(' '.join(current_line))
-                current_line = [word]
-
-        if current_line:
-            lines.append(' '.join(current_line))
-
-        # Draw lines
-        y_offset = box_y + 30
-        for line in lines:
-            text = self.font.render(line, True, BLACK)
-            self.screen.blit(text, (box_x + 20, y_offset))
-            y_offset += 30
-
-        # Draw OK button
-        ok_rect = pygame.Rect(self.screen_width // 2 - 50, box_y + box_height - 70, 100, 40)
-        self._draw_button("OK", ok_rect)
-
-        pygame.display.flip()
-
-        while True:
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    pygame.quit()
-                    sys.exit()
-
-                if event.type == pygame.MOUSEBUTTONDOWN:
-                    mouse_pos = pygame.mouse.get_pos()
-                    if ok_rect.collidepoint(mouse_pos):
-                        return
-            self.clock.tick(30)
+        lines = self._wrap(message.strip(), 560)
+        self._ask(_Prompt("", [("OK", None)], cancel=False, wide=True, message=lines))
 
     def show_error(self, error: str):
         self.show_message(f"ERROR: {error}")
 
     def cleanup(self):
-        pygame.quit()
\ No newline at end of file
+        pygame.quit()
+
+    # -- UI loop ------------------------------------------------------------
+
+    def _loop(self, done: Callable[[], bool]) -> None:
+        while not done():
+            while True:
+                try:
+                    kind, value = self._inbox.get_nowait()
+                except queue.Empty:
+                    break
+                self._apply(kind, value)
+            for event in pygame.event.get():
+                self._handle(event)
+            self._render()
+            self.clock.tick(FPS)
+
+    def _apply(self, kind: str, value: Any) -> None:
+        if kind == 'state':
+            players, market, current = value
+            for i, player in enumerate(players):
+                if i >= len(self.players) or self.players[i] != player:
+                    self._dirty.add(f'player{i}')
+            if market != self.market:
+                self._dirty.add('market')
+            if current != self.current_player:
+                self.turn_started = time.perf_counter()
+            self.players, self.market, self.current_player = players, market, current
+        elif kind == 'prompt':
+            self._open(value)
+
+    def _open(self, prompt: Optional[_Prompt]) -> None:
+        closing = self.prompt
+        self.prompt = prompt
+        self._hover = None
+        if (prompt is not None and prompt.wide) or (closing is not None and closing.wide):
+            self._full = True
+        self._dirty.add('panel')
+
+    def _handle(self, event) -> None:
+        if event.type == pygame.QUIT:
+            if self.prompt is not None:
+                self.prompt.future.set_result(None)
+            pygame.quit()
+            sys.exit()
+        if event.type == pygame.MOUSEMOTION:
+            hover = next((rect for rect, _ in self._hits if rect.collidepoint(event.pos)), None)
+            if hover != self._hover:
+                self._hover = hover
+                self._dirty.add('hover')
+        elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1 and self.prompt is not None:
+            for rect, value in self._hits:
+                if rect.collidepoint(event.pos):
+                    self._click(value)
+                    return
+
+    def _click(self, value: Any) -> None:
+        prompt = self.prompt
+        if isinstance(value, tuple) and value and value[0] == '_page':
+            prompt.page += value[1]
+            self._hover = None
+            self._full = True
+            return
+        self._open(None)
+        prompt.future.set_result(None if value == '_cancel' else value)
+
+    # -- Rendering ----------------------------------------------------------
+
+    def _render(self) -> None:
+        status = self._status_text()
+        if status != self._status:
+            self._status = status
+            self._dirty.add('status')
+        modal = self.prompt is not None and self.prompt.wide
+        if self._full:
+            self.screen.fill(BEIGE)
+            self._dirty = set(REGIONS)
+        rects = []
+        if 'hover' in self._dirty:
+            self._dirty.discard('hover')
+            self._dirty.add('modal' if modal else 'panel')
+        for name in ('title', 'market', 'player0', 'player1', 'panel', 'status'):
+            # Board regions under a modal wait until it closes (which repaints everything)
+            if name not in self._dirty or (modal and not self._full and name not in ('status', 'title')):
+                continue
+            self._dirty.discard(name)
+            rect = REGIONS[name]
+            self.screen.fill(BEIGE, rect)
+            self.screen.set_clip(rect)
+            getattr(self, f'_draw_{name[:6]}')(int(name[6:]) if name.startswith('player') else None)
+            self.screen.set_clip(None)
+            rects.append(rect)
+        if modal and (self._full or 'modal' in self._dirty):
+            self._dirty.discard('modal')
+            rects.append(self._draw_modal(dim=self._full))
+        if self._full:
+            pygame.display.flip()
+            self._full = False
+        elif rects:
+            pygame.display.update(rects)
+
+    def _status_text(self) -> str:
+        fps = f"{self.clock.get_fps():.0f} fps"
+        if self.prompt is not None or self.current_player is None:
+            return fps
+        elapsed = time.perf_counter() - self.turn_started
+        spinner = SPINNER[int(elapsed * 8) % len(SPINNER)]
+        return f"{self.current_player} is thinking {spinner} {elapsed:.1f}s   {fps}"
+
+    def _draw_title(self, _) -> None:
+        title = self._text("JAIPUR", title=True)
+        self.screen.blit(title, (self.screen_width // 2 - title.get_width() // 2, 20))
+
+    def _draw_market(self, _) -> None:
+        if self.market is None:
+            return
+        market = self.market
+        self.screen.blit(self._text("MARKET"), (50, 80))
+        x, y = 50, 120
+        for card, count in market.goods.items():
+            for _ in range(count):
+                self.screen.blit(self.card_images[card], (x, y))
+                x += CARD_STEP
+        for _ in range(market.camels):
+            self.screen.blit(self.card_images[Card.CAMEL], (x, y))
+            x += CARD_STEP
+
+    def _draw_player(self, player_num: int) -> None:
+        if player_num >= len(self.players):
+            return
+        player = self.players[player_num]
+        y_offset = 300 if player_num == 0 else 500
+        color = GREEN if player.name == self.current_player else BLACK
+        self.screen.blit(self._text(player.name, color), (50, y_offset))
+        x, y = 50, y_offset + 40
+        for card, count in player.hand.items():
+            for _ in range(count):
+                self.screen.blit(self.card_images[card], (x, y))
+                x += CARD_STEP
+        self.screen.blit(self._text(f"Camels: {player.camels}"), (50, y_offset + 170))
+        self.screen.blit(self._text(f"Tokens: {player.tokens}"), (200, y_offset + 170))
+
+    def _draw_panel(self, _) -> None:
+        self._hits = []
+        prompt = self.prompt
+        if prompt is None or prompt.wide:
+            return
+        area = REGIONS['panel']
+        self.screen.blit(self._text(prompt.title), (area.x + 10, area.y + 10))
+        y = area.y + 50
+        for label, value in prompt.options:
+            self._draw_button(label, pygame.Rect(area.x + 10, y, area.width - 20, BUTTON_HEIGHT), value)
+            y += BUTTON_HEIGHT + 12
+        if prompt.cancel:
+            self._draw_button("Cancel", pygame.Rect(area.x + 10, y + 20, area.width - 20, BUTTON_HEIGHT), '_cancel')
+
+    def _draw_status(self, _) -> None:
+        self.screen.blit(self._text(self._status, GREY), (50, REGIONS['status'].y + 10))
+
+    def _draw_modal(self, dim: bool) -> pygame.Rect:
+        """Message box or long option list over the board; returns the rectangle drawn"""
+        self._hits = []
+        prompt = self.prompt
+        if dim:
+            overlay = pygame.Surface((self.screen_width, REGIONS['status'].y), pygame.SRCALPHA)
+            overlay.fill((0, 0, 0, 128))
+            self.screen.blit(overlay, (0, 0))
+        if prompt.message:
+            box = pygame.Rect(0, 0, 600, 130 + 30 * len(prompt.message))
+            box.center = (self.screen_width // 2, self.screen_height // 2)
+        else:
+            box = pygame.Rect(40, 70, self.screen_width - 80, 640)
+        pygame.draw.rect(self.screen, WHITE, box)
+        pygame.draw.rect(self.screen, BLACK, box, 2)
+        y = box.y + 30
+        for line in prompt.message:
+            self.screen.blit(self._text(line), (box.x + 20, y))
+            y += 30
+        options = prompt.options
+        pages = max(1, (len(options) + prompt.per_page - 1) // prompt.per_page)
+        if not prompt.message:
+            self.screen.blit(self._text(f"{prompt.title} ({prompt.page + 1}/{pages}):"), (box.x + 20, box.y + 15))
+            y = box.y + 55
+            options = options[prompt.page * prompt.per_page:(prompt.page + 1) * prompt.per_page]
+        for label, value in options:
+            width = 100 if prompt.message else box.width - 40
+            rect = pygame.Rect(0, y, width, BUTTON_HEIGHT if not prompt.message else 40)
+            rect.x = box.centerx - width // 2 if prompt.message else box.x + 20
+            self._draw_button(label, rect, value)
+            y += rect.height + 10
+        bottom = box.bottom - BUTTON_HEIGHT - 10
+        if not prompt.message:
+            if prompt.page > 0:
+                self._draw_button("Previous", pygame.Rect(box.x + 20, bottom, 200, BUTTON_HEIGHT), ('_page', -1))
+            if prompt.page < pages - 1:
+                self._draw_button("Next", pygame.Rect(box.right - 220, bottom, 200, BUTTON_HEIGHT), ('_page', 1))
+        if prompt.cancel:
+            self._draw_button("Cancel", pygame.Rect(box.centerx - 100, bottom, 200, BUTTON_HEIGHT), '_cancel')
+        return box
+
+    def _wrap(self, message: str, width: int) -> List[str]:
+        lines, current = [], []
+        for word in message.split(' '):
+            test_line = ' '.join(current + [word])
+            if self.font.size(test_line)[0] < width or not current:
+                current.append(word)
+            else:
+                lines.append(' '.join(current))
+                current = [word]
+        if current:
+            lines.append(' '.join(current))
+        return lines
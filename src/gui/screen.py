@@ -0,0 +1,89 @@
+# screen.py
+import re
+import sys
+import unicodedata
+from typing import Dict, List, Optional, Sequence, TextIO, Tuple
+
+ANSI = re.compile(r'(\x1b\[[0-9;?]*[A-Za-z])')
+RESET = '\x1b[0m'
+
+
+def char_width(c: str) -> int:
+    if unicodedata.combining(c) or c in '\u200d\ufe0e\ufe0f':
+        return 0
+    return 2 if unicodedata.east_asian_width(c) in 'WF' else 1
+
+
+def visible_width(text: str) -> int:
+    """Terminal columns taken by ``text``, ignoring colour codes (emoji count double)"""
+    return sum(char_width(c) for c in ANSI.sub('', text))
+
+
+def fit(text: str, width: int) -> str:
+    """Pad or cut ``text`` to exactly ``width`` columns, keeping its colour codes"""
+    out, used = [], 0
+    for part in ANSI.split(text):
+        if part.startswith('\x1b'):
+            out.append(part)
+            continue
+        for c in part:
+            w = char_width(c)
+            if used + w > width:
+                return ''.join(out) + RESET + ' ' * (width - used)
+            out.append(c)
+            used += w
+    return ''.join(out) + RESET + ' ' * (width - used)
+
+
+class Screen:
+    """Diffing renderer for an ANSI terminal.
+
+    A frame is a list of blocks ``(row, col, width, lines)`` placed with
+    cursor addressing (1-based). ``render`` remembers what every screen
+    line of every block holds and only rewrites the lines that changed
+    since the last frame, in a single write. Blocks with a ``width`` are
+    padded to it, so side-by-side blocks never erase each other; full-width
+    blocks (``width=None``) clear to the end of the line instead.
+    ``invalidate`` forces the next frame to clear and repaint everything,
+    for when something else wrote to (or scrolled) the terminal.
+    """
+
+    def __init__(self, out: Optional[TextIO] = None):
+        self.out = out or sys.stdout
+        self._lines: Dict[Tuple[int, int], Tuple[Optional[int], str]] = {}
+        self._clear = True
+        self.bytes_written = 0
+
+    def invalidate(self) -> None:
+        self._clear = True
+
+    def render(self, blocks: Sequence[Tuple[int, int, Optional[int], List[str]]],
+               cursor: Optional[int] = None) -> int:
+        """Draw a frame and leave the cursor at the start of row ``cursor``
+        (with everything below erased); returns the number of characters written"""
+        buf = []
+        if self._clear:
+            buf.append('\x1b[H\x1b[2J')
+            self._lines = {}
+            self._clear = False
+        lines = {}
+        for row, col, width, block in blocks:
+            for i, line in enumerate(block):
+                lines[row + i, col] = (width, line)
+        for (row, col), (width, line) in lines.items():
+            if self._lines.get((row, col)) == (width, line):
+                continue
+            text = line + RESET + '\x1b[K' if width is None else fit(line, width)
+            buf.append(f'\x1b[{row};{col}H{text}')
+        for (row, col), (width, _) in self._lines.items():
+            if (row, col) not in lines:
+                buf.append(f'\x1b[{row};{col}H' + ('\x1b[K' if width is None else ' ' * width))
+        self._lines = lines
+        if cursor is not None:
+            buf.append(f'\x1b[{cursor};1H\x1b[J')
+        data = ''.join(buf)
+        if data:
+            self.out.write(data)
+            self.out.flush()
+            self.bytes_written += len(data)
+        return len(data)
@@ -0,0 +1,133 @@
+# spectate.py
+import random
+import shutil
+import threading
+import time
+from typing import Dict, List, Optional, TextIO, Tuple
+from colorama import Fore, Style
+from ..core.game import Game
+from ..core.cards import GOODS
+from ..core.actions import TAKE_CAMELS, SELL_OFFSET, EXCHANGE, N_ACTIONS, PARTIAL_SELL, MAX_SELL
+from ..core.exchanges import describe_exchange
+from ..core import Card
+from .terminal import TerminalGUI
+from .screen import Screen
+
+TILE_WIDTH = 44
+TILE_HEIGHT = 8
+
+
+def describe_action(action: int) -> str:
+    if action < len(GOODS):
+        return f"took {GOODS[action].name.lower()}"
+    if action == TAKE_CAMELS:
+        return "took camels"
+    if action < EXCHANGE:
+        return f"sold all {GOODS[action - SELL_OFFSET].name.lower()}"
+    if action >= N_ACTIONS:
+        good, n = divmod(action - PARTIAL_SELL, MAX_SELL)
+        return f"sold {n} {GOODS[good].name.lower()}"
+    return describe_exchange(action - EXCHANGE).lower()
+
+
+class Spectator:
+    """Watch several headless games at once, tiled in one terminal.
+
+    Every game plays on its own thread (optionally pausing ``delay``
+    seconds after each move) and publishes a snapshot of its views after
+    every turn. The calling thread redraws the tiles at most ``fps`` times a
+    second through a ``Screen``, so only the tile lines that changed since
+    the previous frame reach the terminal, however fast the games run.
+    """
+
+    def __init__(self, player_types: List[str], games: int = 4, fps: float = 10.0,
+                 delay: float = 0.0, seed: Optional[int] = None, out: Optional[TextIO] = None):
+        rng = random.Random(seed)
+        self.games = [Game(gui=None, player_types=list(player_types), seed=rng.getrandbits(64))
+                      for _ in range(games)]
+        self.fps = fps
+        self.delay = delay
+        self.screen = Screen(out)
+        # Latest (players, market, turn, deck size, last move) of every game,
+        # replaced whole by its thread so the renderer never sees a half update
+        self.snapshots: List[Optional[Tuple]] = [None] * games
+        self.scores: List[Optional[Dict[str, int]]] = [None] * games
+        # Last tile drawn for every game, with the snapshot and scores it shows
+        self._tiles: Dict[int, Tuple[Optional[Tuple], Optional[Dict[str, int]], List[str]]] = {}
+        self._emoji = TerminalGUI.CARD_EMOJIS
+        self._colors = TerminalGUI.CARD_COLORS
+
+    def _snapshot(self, i: int) -> None:
+        game = self.games[i]
+        last = f"{game.players[(game.turn - 1) % 2].name} {describe_action(game.actions[-1])}" if game.actions else ""
+        self.snapshots[i] = ([game.get_player_view(p) for p in game.players], game.get_market_view(),
+                             game.turn, game.state.deck_size(), last)
+
+    def _play(self, i: int) -> None:
+        game = self.games[i]
+        self._snapshot(i)
+        try:
+            while not game.is_game_over():
+                game.play_turn()
+                self._snapshot(i)
+                if self.delay:
+                    time.sleep(self.delay)
+            self.scores[i] = game.final_scoring()
+        finally:
+            game.close()
+
+    def _cards(self, goods: dict, camels: int) -> str:
+        cards = [f"{self._colors[c]}{self._emoji[c]}{n}{Style.RESET_ALL}" for c, n in goods.items() if n]
+        if camels:
+            cards.append(f"{self._emoji[Card.CAMEL]}{camels}")
+        return " ".join(cards) or "-"
+
+    def _tile(self, i: int) -> List[str]:
+        snapshot, scores = self.snapshots[i], self.scores[i]
+        cached = self._tiles.get(i)
+        if cached is not None and cached[0] is snapshot and cached[1] is scores:
+            return cached[2]
+        title = f"{Fore.GREEN}Game {i + 1}{Style.RESET_ALL}"
+        if snapshot is None:
+            return [title, "  dealing..."]
+        players, market, turn, deck, last = snapshot
+        tile = [f"{title}  turn {turn}  deck {deck}",
+                f"  market {self._cards(market.goods, market.camels)}"]
+        for seat, p in enumerate(players):
+            marker = "▸" if scores is None and turn % 2 == seat else " "
+            tile.append(f"{marker} {p.name:<10} {Fore.YELLOW}{p.tokens:>3} pts{Style.RESET_ALL}")
+            tile.append(f"    {self._cards(p.hand, p.camels)}")
+        tile.append(f"  {Fore.LIGHTBLACK_EX}{last}{Style.RESET_ALL}")
+        if scores is not None:
+            winner = max(scores, key=scores.get)
+            tile.append(f"  {Fore.MAGENTA}{winner} wins {'-'.join(map(str, scores.values()))}{Style.RESET_ALL}")
+        self._tiles[i] = (snapshot, scores, tile)
+        return tile
+
+    def render(self, cursor: Optional[int] = None) -> int:
+        """Draw every game's tile, side by side as the terminal width allows"""
+        columns = max(1, shutil.get_terminal_size().columns // (TILE_WIDTH + 2))
+        blocks = []
+        for i in range(len(self.games)):
+            row, col = divmod(i, columns)
+            blocks.append((1 + row * (TILE_HEIGHT + 1), 1 + col * (TILE_WIDTH + 2), TILE_WIDTH, self._tile(i)))
+        return self.screen.render(blocks, cursor)
+
+    def bottom(self) -> int:
+        columns = max(1, shutil.get_terminal_size().columns // (TILE_WIDTH + 2))
+        return 1 + -(-len(self.games) // columns) * (TILE_HEIGHT + 1)
+
+    def run(self) -> List[Dict[str, int]]:
+        """Play all games to the end while drawing them; returns their final scores"""
+        threads = [threading.Thread(target=self._play, args=(i,), daemon=True) for i in range(len(self.games))]
+        for t in threads:
+            t.start()
+        period = 1.0 / self.fps
+        while any(t.is_alive() for t in threads):
+            started = time.perf_counter()
+            self.render()
+            time.sleep(max(0.0, period - (time.perf_counter() - started)))
+        for t in threads:
+            t.join()
+        self.render(cursor=self.bottom())
+        return self.scores
@@ -1,7 +1,11 @@
 # gui.py
-from typing import List, Dict, Optional
+import shutil
+from collections import OrderedDict
+from typing import List, Dict, Optional, Sequence
 from ..core import Card
+from ..core.exchanges import exchange_cards
 from .basegui import BaseGUI
+from .screen import Screen
 from .views import PlayerView, MarketView
 from colorama import init, Fore, Back, Style
 from tabulate import tabulate
@@ -32,76 +36,124 @@ class TerminalGUI(BaseGUI):
         Card.CAMEL: Fore.LIGHTYELLOW_EX
     }
 
+    # Lines kept free below the board for prompts before we assume the terminal scrolled
+    PROMPT_MARGIN = 2
+
+    def __init__(self):
+        self.screen = Screen()
+        # Rendered board sections, keyed by the view contents they show
+        self._market_rows: 'OrderedDict[tuple, List[str]]' = OrderedDict()
+        self._player_rows: 'OrderedDict[tuple, List[str]]' = OrderedDict()
+        self._board_height = 0
+        # Lines printed below the board by prompts since it was last drawn
+        self._printed = 0
+
     @staticmethod
     def clear_screen():
         print("\033c", end="")  # ANSI escape code to clear terminal
 
+    def _print(self, text: str = "") -> None:
+        print(text)
+        self._printed += text.count("\n") + 1
+
+    def _input(self, prompt: str) -> str:
+        self._printed += prompt.count("\n") + 1
+        return input(prompt)
+
     def _format_card(self, card: Card, count: int = 1) -> str:
         """Format a card with emoji and color"""
         color = self.CARD_COLORS.get(card, Fore.WHITE)
         return f"{color}{self.CARD_EMOJIS[card]} {card.name}{Style.RESET_ALL} ×{count}"
 
-    def show_game_state(self, players: List[PlayerView], market: MarketView, current_player_name: str = None):
-        self.clear_screen()
-        
-        # Header with turn indicator
-        print(Fore.GREEN + "=== JAIPUR ===" + Style.RESET_ALL)
-        print("==========================")
+    @staticmethod
+    def _cached(cache: OrderedDict, key: tuple, build) -> List[str]:
+        rows = cache.get(key)
+        if rows is None:
+            rows = cache[key] = build()
+            if len(cache) > 256:
+                cache.popitem(last=False)
+        else:
+            cache.move_to_end(key)
+        return rows
 
-        # Market display
+    def _market_lines(self, market: MarketView) -> List[str]:
         market_table = []
         for card, count in market.goods.items():
             if count > 0:
                 market_table.append([self._format_card(card), count])
         if market.camels > 0:
             market_table.append([self._format_card(Card.CAMEL), market.camels])
-        
-        print(Fore.BLUE + "\nMARKET:" + Style.RESET_ALL)
+
+        lines = ["", Fore.BLUE + "MARKET:" + Style.RESET_ALL]
         if market_table:
-            print(tabulate(market_table, 
-                         headers=["Card", "Count"], 
-                         tablefmt="grid",
-                         numalign="center",
-                         stralign="left"))
+            lines += tabulate(market_table,
+                              headers=["Card", "Count"],
+                              tablefmt="grid",
+                              numalign="center",
+                              stralign="left").split("\n")
         else:
-            print("  Empty")
+            lines.append("  Empty")
+        return lines
 
-        # Players display
-        print(Fore.CYAN + "\nPLAYERS:" + Style.RESET_ALL)
+    def _player_lines(self, players: List[PlayerView], current_player_name: Optional[str]) -> List[str]:
         players_table = []
-        
         for player in players:
             is_current = player.name == current_player_name
             player_color = Fore.GREEN if is_current else Fore.BLUE
-            
+
             # Hand information - combine all cards into one cell
             if is_current:
                 hand_items = [
                     f"{self._format_card(card, count)}"
-                    for card, count in player.hand.items() 
+                    for card, count in player.hand.items()
                     if count > 0
                 ]
                 hand_info = "\n".join(hand_items) if hand_items else "Empty"
             else:
                 total_cards = sum(player.hand.values())
                 hand_info = f"{Fore.LIGHTBLACK_EX}{total_cards} hidden cards{Style.RESET_ALL}"
-            
+
             players_table.append([
                 player_color + player.name + Style.RESET_ALL,
                 hand_info,
                 self._format_card(Card.CAMEL, player.camels),
                 f"{Fore.YELLOW}{player.tokens} points{Style.RESET_ALL}"
             ])
-        
+
+        lines = ["", Fore.CYAN + "PLAYERS:" + Style.RESET_ALL]
         if current_player_name:
-            print(Fore.MAGENTA + f"=== {current_player_name}'s Turn ===" + Style.RESET_ALL)
-            
-        print(tabulate(players_table,
-                      headers=["Player", "Hand", "Camels", "Tokens"],
-                      tablefmt="grid",
-                      numalign="center",
-                      stralign="left"))
-    
+            lines.append(Fore.MAGENTA + f"=== {current_player_name}'s Turn ===" + Style.RESET_ALL)
+        return lines + tabulate(players_table,
+                                headers=["Player", "Hand", "Camels", "Tokens"],
+                                tablefmt="grid",
+                                numalign="center",
+                                stralign="left").split("\n")
+
+    def show_game_state(self, players: List[PlayerView], market: MarketView, current_player_name: str = None):
+        # Sections are only formatted when their view changed, and the screen
+        # only rewrites the lines that differ from what it shows already
+        market_key = (tuple(market.goods.items()), market.camels)
+        players_key = (tuple((p.name, tuple(p.hand.items()), p.camels, p.tokens) for p in players),
+                       current_player_name)
+        lines = [Fore.GREEN + "=== JAIPUR ===" + Style.RESET_ALL, "=========================="]
+        lines += self._cached(self._market_rows, market_key, lambda: self._market_lines(market))
+        lines += self._cached(self._player_rows, players_key,
+                              lambda: self._player_lines(players, current_player_name))
+
+        rows = shutil.get_terminal_size().lines
+        printed, self._printed = self._printed, 0
+        if len(lines) + self.PROMPT_MARGIN > rows:
+            # Too tall to address in place: print it whole and let it scroll
+            self.clear_screen()
+            print("\n".join(lines))
+            self.screen.invalidate()
+            return
+        # Prompts printed under the board may have scrolled it off its rows
+        if printed and self._board_height + printed + self.PROMPT_MARGIN > rows:
+            self.screen.invalidate()
+        self._board_height = len(lines)
+        self.screen.render([(1, 1, None, lines)], cursor=len(lines) + 1)
+
     def show_turn_options(self):
         options = [
             ["1", "✋ Take single good from market"],
@@ -111,56 +163,56 @@ class TerminalGUI(BaseGUI):
             ["5", "👀 View game state"]
         ]
         
-        print(Fore.CYAN + "\n🎮 Choose action:" + Style.RESET_ALL)
-        print(tabulate(options,
-                      tablefmt="simple",
-                      colalign=("center", "left")))
+        self._print(Fore.CYAN + "\n🎮 Choose action:" + Style.RESET_ALL)
+        self._print(tabulate(options,
+                             tablefmt="simple",
+                             colalign=("center", "left")))
 
     def get_action_choice(self) -> int:
         while True:
             try:
-                choice = input(Fore.CYAN + "\nEnter action (1-5): " + Style.RESET_ALL).strip()
+                choice = self._input(Fore.CYAN + "\nEnter action (1-5): " + Style.RESET_ALL).strip()
                 if choice.isdigit():
                     choice_int = int(choice)
                     if 1 <= choice_int <= 5:
                         return choice_int
-                print(Fore.RED + "Please enter a number between 1 and 5" + Style.RESET_ALL)
+                self._print(Fore.RED + "Please enter a number between 1 and 5" + Style.RESET_ALL)
             except KeyboardInterrupt:
                 raise
             except:
-                print(Fore.RED + "Invalid input" + Style.RESET_ALL)
+                self._print(Fore.RED + "Invalid input" + Style.RESET_ALL)
 
     def select_good(self, available_goods: List[Card]) -> Optional[Card]:
-        print(Fore.CYAN + "\n🛍️ Available goods:" + Style.RESET_ALL)
+        self._print(Fore.CYAN + "\n🛍️ Available goods:" + Style.RESET_ALL)
         for i, card in enumerate(available_goods, 1):
-            print(f"{Fore.YELLOW}{i}){Style.RESET_ALL} {self._format_card(card)}")
-        print(f"{Fore.YELLOW}0){Style.RESET_ALL} Cancel")
+            self._print(f"{Fore.YELLOW}{i}){Style.RESET_ALL} {self._format_card(card)}")
+        self._print(f"{Fore.YELLOW}0){Style.RESET_ALL} Cancel")
 
         try:
-            choice = input(Fore.CYAN + "\nSelect good: " + Style.RESET_ALL).strip()
+            choice = self._input(Fore.CYAN + "\nSelect good: " + Style.RESET_ALL).strip()
             if choice == "0":
                 return None
             if choice.isdigit():
                 choice_int = int(choice)
                 if 1 <= choice_int <= len(available_goods):
                     return available_goods[choice_int - 1]
-            print(Fore.RED + "Invalid selection" + Style.RESET_ALL)
+            self._print(Fore.RED + "Invalid selection" + Style.RESET_ALL)
         except KeyboardInterrupt:
             raise
         except:
-            print(Fore.RED + "Please enter a valid number" + Style.RESET_ALL)
+            self._print(Fore.RED + "Please enter a valid number" + Style.RESET_ALL)
         return None
 
     def select_goods_to_sell(self, player_goods: Dict[Card, int]) -> Optional[tuple[Card, int]]:
-        print(Fore.CYAN + "\n💰 Your goods:" + Style.RESET_ALL)
+        self._print(Fore.CYAN + "\n💰 Your goods:" + Style.RESET_ALL)
         goods_list = [card for card, count in player_goods.items() if count > 0]
 
         for i, card in enumerate(goods_list, 1):
-            print(f"{Fore.YELLOW}{i}){Style.RESET_ALL} {self._format_card(card, player_goods[card])}")
-        print(f"{Fore.YELLOW}0){Style.RESET_ALL} Cancel")
+            self._print(f"{Fore.YELLOW}{i}){Style.RESET_ALL} {self._format_card(card, player_goods[card])}")
+        self._print(f"{Fore.YELLOW}0){Style.RESET_ALL} Cancel")
 
         try:
-            card_choice = input(Fore.CYAN + "\nSelect good to sell: " + Style.RESET_ALL).strip()
+            card_choice = self._input(Fore.CYAN + "\nSelect good to sell: " + Style.RESET_ALL).strip()
             if card_choice == "0":
                 return None
             if card_choice.isdigit():
@@ -168,24 +220,48 @@ class TerminalGUI(BaseGUI):
                 if 1 <= card_choice_int <= len(goods_list):
                     card = goods_list[card_choice_int - 1]
                     max_count = player_goods[card]
-                    count = input(
+                    count = self._input(
                         Fore.CYAN + f"How many to sell (1-{max_count}): " + Style.RESET_ALL
                     ).strip()
                     if count.isdigit():
                         count_int = int(count)
                         if 1 <= count_int <= max_count:
                             return (card, count_int)
-            print(Fore.RED + "Invalid selection" + Style.RESET_ALL)
+            self._print(Fore.RED + "Invalid selection" + Style.RESET_ALL)
+        except KeyboardInterrupt:
+            raise
+        except:
+            self._print(Fore.RED + "Please enter valid numbers" + Style.RESET_ALL)
+        return None
+
+    def select_exchange(self, exchanges: Sequence[int]) -> Optional[int]:
+        self._print(Fore.CYAN + "\n🔄 Possible exchanges:" + Style.RESET_ALL)
+        for i, index in enumerate(exchanges, 1):
+            take, give = exchange_cards(index)
+            take_str = ", ".join(self._format_card(card, count) for card, count in take.items())
+            give_str = ", ".join(self._format_card(card, count) for card, count in give.items())
+            self._print(f"{Fore.YELLOW}{i}){Style.RESET_ALL} Take {take_str}  ⇄  Give {give_str}")
+        self._print(f"{Fore.YELLOW}0){Style.RESET_ALL} Cancel")
+
+        try:
+            choice = self._input(Fore.CYAN + "\nSelect exchange: " + Style.RESET_ALL).strip()
+            if choice == "0":
+                return None
+            if choice.isdigit():
+                choice_int = int(choice)
+                if 1 <= choice_int <= len(exchanges):
+                    return exchanges[choice_int - 1]
+            self._print(Fore.RED + "Invalid selection" + Style.RESET_ALL)
         except KeyboardInterrupt:
             raise
         except:
-            print(Fore.RED + "Please enter valid numbers" + Style.RESET_ALL)
+            self._print(Fore.RED + "Please enter a valid number" + Style.RESET_ALL)
         return None
 
     def show_message(self, message: str):
-        print(Fore.GREEN + "\n📢 " + message + Style.RESET_ALL)
-        input(Fore.CYAN + "Press Enter to continue..." + Style.RESET_ALL)
+        self._print(Fore.GREEN + "\n📢 " + message + Style.RESET_ALL)
+        self._input(Fore.CYAN + "Press Enter to continue..." + Style.RESET_ALL)
 
     def show_error(self, error: str):
-        print(Fore.RED + "\n❌ ERROR: " + error + Style.RESET_ALL)
-        input(Fore.CYAN + "Press Enter to continue..." + Style.RESET_ALL)
\ No newline at end of file
+        self._print(Fore.RED + "\n❌ ERROR: " + error + Style.RESET_ALL)
+        self._input(Fore.CYAN + "Press Enter to continue..." + Style.RESET_ALL)
\ No newline at end of file
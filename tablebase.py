@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+# Solves the endgames of headless games into a memory-mapped tablebase, e.g.:
+#   python tablebase.py data/tablebase --games 20000 --max-deck 3
+# Agents use it as endgame:data/tablebase (see src/core/players/registry.py).
+import argparse
+import time
+from src.core.players import registered_players
+from src.core.tablebase import build_tablebase
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build a Jaipur endgame tablebase")
+    parser.add_argument('out', help="tablebase directory (merged into if it exists)")
+    parser.add_argument('--games', type=int, default=1000, help="games whose endgames are solved")
+    parser.add_argument('--max-deck', type=int, default=3, help="solve from this many cards left in the deck")
+    parser.add_argument('--max-exchanges', type=int, default=0, help="exchanges searched in a row")
+    parser.add_argument('--players', nargs=2, default=['ai', 'ai'], metavar='PLAYER',
+                        help=f"agents playing up to the endgame ({', '.join(registered_players())})")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: one per core)")
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    size = build_tablebase(args.out, args.games, args.max_deck, args.workers, args.seed, args.players,
+                           args.max_exchanges)
+    print(f"{args.out}: {size:,} positions ({time.perf_counter() - start:.1f}s)")
+
+
+if __name__ == "__main__":
+    main()
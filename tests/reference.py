@@ -0,0 +1,48 @@
+# reference.py
+# Slow, direct implementations of the rules for the engine tests to compare
+# against: no bitmasks, caches or precomputed tables.
+from typing import Iterator, List, Sequence, Set, Tuple
+from src.core.actions import TAKE_CAMELS, SELL_OFFSET, EXCHANGE
+from src.core.cards import CAMEL, N_CARDS, N_GOODS
+from src.core.exchanges import MIN_EXCHANGE, MAX_EXCHANGE
+from src.core.state import HAND_LIMIT, SELL_MINIMUM
+
+
+def vectors(bound: Sequence[int], k: int) -> Iterator[Tuple[int, ...]]:
+    """Count vectors of total ``k`` that are elementwise <= ``bound``"""
+    if not bound:
+        if k == 0:
+            yield ()
+        return
+    for n in range(min(bound[0], k) + 1):
+        for rest in vectors(bound[1:], k - n):
+            yield (n,) + rest
+
+
+def exchanges(market: List[int], hand: List[int]) -> Set[Tuple[Tuple[int, ...], Tuple[int, ...]]]:
+    """Every legal exchange as (take, give) count vectors"""
+    size = sum(hand[:N_GOODS])
+    result = set()
+    for k in range(MIN_EXCHANGE, MAX_EXCHANGE + 1):
+        # Camels are never taken, and no type is both taken and given
+        for take in vectors(list(market[:N_GOODS]) + [0], k):
+            for give in vectors([0 if take[c] else hand[c] for c in range(N_CARDS)], k):
+                # Camels given come back into the hand as goods
+                if size + give[CAMEL] <= HAND_LIMIT:
+                    result.add((take, give))
+    return result
+
+
+def legal_mask(market: List[int], hand: List[int]) -> int:
+    """GameState.legal_mask for a seat holding ``hand``, worked out from the rules"""
+    mask = 0
+    for g in range(N_GOODS):
+        if market[g] and sum(hand[:N_GOODS]) < HAND_LIMIT:
+            mask |= 1 << g
+        if hand[g] >= SELL_MINIMUM[g]:
+            mask |= 1 << (SELL_OFFSET + g)
+    if market[CAMEL]:
+        mask |= 1 << TAKE_CAMELS
+    if exchanges(market, hand):
+        mask |= 1 << EXCHANGE
+    return mask
@@ -0,0 +1,84 @@
+# test_belief.py
+import random
+from math import comb, prod
+from src.core.belief import BeliefTracker
+from src.core.cards import N_GOODS
+from src.core.replay import new_game
+from src.core.rollout import random_action
+from reference import vectors
+
+
+def _posterior_mean(tracker: BeliefTracker):
+    """Expected hidden goods by enumerating every hidden hand the bounds allow"""
+    total, means = 0, [0] * N_GOODS
+    bounds = [min(high, pool) for high, pool in zip(tracker.high, tracker.pool)]
+    for hidden in vectors(bounds, tracker.hidden):
+        if any(h < low for h, low in zip(hidden, tracker.low)):
+            continue
+        w = prod(comb(pool, h) for pool, h in zip(tracker.pool, hidden))
+        total += w
+        means = [m + w * h for m, h in zip(means, hidden)]
+    return [m / total for m in means]
+
+
+def test_posterior_along_random_games():
+    rng = random.Random(0)
+    for _ in range(20):
+        state = new_game(random.Random(rng.getrandbits(64)))[0]
+        trackers = [BeliefTracker(), BeliefTracker()]
+        for seat, tracker in enumerate(trackers):
+            tracker.reset(state, seat)
+        while not state.is_terminal():
+            mover = state.turn & 1
+            action = random_action(state, mover, rng)
+            state.apply(action)
+            for seat, tracker in enumerate(trackers):
+                tracker.update(state, action, mover)
+                opp = 1 - seat
+                assert tracker.consistent(state, seat)
+                hand = state.hands[opp][:N_GOODS]
+                expected = tracker.expected_hand()
+                assert abs(sum(expected) - sum(hand)) < 1e-9
+                assert abs(sum(tracker.expected_deck()) - sum(state.deck_counts[:N_GOODS])) < 1e-9
+                # The true hand is one the tracker considers possible
+                for g in range(N_GOODS):
+                    hidden = hand[g] - tracker.net[g]
+                    assert tracker.low[g] <= hidden <= min(tracker.high[g], tracker.pool[g])
+                    assert tracker.low[g] <= expected[g] - tracker.net[g] <= min(tracker.high[g], tracker.pool[g])
+                sample, deck = tracker.sample(rng)
+                assert sum(sample) == sum(hand) and len(deck) == sum(state.deck_counts[:N_GOODS])
+
+
+def test_posterior_is_exact():
+    rng = random.Random(1)
+    checked = 0
+    while checked < 50:
+        state = new_game(random.Random(rng.getrandbits(64)))[0]
+        tracker = BeliefTracker()
+        tracker.reset(state, 0)
+        for _ in range(rng.randrange(1, 30)):
+            if state.is_terminal():
+                break
+            mover = state.turn & 1
+            action = random_action(state, mover, rng)
+            state.apply(action)
+            tracker.update(state, action, mover)
+        expected = tracker.expected_hand()
+        exact = _posterior_mean(tracker)
+        assert all(abs(e - (m + n)) < 1e-9 for e, m, n in zip(expected, exact, tracker.net))
+        checked += 1
+
+
+def test_determinize_keeps_the_public_position():
+    rng = random.Random(2)
+    state = new_game(random.Random(3))[0]
+    tracker = BeliefTracker()
+    tracker.reset(state, 1)
+    for _ in range(10):
+        mover = state.turn & 1
+        action = random_action(state, mover, rng)
+        state.apply(action)
+        tracker.update(state, action, mover)
+    det = tracker.determinize(state, rng)
+    assert det.information_key(1) == state.information_key(1)
+    assert det.hand_sizes == state.hand_sizes and det.deck_size() == state.deck_size()
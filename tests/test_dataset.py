@@ -0,0 +1,113 @@
+# test_dataset.py
+import json
+import os
+import pytest
+
+np = pytest.importorskip('numpy')
+pytest.importorskip('gymnasium')
+
+from src.core.game import Game
+from src.core.actions import N_ACTIONS
+from src.core.replay import Replay
+from src.core.players.gymnasium.dataset import (DatasetReader, DatasetWriter, RecordEpisodes, Trajectory,
+                                                dense_policy, record_game)
+from src.core.players.gymnasium.environment import JaipurEnv
+from src.core.players.gymnasium.observation import BELIEF_SLICES, OBS_SIZE, BELIEF_SIZE
+
+
+def _record(directory, games: int, shard_size: int):
+    played = []
+    with DatasetWriter(directory, shard_size=shard_size) as writer:
+        for seed in range(games):
+            game = Game(gui=None, player_types=['ai', 'ai'], seed=seed)
+            record_game(game, writer)
+            played.append(game)
+    return played, writer
+
+
+def test_round_trip(tmp_path):
+    games, writer = _record(str(tmp_path), games=4, shard_size=50)
+    actions = [a for g in games for a in g.actions]
+    assert writer.records == len(actions)
+    assert writer.shards == -(-len(actions) // 50)
+    reader = DatasetReader(str(tmp_path), batch_size=32, shuffle=False)
+    assert len(reader) == len(actions)
+    batches = list(reader)
+    assert all(len(b['actions']) == 32 for b in batches[:-1])
+    assert np.concatenate([b['actions'] for b in batches]).tolist() == actions
+    # Rewards are 0 until each game's last ply, then the margin of its mover
+    rewards = np.concatenate([b['rewards'] for b in batches])
+    dones = np.concatenate([b['dones'] for b in batches])
+    ends = np.cumsum([len(g.actions) for g in games]) - 1
+    assert np.flatnonzero(dones).tolist() == ends.tolist()
+    assert not rewards[~dones].any()
+    for game, end in zip(games, ends):
+        final, mover = game.state.final_points(), (len(game.actions) - 1) % 2
+        assert rewards[end] == final[mover] - final[1 - mover]
+
+
+def test_shuffled_batches_cover_the_dataset(tmp_path):
+    games, _ = _record(str(tmp_path), games=3, shard_size=40)
+    reader = DatasetReader(str(tmp_path), batch_size=25, shards_in_memory=2, seed=0)
+    actions = np.concatenate([b['actions'] for b in reader])
+    assert sorted(actions.tolist()) == sorted(a for g in games for a in g.actions)
+
+
+def test_expanded_masks_are_the_legal_actions(tmp_path):
+    games, _ = _record(str(tmp_path), games=3, shard_size=1 << 10)
+    batch = next(iter(DatasetReader(str(tmp_path), batch_size=1 << 10, shuffle=False, expand_masks=True)))
+    assert batch['masks'].shape == (len(batch['actions']), N_ACTIONS)
+    rows = iter(batch['masks'])
+    for game in games:
+        states = Replay(game.seed, game.actions).states()
+        for ply, state in zip(range(len(game.actions)), states):
+            assert np.flatnonzero(next(rows)).tolist() == state.legal_actions(ply % 2)
+
+
+def test_policy_targets(tmp_path):
+    trajectory = Trajectory(policy_size=4)
+    game = Game(gui=None, player_types=['ai', 'ai'], seed=0)
+    record_game(game, trajectory)
+    records = trajectory.records
+    # Players without visit counts give a one-hot target on their move
+    assert (records['policy_actions'][:, 0] == records['action']).all()
+    assert (records['policy_actions'][:, 1:] == -1).all()
+    dense = dense_policy(records['policy_actions'], records['policy_probs'])
+    assert (dense.argmax(axis=1) == records['action']).all() and (dense.sum(axis=1) == 1).all()
+    writer = DatasetWriter(str(tmp_path), policy_size=4)
+    writer.add(records['obs'][0], int(records['mask'][0]), 5, 0.0, False, {5: 3.0, 7: 1.0, 8: 0.0})
+    row = writer.buffer[0]
+    assert row['policy_actions'].tolist() == [5, 7, 8, -1]
+    assert row['policy_probs'].tolist() == [0.75, 0.25, 0.0, 0.0]
+
+
+def test_belief_layout(tmp_path):
+    env = JaipurEnv(belief=True)
+    with DatasetWriter(str(tmp_path), observation_space=env.observation_space) as writer:
+        recorder = RecordEpisodes(env, writer)
+        obs, _ = recorder.reset(seed=0)
+        rng = np.random.default_rng(0)
+        seen, done = [obs], False
+        while not done:
+            obs, _, terminated, truncated, _ = recorder.step(rng.choice(np.flatnonzero(env.action_masks())))
+            seen.append(obs)
+            done = terminated or truncated
+    with open(os.path.join(str(tmp_path), 'meta.json')) as f:
+        meta = json.load(f)
+    assert (meta['obs_size'], meta['obs_dtype']) == (OBS_SIZE + BELIEF_SIZE, 'float32')
+    batch = next(iter(DatasetReader(str(tmp_path), batch_size=1 << 10, shuffle=False)))
+    assert len(batch['actions']) == len(seen) - 1
+    for key in BELIEF_SLICES:
+        assert np.allclose(batch['obs'][key], np.stack([o[key] for o in seen[:-1]]))
+    # A dataset keeps one layout
+    with pytest.raises(ValueError):
+        DatasetWriter(str(tmp_path))
+    with pytest.raises(ValueError):
+        RecordEpisodes(JaipurEnv(), writer)
+
+
+def test_playing_without_a_writer():
+    recorded, played = (Game(gui=None, player_types=['ai', 'ai'], seed=7) for _ in range(2))
+    trajectory = Trajectory()
+    assert record_game(recorded, trajectory) == record_game(played, None) == len(played.actions)
+    assert played.actions == recorded.actions == trajectory.records['action'].tolist()
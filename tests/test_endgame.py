@@ -0,0 +1,81 @@
+# test_endgame.py
+import random
+from itertools import permutations
+from src.core.actions import EXCHANGE, SELL_OFFSET, TAKE_CAMELS
+from src.core.cards import CAMEL, CARD_INDEX, Card
+from src.core.endgame import EndgameSolver
+from src.core.replay import new_game
+from src.core.rollout import random_action
+from src.core.state import GameState
+from src.core.utils import BONUS_CAMEL
+
+DIAMOND, LEATHER = CARD_INDEX[Card.DIAMOND], CARD_INDEX[Card.LEATHER]
+
+
+def test_hand_checked_position():
+    # One card left, five camels on the market, seat 0 holds two diamonds
+    state = GameState()
+    state.deck, state.deck_counts[LEATHER] = [LEATHER], 1
+    state.add_to_market(CAMEL, 5)
+    state.add_to_hand(0, DIAMOND, 2)
+    state.points = [3, 1]
+    state.rehash()
+    solver = EndgameSolver()
+    # Taking the camels draws the last card: the game ends and seat 0 has the larger herd.
+    # Selling scores 7 + 7, then seat 1 can only take the camels, ending the game with the bonus.
+    assert solver.values(state) == {TAKE_CAMELS: 2 + BONUS_CAMEL, SELL_OFFSET + DIAMOND: 2 + 14 - BONUS_CAMEL}
+    assert solver.best_action(state) == SELL_OFFSET + DIAMOND
+    assert solver.outcome(state, 0) == 1.0 and solver.outcome(state, 1) == 0.0
+    assert solver.memo[solver.key(state)] == 14 - BONUS_CAMEL
+
+
+def _brute_force(state: GameState, memo: dict) -> float:
+    """Expected final margin of the player to move, by playing every action on every deck order
+
+    Each action is played on every order of the remaining deck; the deeper
+    searches reorder the cards they draw themselves, so only the cards this
+    action draws are fixed, as for the solver's chance nodes.
+    """
+    seat = state.turn & 1
+    rest = state.deck[state.deck_pos:]
+    key = (seat, tuple(state.market), *map(tuple, state.hands), tuple(state.sold), tuple(state.bonus_pos),
+           tuple(state.points), tuple(sorted(rest)))
+    if key in memo:
+        return memo[key]
+    orders = list(permutations(rest))
+    best = None
+    for action in state.legal_actions(seat):
+        if action >= EXCHANGE:
+            continue
+        total = 0.0
+        for order in orders:
+            state.deck[state.deck_pos:] = order
+            state.apply(action)
+            if state.is_terminal():
+                points = state.final_points()
+                total += points[seat] - points[1 - seat]
+            else:
+                total -= _brute_force(state, memo)
+            state.undo()
+        value = total / len(orders)
+        best = value if best is None else max(best, value)
+    state.deck[state.deck_pos:] = rest
+    memo[key] = best
+    return best
+
+
+def test_solver_matches_brute_force():
+    rng = random.Random(0)
+    solver = EndgameSolver(max_deck=3)
+    checked = 0
+    while checked < 30:
+        state = new_game(random.Random(rng.getrandbits(64)))[0]
+        while not state.is_terminal() and state.deck_size() > 3:
+            state.apply(random_action(state, state.turn & 1, rng))
+        if state.is_terminal():
+            continue
+        # Piles of equal tokens, so that counting bonuses at their mean is exact here too
+        state.bonus = [(2,) * 7, (5,) * 6, (9,) * 5]
+        state.rehash()
+        assert abs(solver.value(state) - _brute_force(state, {})) < 1e-9
+        checked += 1
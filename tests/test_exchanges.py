@@ -0,0 +1,79 @@
+# test_exchanges.py
+import random
+import pytest
+from src.core.actions import EXCHANGE, N_ACTIONS
+from src.core.cards import CAMEL, N_CARDS
+from src.core.exchanges import (EXCHANGES, EXCHANGE_INDEX, MIN_EXCHANGE, MAX_EXCHANGE, N_EXCHANGES,
+                                legal_exchanges)
+from src.core.replay import new_game
+from src.core.rollout import random_action
+from src.core.state import HAND_LIMIT
+import reference
+
+
+def test_exchange_table():
+    assert len(set(EXCHANGES)) == N_EXCHANGES == len(EXCHANGE_INDEX)
+    assert all(EXCHANGE_INDEX[e] == i for i, e in enumerate(EXCHANGES))
+    for take, give in EXCHANGES:
+        assert len(take) == len(give) == N_CARDS
+        assert MIN_EXCHANGE <= sum(take) == sum(give) <= MAX_EXCHANGE
+        assert take[CAMEL] == 0
+        assert not any(t and g for t, g in zip(take, give))
+    # and nothing is missing: every pair of disjoint vectors of 2-5 cards
+    expected = {(take, give) for k in range(MIN_EXCHANGE, MAX_EXCHANGE + 1)
+                for take in reference.vectors([k] * (N_CARDS - 1) + [0], k)
+                for give in reference.vectors([0 if t else k for t in take], k)}
+    assert set(EXCHANGES) == expected
+
+
+def _capped(hand, hand_size):
+    """The give bound GameState.legal_exchanges passes on"""
+    return tuple(min(n, MAX_EXCHANGE) for n in hand[:CAMEL]) + (min(hand[CAMEL], HAND_LIMIT - hand_size, MAX_EXCHANGE),)
+
+
+def test_legal_exchanges_match_rules():
+    rng = random.Random(0)
+    for _ in range(2000):
+        market = [0] * N_CARDS
+        for _ in range(5):
+            market[rng.randrange(N_CARDS)] += 1
+        hand = [0] * N_CARDS
+        for _ in range(rng.randrange(HAND_LIMIT + 1)):
+            hand[rng.randrange(CAMEL)] += 1
+        hand[CAMEL] = rng.randrange(12)
+        found = [EXCHANGES[i] for i in legal_exchanges(tuple(market), _capped(hand, sum(hand[:CAMEL])))]
+        assert len(found) == len(set(found))
+        assert set(found) == reference.exchanges(market, hand)
+
+
+def test_state_legal_exchanges():
+    rng = random.Random(1)
+    for _ in range(10):
+        state = new_game(random.Random(rng.getrandbits(64)))[0]
+        while not state.is_terminal():
+            seat = state.turn & 1
+            found = {EXCHANGES[i] for i in state.legal_exchanges(seat)}
+            assert found == reference.exchanges(state.market, state.hands[seat])
+            actions = state.legal_actions(seat)
+            assert sorted(a - EXCHANGE for a in actions if a >= EXCHANGE) == sorted(state.legal_exchanges(seat))
+            state.apply(random_action(state, seat, rng))
+
+
+def test_vec_env_masks_match_rules():
+    np = pytest.importorskip('numpy')
+    pytest.importorskip('stable_baselines3')
+    from src.core.players.gymnasium.vec_env import JaipurVecEnv
+    env = JaipurVecEnv(16, seed=0)
+    env.reset()
+    rng = np.random.default_rng(0)
+    for _ in range(100):
+        masks = env.action_masks()
+        assert masks.shape == (16, N_ACTIONS)
+        for i in range(16):
+            hand = env.hands[i, env.turn[i] & 1].tolist()
+            market = env.market[i].tolist()
+            assert int(sum(1 << a for a in np.flatnonzero(masks[i, :EXCHANGE]))) | (
+                1 << EXCHANGE if masks[i, EXCHANGE:].any() else 0) == reference.legal_mask(market, hand)
+            found = {EXCHANGES[e - EXCHANGE] for e in np.flatnonzero(masks[i, EXCHANGE:]) + EXCHANGE}
+            assert found == reference.exchanges(market, hand)
+        env.step(np.array([rng.choice(np.flatnonzero(m)) for m in masks]))
@@ -0,0 +1,42 @@
+# test_legal_mask.py
+import random
+from src.core.replay import new_game
+from src.core.rollout import random_action
+import reference
+
+
+def _check(state) -> None:
+    for seat in range(2):
+        assert state.legal_mask(seat) == reference.legal_mask(state.market, state.hands[seat])
+
+
+def test_legal_mask_matches_rules():
+    rng = random.Random(0)
+    for _ in range(40):
+        state = new_game(random.Random(rng.getrandbits(64)))[0]
+        _check(state)
+        while not state.is_terminal():
+            state.apply(random_action(state, state.turn & 1, rng))
+            _check(state)
+
+
+def test_legal_mask_after_undo():
+    rng = random.Random(1)
+    for _ in range(10):
+        state = new_game(random.Random(rng.getrandbits(64)))[0]
+        history = [(state.pack(), state.legal_mask(0), state.legal_mask(1))]
+        while not state.is_terminal():
+            # Wander back and forth: every undo must restore the position exactly
+            if len(history) > 1 and rng.random() < 0.3:
+                state.undo()
+                history.pop()
+            else:
+                assert state.apply(random_action(state, state.turn & 1, rng))
+                history.append((state.pack(), state.legal_mask(0), state.legal_mask(1)))
+            assert (state.pack(), state.legal_mask(0), state.legal_mask(1)) == history[-1]
+            _check(state)
+        while len(history) > 1:
+            state.undo()
+            history.pop()
+            assert (state.pack(), state.legal_mask(0), state.legal_mask(1)) == history[-1]
+        _check(state)
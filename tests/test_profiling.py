@@ -0,0 +1,26 @@
+# test_profiling.py
+import pytest
+from src.core import profiling
+from src.core.game import Game
+from src.core.profiling import Profiler
+
+
+def test_profiled_game():
+    play_turn = Game.play_turn
+    with Profiler() as profiler:
+        Game(gui=None, player_types=['ai', 'ai'], seed=0).play()
+    assert Game.play_turn is play_turn
+    assert profiler.stats['game.final_scoring'][0] == 1
+    assert profiler.stats['game.play_turn'][0] == profiler.counters['actions.applied']
+
+
+def test_failed_enable_restores_everything(monkeypatch):
+    play_turn = Game.play_turn
+    monkeypatch.setattr(profiling, 'TARGETS', profiling.TARGETS + [('src.core.game', 'Game', 'missing', 'x')])
+    with pytest.raises(KeyError):
+        Profiler().enable()
+    assert Game.play_turn is play_turn
+    assert profiling._active is None
+    monkeypatch.undo()
+    with Profiler():
+        assert Game.play_turn is not play_turn
@@ -0,0 +1,22 @@
+# test_registry.py
+import random
+import pytest
+from src.core.game import Game
+from src.core.players import make_player
+
+pytest.importorskip('stable_baselines3')
+
+
+def test_trained_player_loads_flat_model(tmp_path):
+    from stable_baselines3 import PPO
+    from src.core.players.gymnasium.environment import JaipurEnv
+    path = str(tmp_path / 'flat_model.zip')
+    PPO("MlpPolicy", JaipurEnv(flat=True), device='cpu', seed=0).save(path)
+
+    player = make_player(f'trained:{path}', 1, random.Random(0))
+    assert player.flat
+    assert player.encoder.belief is None
+
+    game = Game(gui=None, player_types=[f'trained:{path}', 'ai'], seed=0)
+    game.play_turn()
+    assert len(game.actions) == 1
@@ -0,0 +1,49 @@
+# test_replay.py
+import io
+import pytest
+from src.core.game import Game
+from src.core.replay import Replay, dump, load, replay
+
+
+def _games(n: int):
+    for seed in range(n):
+        game = Game(gui=None, player_types=['ai', 'ai'], seed=seed)
+        game.play()
+        yield game
+
+
+def test_replay_rebuilds_the_game():
+    for game in _games(20):
+        data = game.to_replay().to_bytes()
+        rebuilt = Replay.from_bytes(data)
+        assert rebuilt == game.to_replay()
+        assert rebuilt.state().pack() == game.state.pack()
+        assert replay(data).final_points() == game.state.final_points()
+
+
+def test_replay_positions():
+    game = next(_games(1))
+    r = game.to_replay()
+    packed = [s.pack() for s in r.states()]
+    assert len(packed) == len(r.actions) + 1
+    assert packed[-1] == game.state.pack()
+    assert r.state(0).pack() == packed[0]
+    assert replay(r.to_bytes(), 5).pack() == packed[5]
+    with pytest.raises(IndexError):
+        r.state(len(r.actions) + 1)
+
+
+def test_bad_replays_are_rejected():
+    r = next(_games(1)).to_replay()
+    with pytest.raises(ValueError):
+        Replay.from_bytes(b'XYZ' + r.to_bytes()[3:])
+    with pytest.raises(ValueError):
+        Replay(r.seed, [r.actions[0]] * len(r.actions)).state()
+
+
+def test_dump_load():
+    replays = [g.to_replay() for g in _games(5)]
+    f = io.BytesIO()
+    dump(replays, f)
+    f.seek(0)
+    assert list(load(f)) == replays
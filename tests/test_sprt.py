@@ -0,0 +1,72 @@
+# test_sprt.py
+import math
+import pytest
+from src.core.tournament import Pairing, Tournament, elo_difference, expected_score
+
+# Pair scores of a over one deal from both seats: 0, 0.25, 0.5, 0.75 and 1
+PAIRS = [(0.0, 0.0), (0.0, 0.5), (0.5, 0.5), (1.0, 0.5), (1.0, 1.0)]
+
+
+def _pairing(counts) -> Pairing:
+    """A pairing with ``counts[k]`` deals scoring ``k / 4`` (the pentanomial counts)"""
+    p = Pairing('a', 'b')
+    for scores, n in zip(PAIRS, counts):
+        for _ in range(n):
+            p.add(scores)
+    return p
+
+
+def test_pairing_counts():
+    p = _pairing((1, 2, 6, 1, 0))
+    assert p.games == 20
+    assert (p.wins, p.draws, p.losses) == (1, 15, 4)
+    assert p.score == pytest.approx(0.425)
+    assert p.elo()[0] == pytest.approx(elo_difference(0.425))
+    assert expected_score(elo_difference(0.425)) == pytest.approx(0.425)
+
+
+def test_llr():
+    s1 = expected_score(50)
+    # Even results: mean 1/2, variance (2 * 5 / 4 + 2 * 20 / 16) / 100 = 0.05
+    assert _pairing((5, 20, 50, 20, 5)).llr(0, 50) == pytest.approx(100 * (s1 - 0.5) * (0.5 - s1) / 0.1)
+    # a stronger: mean 0.575, variance 0.39375 - 0.575 ** 2
+    var = 0.39375 - 0.575 ** 2
+    assert _pairing((5, 10, 50, 20, 15)).llr(0, 50) == pytest.approx(100 * (s1 - 0.5) * (1.15 - 0.5 - s1) / (2 * var))
+    # No spread, no evidence
+    assert _pairing((0, 0, 30, 0, 0)).llr(0, 50) == 0.0
+    assert Pairing('a', 'b').llr(0, 50) == 0.0
+
+
+def test_sprt_decisions():
+    t = Tournament(['a', 'b'], max_pairs=200, min_pairs=10)
+    assert (t.lower, t.upper) == (pytest.approx(-math.log(19)), pytest.approx(math.log(19)))
+    cases = [((5, 10, 50, 20, 15), 'H1'), ((5, 20, 50, 20, 5), 'H0'), ((10, 25, 50, 10, 5), 'H0')]
+    for counts, decision in cases:
+        p = _pairing(counts)
+        t._decide(p)
+        assert p.decision == decision
+        # Decisions are final
+        for _ in range(50):
+            p.add(PAIRS[2])
+        t._decide(p)
+        assert p.decision == decision
+
+
+def test_sprt_waits_for_min_pairs_and_stops_at_max_pairs():
+    p = _pairing((5, 10, 50, 20, 15))
+    Tournament(['a', 'b'], min_pairs=101)._decide(p)
+    assert p.decision is None
+    # Ten pairs short of either bound
+    t = Tournament(['a', 'b'], max_pairs=10, min_pairs=10)
+    p = _pairing((1, 2, 6, 1, 0))
+    assert t.lower < p.llr(t.elo0, t.elo1) < t.upper
+    t._decide(p)
+    assert p.decision == 'max'
+
+
+def test_gauntlet_pairings():
+    t = Tournament(['a', 'b', 'c'], format='gauntlet')
+    assert [(p.a, p.b) for p in t.pairings] == [('a', 'b'), ('a', 'c')]
+    assert len(Tournament(['a', 'b', 'c']).pairings) == 3
+    with pytest.raises(ValueError):
+        Tournament(['a', 'b'], format='swiss')
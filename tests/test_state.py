@@ -0,0 +1,38 @@
+# test_state.py
+import random
+from src.core.replay import new_game
+from src.core.rollout import random_action
+from src.core.state import GameState, PACKED_SIZE
+
+
+def _positions(games: int, seed: int):
+    """Every position of ``games`` random games, each a fresh clone"""
+    rng = random.Random(seed)
+    for _ in range(games):
+        state = new_game(random.Random(rng.getrandbits(64)))[0]
+        yield state.clone()
+        while not state.is_terminal():
+            state.apply(random_action(state, state.turn & 1, rng))
+            yield state.clone()
+
+
+def test_pack_unpack_round_trip():
+    for state in _positions(20, seed=1):
+        packed = state.pack()
+        assert len(packed) == PACKED_SIZE
+        other = GameState.unpack(packed)
+        assert other.pack() == packed
+        # Derived fields are rebuilt, not copied
+        assert other.hand_sizes == state.hand_sizes
+        assert other.deck_counts == state.deck_counts
+        assert other.key() == state.key()
+        assert [other.legal_mask(s) for s in range(2)] == [state.legal_mask(s) for s in range(2)]
+
+
+def test_clone_is_independent():
+    state = new_game(random.Random(0))[0]
+    before = state.pack()
+    clone = state.clone()
+    clone.apply(random_action(clone, 0, random.Random(0)))
+    assert state.pack() == before
+    assert clone.pack() != before
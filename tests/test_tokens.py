@@ -0,0 +1,74 @@
+# test_tokens.py
+import random
+from src.core.cards import Card, CARD_INDEX
+from src.core.replay import new_game
+from src.core.rollout import random_action
+from src.core.state import GameState
+from src.core.tokens import TokenBank, BONUS_TOKENS, BONUS_SIZES, GOODS_TOKENS, STACK_SIZES, TOKEN_SUMS
+
+DIAMOND, LEATHER = CARD_INDEX[Card.DIAMOND], CARD_INDEX[Card.LEATHER]
+
+
+def _state(seed: int = 0) -> GameState:
+    state = GameState()
+    state.shuffle_bonus(random.Random(seed))
+    return state
+
+
+def test_sale_takes_tokens_from_the_top():
+    state = _state()
+    bank = TokenBank(state)
+    state.add_to_hand(0, DIAMOND, 2)
+    assert state.sell(0, DIAMOND, 2) == 7 + 7
+    assert bank.stack(Card.DIAMOND) == [5, 5, 5]
+    assert bank.top_tokens()[DIAMOND] == 5
+    assert bank.remaining(Card.DIAMOND) == 3
+    assert bank.transactions[Card.DIAMOND] == 2
+    assert state.points == [14, 0]
+
+
+def test_sale_below_minimum_is_refused():
+    state = _state()
+    state.add_to_hand(0, DIAMOND, 1)
+    assert state.sell(0, DIAMOND, 1) == -1
+    assert state.sell(0, LEATHER, 1) == -1  # none held
+    assert state.points == [0, 0] and state.sold == [0] * len(state.sold)
+
+
+def test_bonus_piles():
+    state = _state(seed=3)
+    bank = TokenBank(state)
+    state.add_to_hand(1, LEATHER, 9)
+    # Three goods draw from the 3-card pile, five or more from the 5-card pile
+    assert state.sell(1, LEATHER, 3) == 4 + 3 + 2 + state.bonus[0][0]
+    assert state.sell(1, LEATHER, 6) == 1 * 6 + state.bonus[2][0]
+    assert bank.bonus_remaining() == [BONUS_SIZES[0] - 1, BONUS_SIZES[1], BONUS_SIZES[2] - 1]
+    assert bank.remaining(Card.LEATHER) == 0 and bank.depleted_stacks() == 1
+    # Past the end of a stack a sale earns no goods tokens
+    state.add_to_hand(1, LEATHER, 2)
+    assert state.sell(1, LEATHER, 2) == 0
+
+
+def test_bonus_piles_run_out():
+    state = _state(seed=4)
+    state.bonus_pos[2] = BONUS_SIZES[2]
+    state.rehash()
+    state.add_to_hand(0, LEATHER, 5)
+    assert state.sell(0, LEATHER, 5) == sum(GOODS_TOKENS[LEATHER][:5])
+
+
+def test_shuffled_piles_keep_their_tokens():
+    for seed in range(10):
+        state = _state(seed)
+        assert [sorted(p) for p in state.bonus] == [sorted(p) for p in BONUS_TOKENS]
+
+
+def test_points_are_the_tokens_taken():
+    rng = random.Random(0)
+    for _ in range(20):
+        state = new_game(random.Random(rng.getrandbits(64)))[0]
+        while not state.is_terminal():
+            state.apply(random_action(state, state.turn & 1, rng))
+        goods = sum(TOKEN_SUMS[g][state.sold[g]] for g in range(len(STACK_SIZES)))
+        bonus = sum(sum(pile[:pos]) for pile, pos in zip(state.bonus, state.bonus_pos))
+        assert sum(state.points) == goods + bonus
@@ -0,0 +1,65 @@
+# test_vec_env.py
+import pytest
+
+np = pytest.importorskip('numpy')
+pytest.importorskip('stable_baselines3')
+
+from src.core.cards import N_CARDS
+from src.core.state import GameState
+from src.core.tokens import BONUS_SIZES
+from src.core.players.gymnasium.vec_env import JaipurVecEnv
+
+
+def _mirror(env: JaipurVecEnv, i: int) -> GameState:
+    """A GameState in the same position as game ``i`` of ``env``, dealt from the same deck and piles"""
+    state = GameState()
+    state.deck = env.deck[i].tolist()
+    state.deck_pos = int(env.deck_pos[i])
+    for c in state.deck[state.deck_pos:]:
+        state.deck_counts[c] += 1
+    for c in range(N_CARDS):
+        state.add_to_market(c, int(env.market[i, c]))
+        for seat in range(2):
+            state.add_to_hand(seat, c, int(env.hands[i, seat, c]))
+    state.bonus = [tuple(env.bonus[i, k, :size].tolist()) for k, size in enumerate(BONUS_SIZES)]
+    state.bonus_pos = env.bonus_pos[i].tolist()
+    state.sold = env.sold[i].tolist()
+    state.points = env.points[i].tolist()
+    state.turn = int(env.turn[i])
+    state.rehash()
+    return state
+
+
+def _same(env: JaipurVecEnv, i: int, state: GameState) -> bool:
+    return (env.market[i].tolist() == state.market and env.hands[i].tolist() == state.hands
+            and env.sold[i].tolist() == state.sold and env.points[i].tolist() == state.points
+            and env.bonus_pos[i].tolist() == state.bonus_pos and int(env.deck_pos[i]) == state.deck_pos
+            and int(env.turn[i]) == state.turn)
+
+
+def test_vec_env_plays_like_game_state():
+    n = 16
+    env = JaipurVecEnv(n, seed=0)
+    env.reset()
+    states = [_mirror(env, i) for i in range(n)]
+    rng = np.random.default_rng(0)
+    finished = 0
+    while finished < 40:
+        masks = env.action_masks()
+        actions = np.array([rng.choice(np.flatnonzero(m)) for m in masks])
+        # Now and then an illegal action, which leaves the same player to move
+        illegal = rng.random(n) < 0.05
+        actions[illegal] = rng.integers(0, masks.shape[1], illegal.sum())
+        _, rewards, dones, infos = env.step(actions)
+        for i, state in enumerate(states):
+            mover = state.turn & 1
+            legal = state.apply(int(actions[i]))
+            assert legal != infos[i].get('invalid_action', False)
+            assert dones[i] == state.is_terminal()
+            if dones[i]:
+                points = state.final_points()
+                assert rewards[i] == points[mover] - points[1 - mover]
+                states[i] = _mirror(env, i)
+                finished += 1
+            else:
+                assert _same(env, i, state)
@@ -0,0 +1,64 @@
+# test_zobrist.py
+import random
+from src.core.replay import new_game
+from src.core.rollout import random_action
+from src.core.zobrist import TranspositionTable
+
+
+def _hashes(state):
+    return state.hash, list(state.hand_hashes), state.key(), state.information_key(0), state.information_key(1)
+
+
+def _rehashed(state):
+    other = state.clone()
+    other.rehash()
+    return _hashes(other)
+
+
+def test_incremental_hash_matches_rehash():
+    rng = random.Random(0)
+    for _ in range(20):
+        state = new_game(random.Random(rng.getrandbits(64)))[0]
+        assert _hashes(state) == _rehashed(state)
+        history = [_hashes(state)]
+        while not state.is_terminal():
+            if len(history) > 1 and rng.random() < 0.3:
+                state.undo()
+                history.pop()
+                assert _hashes(state) == history[-1]
+            else:
+                state.apply(random_action(state, state.turn & 1, rng))
+                history.append(_hashes(state))
+            assert _hashes(state) == _rehashed(state)
+
+
+def test_information_key_ignores_hidden_cards():
+    rng = random.Random(1)
+    state = new_game(random.Random(2))[0]
+    for _ in range(10):
+        state.apply(random_action(state, state.turn & 1, rng))
+    for seat in range(2):
+        for _ in range(20):
+            det = state.determinize(seat, rng)
+            assert det.information_key(seat) == state.information_key(seat)
+            det.rehash()
+            assert det.information_key(seat) == state.information_key(seat)
+    # The side to move is part of every key
+    other = state.clone()
+    other.turn += 1
+    assert other.key() != state.key()
+
+
+def test_transposition_table_replacement():
+    table = TranspositionTable(4)
+    assert len(table) == 4
+    assert table.put(1, 'a', depth=3)
+    assert table.get(1) == 'a'
+    # Same slot, shallower entry of the same search: rejected
+    assert not table.put(5, 'b', depth=1)
+    assert table.get(5) is None and table.get(1) == 'a'
+    # An older search's entry gives way
+    table.new_search()
+    assert table.put(5, 'b', depth=1)
+    assert table.get(5) == 'b' and table.get(1) is None
+    assert table.stats()['rejections'] == 1
@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+# Rates agents against each other with paired deals and SPRT early stopping, e.g.:
+#   python tournament.py ai mcts:100 mcts:300 --format round-robin --elo1 50
+import argparse
+from tabulate import tabulate
+from src.core.players import registered_players
+from src.core.tournament import Tournament
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a Jaipur tournament between registered agents")
+    parser.add_argument('players', nargs='+', metavar='PLAYER',
+                        help=f"agent kinds ({', '.join(registered_players())}), optionally kind:arg")
+    parser.add_argument('--format', choices=['round-robin', 'gauntlet'], default='round-robin')
+    parser.add_argument('--max-pairs', type=int, default=500, help="deals per pairing before giving up")
+    parser.add_argument('--elo0', type=float, default=0.0, help="SPRT null hypothesis (Elo of A over B)")
+    parser.add_argument('--elo1', type=float, default=50.0, help="SPRT alternative hypothesis")
+    parser.add_argument('--alpha', type=float, default=0.05)
+    parser.add_argument('--beta', type=float, default=0.05)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    if len(args.players) < 2:
+        parser.error("a tournament needs at least two players")
+    for kind in args.players:
+        if kind.partition(':')[0] not in registered_players():
+            parser.error(f"unknown player kind {kind!r}")
+
+    tournament = Tournament(args.players, args.format, args.max_pairs, args.elo0, args.elo1,
+                            args.alpha, args.beta, workers=args.workers, seed=args.seed)
+    ratings = tournament.run()
+    print(tabulate(tournament.table(), headers=["A", "B", "Games", "W-D-L", "Score", "Elo (A-B)", "LLR", "Result"]))
+    print()
+    print(tabulate(sorted(ratings.items(), key=lambda kv: -kv[1]), headers=["Player", "Elo"], floatfmt=".0f"))
+
+
+if __name__ == "__main__":
+    main()